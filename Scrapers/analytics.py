@@ -0,0 +1,481 @@
+# analytics.py
+import heapq
+import threading
+import time
+from functools import lru_cache
+
+from .lazy import optional_import
+
+# Trend intervals in seconds; each must be a multiple of the index's bucket size
+INTERVALS = {
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400
+}
+
+# The epoch was a Thursday, so weeks are shifted to start on Mondays
+WEEK_OFFSET = 4 * 86400
+
+# Sentiment beyond these bounds counts as positive or negative, as in the frontend
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+
+def interval_start(timestamp, seconds):
+    """Return the start of the interval of the given length that contains a timestamp (UTC)."""
+    offset = WEEK_OFFSET if seconds % (7 * 86400) == 0 else 0
+    return (timestamp - offset) // seconds * seconds + offset
+
+
+@lru_cache(maxsize=4096)
+def series_for(subreddit, keywords):
+    """Return the (subreddit, keyword) series of a post, its subreddit's total first."""
+    subreddit = subreddit.lower()
+    return ((subreddit, ''),) + tuple(
+        (subreddit, keyword) for keyword in dict.fromkeys(keyword.lower() for keyword in keywords if keyword)
+    )
+
+
+def post_weight(upvotes):
+    """Weight of a post in score-weighted sentiment; upvoted posts speak for more readers."""
+    return 1.0 + max(upvotes or 0, 0)
+
+
+class Bucket:
+    """Running totals of the posts created in one time bucket of one series."""
+
+    __slots__ = ('posts', 'sentiment', 'weighted_sentiment', 'weight', 'upvotes', 'comments', 'positive',
+                 'negative', 'top')
+
+    def __init__(self):
+        self.posts = 0
+        self.sentiment = 0.0
+        self.weighted_sentiment = 0.0
+        self.weight = 0.0
+        self.upvotes = 0
+        self.comments = 0
+        self.positive = 0
+        self.negative = 0
+        self.top = []
+
+    def apply(self, sentiment, upvotes, comments, sign=1):
+        """Add (sign=1) or remove (sign=-1) one post's contribution."""
+        weight = post_weight(upvotes)
+        self.posts += sign
+        self.sentiment += sign * sentiment
+        self.weighted_sentiment += sign * sentiment * weight
+        self.weight += sign * weight
+        self.upvotes += sign * upvotes
+        self.comments += sign * comments
+        if sentiment > POSITIVE_THRESHOLD:
+            self.positive += sign
+        elif sentiment < NEGATIVE_THRESHOLD:
+            self.negative += sign
+
+    def offer(self, entry, limit):
+        """
+        Keep a post among the bucket's highest scored ones, highest first.
+
+        Args:
+            entry (tuple): (upvotes, id, title, sentiment)
+            limit (int): Number of top posts kept
+        """
+        top = self.top
+        for position, kept in enumerate(top):
+            if kept[1] == entry[1]:
+                del top[position]
+                break
+        else:
+            if len(top) >= limit and entry <= top[-1]:
+                return
+        top.append(entry)
+        top.sort(reverse=True)
+        del top[limit:]
+
+
+class TrendIndex:
+    """
+    Time-bucketed sentiment and volume aggregates per subreddit and keyword.
+
+    Posts are folded into fixed-size buckets (hourly by default) of two
+    kinds of series: (subreddit, keyword) for every keyword a post
+    matched, and (subreddit, '') counting each post once per subreddit.
+    Every bucket keeps running sums, so a trend query only visits the
+    buckets in range, never the posts. Each post is counted once per
+    series; seeing it again with a new score replaces its old
+    contribution. A post whose score rises after it was counted only
+    joins the top posts of its bucket when it is added again.
+
+    With a retention, posts older than it are not counted, and posts and
+    buckets that age out of it are dropped, so memory stays bounded in a
+    long-running process.
+    """
+
+    def __init__(self, bucket_seconds=3600, top_posts=3, retention=None):
+        """
+        Initialize the index.
+
+        Args:
+            bucket_seconds (int): Length of the finest bucket, in seconds
+            top_posts (int): Highest scored posts kept per bucket
+            retention (float): Seconds of history kept; everything if None
+        """
+        self.bucket_seconds = bucket_seconds
+        self.top_posts = top_posts
+        self.retention = retention
+        self._series = {}
+        # Post id -> (bucket start, sentiment, upvotes, comments, series counted in)
+        self._posts = {}
+        # Bucket start -> ids of the posts in it, to drop them once they age out
+        self._bucket_posts = {}
+        self._expired_before = float('-inf')
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _series_of(post):
+        """Return the series a post counts towards, its subreddit's total first."""
+        keywords = post.get('matched_keywords') or ([post['keyword']] if post.get('keyword') else [])
+        return series_for(post.get('subreddit') or '', tuple(keywords))
+
+    def _expire(self):
+        """
+        Drop the posts and buckets that aged out of the retention.
+
+        Buckets are only scanned when the cutoff moves to a new bucket.
+        Must be called with the lock held.
+
+        Returns:
+            float: Start of the oldest bucket kept, or None without a retention
+        """
+        if self.retention is None:
+            return None
+        cutoff = interval_start(time.time() - self.retention, self.bucket_seconds)
+        if cutoff <= self._expired_before:
+            return cutoff
+        self._expired_before = cutoff
+
+        expired = [start for start in self._bucket_posts if start < cutoff]
+        if not expired:
+            return cutoff
+        for start in expired:
+            for post_id in self._bucket_posts.pop(start):
+                del self._posts[post_id]
+        for name in list(self._series):
+            buckets = self._series[name]
+            for start in expired:
+                buckets.pop(start, None)
+            if not buckets:
+                del self._series[name]
+        return cutoff
+
+    def add_posts(self, posts):
+        """
+        Fold posts into the aggregates as they arrive.
+
+        Args:
+            posts (iterable): Post dicts with id, subreddit, keyword or matched_keywords,
+                date, sentiment, upvotes and comments
+
+        Returns:
+            int: Number of posts that were not counted before
+        """
+        added = 0
+        with self._lock:
+            cutoff = self._expire()
+            for post in posts:
+                if not post.get('id') or post.get('date') is None:
+                    continue
+                bucket_start = interval_start(post['date'], self.bucket_seconds)
+                if cutoff is not None and bucket_start < cutoff:
+                    continue
+                added += self._count(
+                    post['id'],
+                    self._series_of(post),
+                    (bucket_start, post.get('sentiment') or 0.0, post.get('upvotes') or 0, post.get('comments') or 0),
+                    post.get('title') or ''
+                )
+        return added
+
+    def update_metrics(self, post_id, upvotes, comments):
+        """
+        Replace the score and comment count of an already counted post.
+
+        Args:
+            post_id (str): Post id
+            upvotes (int): Current score
+            comments (int): Current number of comments
+
+        Returns:
+            bool: True if the post is counted
+        """
+        with self._lock:
+            previous = self._posts.get(post_id)
+            if previous is None:
+                return False
+            self._count(post_id, previous[4], (previous[0], previous[1], upvotes, comments))
+        return True
+
+    def _count(self, post_id, series, contribution, title=None):
+        """
+        Count a post in its series, replacing its previous contribution.
+
+        Series it was already counted in are only updated if its numbers
+        changed. Must be called with the lock held.
+
+        Args:
+            post_id (str): Post id
+            series (tuple): (subreddit, keyword) series the post counts towards
+            contribution (tuple): (bucket start, sentiment, upvotes, comments)
+            title (str): Post title; None keeps the post among the top posts only if it already is
+
+        Returns:
+            int: 1 if the post was not counted before, else 0
+        """
+        previous = self._posts.get(post_id)
+        counted = previous[4] if previous is not None else ()
+        all_series = counted + tuple(name for name in series if name not in counted)
+        if previous is None or previous[:4] != contribution:
+            changed = all_series
+            for name in counted:
+                self._series[name][previous[0]].apply(*previous[1:4], sign=-1)
+        else:
+            changed = all_series[len(counted):]
+            if not changed:
+                return 0
+
+        bucket_start, sentiment, upvotes, comments = contribution
+        for name in changed:
+            buckets = self._series.setdefault(name, {})
+            bucket = buckets.get(bucket_start)
+            if bucket is None:
+                bucket = buckets[bucket_start] = Bucket()
+            bucket.apply(sentiment, upvotes, comments)
+            kept_title = title if title is not None else next(
+                (top[2] for top in bucket.top if top[1] == post_id), None
+            )
+            if kept_title is not None:
+                bucket.offer((upvotes, post_id, kept_title, sentiment), self.top_posts)
+
+        if previous is None or previous[0] != bucket_start:
+            if previous is not None:
+                self._bucket_posts[previous[0]].discard(post_id)
+            self._bucket_posts.setdefault(bucket_start, set()).add(post_id)
+        self._posts[post_id] = contribution + (all_series,)
+        return 1 if previous is None else 0
+
+    def backfill(self, posts):
+        """
+        Fold a large batch of posts into the aggregates, vectorized with NumPy.
+
+        Posts already counted, or older than the retention, are skipped; use
+        add_posts to update them.
+        Bucketing, sums and the top posts of every bucket are computed with
+        array operations over the whole batch. Without NumPy the posts go
+        through add_posts one at a time.
+
+        Args:
+            posts (iterable): Post dicts, as for add_posts
+
+        Returns:
+            int: Number of posts added
+        """
+        np = optional_import('numpy')
+        if np is None:
+            return self.add_posts(posts)
+
+        ids, series, dates, sentiments, upvotes, comments, titles = [], [], [], [], [], [], []
+        for post in posts:
+            if not post.get('id') or post.get('date') is None:
+                continue
+            ids.append(post['id'])
+            series.append(self._series_of(post))
+            dates.append(post['date'])
+            sentiments.append(post.get('sentiment') or 0.0)
+            upvotes.append(post.get('upvotes') or 0)
+            comments.append(post.get('comments') or 0)
+            titles.append(post.get('title') or '')
+
+        starts = interval_start(np.asarray(dates, dtype=np.float64), self.bucket_seconds)
+        bucket_starts = starts.tolist()
+
+        with self._lock:
+            cutoff = self._expire()
+            # The last copy of each post not counted yet
+            rows = list({post_id: row for row, post_id in enumerate(ids)
+                         if post_id not in self._posts and (cutoff is None or bucket_starts[row] >= cutoff)}.values())
+            if not rows:
+                return 0
+
+            # One entry per (post, series) it counts towards
+            series_list, series_codes, codes, counts = [], {}, [], []
+            for row in rows:
+                counts.append(len(series[row]))
+                for name in series[row]:
+                    code = series_codes.get(name)
+                    if code is None:
+                        code = series_codes[name] = len(series_list)
+                        series_list.append(name)
+                    codes.append(code)
+            entry_rows = np.repeat(np.asarray(rows, dtype=np.int64), counts)
+            codes = np.asarray(codes, dtype=np.int64)
+
+            sentiment = np.asarray(sentiments, dtype=np.float64)[entry_rows]
+            upvote = np.asarray(upvotes, dtype=np.int64)[entry_rows]
+            comment = np.asarray(comments, dtype=np.int64)[entry_rows]
+
+            # One group per (series, bucket): combine both into a single integer key
+            bucket_numbers = (starts // self.bucket_seconds).astype(np.int64)[entry_rows]
+            first_bucket = int(bucket_numbers.min())
+            span = int(bucket_numbers.max()) - first_bucket + 1
+            groups, inverse = np.unique(codes * span + (bucket_numbers - first_bucket), return_inverse=True)
+            inverse = inverse.ravel()
+
+            weight = 1.0 + np.maximum(upvote, 0)
+            totals = zip(
+                np.bincount(inverse).tolist(),
+                np.bincount(inverse, weights=sentiment).tolist(),
+                np.bincount(inverse, weights=sentiment * weight).tolist(),
+                np.bincount(inverse, weights=weight).tolist(),
+                np.bincount(inverse, weights=upvote).astype(np.int64).tolist(),
+                np.bincount(inverse, weights=comment).astype(np.int64).tolist(),
+                np.bincount(inverse, weights=sentiment > POSITIVE_THRESHOLD).astype(np.int64).tolist(),
+                np.bincount(inverse, weights=sentiment < NEGATIVE_THRESHOLD).astype(np.int64).tolist()
+            )
+
+            # Entries ordered by group, highest score (then id, as tuples compare) first; the first
+            # top_posts of each group are its top posts
+            id_rank = np.unique(np.asarray(ids), return_inverse=True)[1].ravel()[entry_rows]
+            order = np.lexsort((-id_rank, -upvote, inverse))
+            ordered_groups = inverse[order]
+            leading = np.arange(len(order)) - np.searchsorted(ordered_groups, ordered_groups) < self.top_posts
+            top_rows = {}
+            for group, row in zip(ordered_groups[leading].tolist(), entry_rows[order[leading]].tolist()):
+                top_rows.setdefault(group, []).append((upvotes[row], ids[row], titles[row], sentiments[row]))
+
+            offset = WEEK_OFFSET if self.bucket_seconds % (7 * 86400) == 0 else 0
+            for group, (key, total) in enumerate(zip(groups.tolist(), totals)):
+                buckets = self._series.setdefault(series_list[key // span], {})
+                bucket_start = float((first_bucket + key % span) * self.bucket_seconds + offset)
+                bucket = buckets.get(bucket_start)
+                if bucket is None:
+                    bucket = buckets[bucket_start] = Bucket()
+                bucket.posts += total[0]
+                bucket.sentiment += total[1]
+                bucket.weighted_sentiment += total[2]
+                bucket.weight += total[3]
+                bucket.upvotes += total[4]
+                bucket.comments += total[5]
+                bucket.positive += total[6]
+                bucket.negative += total[7]
+                if bucket.top:
+                    for entry in top_rows[group]:
+                        bucket.offer(entry, self.top_posts)
+                else:
+                    bucket.top = sorted(top_rows[group], reverse=True)
+
+            for row in rows:
+                self._posts[ids[row]] = (bucket_starts[row], sentiments[row], upvotes[row], comments[row], series[row])
+                self._bucket_posts.setdefault(bucket_starts[row], set()).add(ids[row])
+        return len(rows)
+
+    def trend(self, subreddit=None, keyword=None, since=None, until=None, interval='day'):
+        """
+        Roll the buckets of matching series up into a trend.
+
+        Args:
+            subreddit (str): Only this subreddit (case-insensitive); every subreddit if None
+            keyword (str): Only posts that matched this keyword; every post if None
+            since (float): Only buckets starting at or after this timestamp
+            until (float): Only buckets starting at or before this timestamp
+            interval (str): hour, day or week
+
+        Returns:
+            list: One dict per interval with posts, mean and score-weighted sentiment,
+                upvotes, comments, positive and negative counts and top posts, oldest first
+
+        Raises:
+            ValueError: If the interval is unknown or finer than the index's buckets
+        """
+        seconds = INTERVALS.get(interval)
+        if seconds is None:
+            raise ValueError(f"Unknown interval '{interval}'; use one of {', '.join(INTERVALS)}")
+        if seconds % self.bucket_seconds:
+            raise ValueError(f"Interval '{interval}' is finer than the {self.bucket_seconds}s buckets")
+
+        subreddit = subreddit.lower() if subreddit else None
+        keyword = keyword.lower() if keyword else ''
+        rolled = {}
+        with self._lock:
+            self._expire()
+            for (series_subreddit, series_keyword), buckets in self._series.items():
+                if series_keyword != keyword or (subreddit is not None and series_subreddit != subreddit):
+                    continue
+                for bucket_start, bucket in buckets.items():
+                    if not bucket.posts:
+                        continue
+                    if (since is not None and bucket_start < since) or (until is not None and bucket_start > until):
+                        continue
+                    start = interval_start(bucket_start, seconds)
+                    total = rolled.get(start)
+                    if total is None:
+                        total = rolled[start] = Bucket()
+                    total.posts += bucket.posts
+                    total.sentiment += bucket.sentiment
+                    total.weighted_sentiment += bucket.weighted_sentiment
+                    total.weight += bucket.weight
+                    total.upvotes += bucket.upvotes
+                    total.comments += bucket.comments
+                    total.positive += bucket.positive
+                    total.negative += bucket.negative
+                    total.top.extend(bucket.top)
+
+        # A post is in a single bucket of a series and a single subreddit, so no top post is repeated
+        for total in rolled.values():
+            total.top = heapq.nlargest(self.top_posts, total.top)
+        return [self._summarize(start, rolled[start]) for start in sorted(rolled)]
+
+    @staticmethod
+    def _summarize(start, bucket):
+        return {
+            'start': start,
+            'posts': bucket.posts,
+            'mean_sentiment': round(bucket.sentiment / bucket.posts, 4) if bucket.posts else 0.0,
+            'weighted_sentiment': round(bucket.weighted_sentiment / bucket.weight, 4) if bucket.weight else 0.0,
+            'upvotes': bucket.upvotes,
+            'comments': bucket.comments,
+            'positive': bucket.positive,
+            'negative': bucket.negative,
+            'top_posts': [
+                {'id': post_id, 'title': title, 'upvotes': upvotes, 'sentiment': sentiment}
+                for upvotes, post_id, title, sentiment in bucket.top
+            ]
+        }
+
+    def series(self):
+        """
+        List the tracked series.
+
+        Returns:
+            list: {'subreddit', 'keyword', 'posts', 'first', 'last'} per series, keyword ''
+                being every post of the subreddit, largest first
+        """
+        with self._lock:
+            self._expire()
+            listed = []
+            for (subreddit, keyword), buckets in self._series.items():
+                starts = [start for start, bucket in buckets.items() if bucket.posts]
+                if not starts:
+                    continue
+                listed.append({
+                    'subreddit': subreddit,
+                    'keyword': keyword,
+                    'posts': sum(buckets[start].posts for start in starts),
+                    'first': min(starts),
+                    'last': max(starts)
+                })
+        return sorted(listed, key=lambda series: -series['posts'])
+
+    def __len__(self):
+        """Number of distinct posts counted."""
+        with self._lock:
+            return len(self._posts)
@@ -1,24 +1,123 @@
 # base_scraper.py
+import asyncio
+import random
 import time
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from bs4 import BeautifulSoup, SoupStrainer
 import logging
 
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional; only the async fetch methods need it
+    aiohttp = None
+
+try:
+    import lxml
+except ImportError:  # lxml is optional; html.parser is used without it
+    lxml = None
+
+from . import sentiment
+from .html_stream import CHUNK_SIZE, iter_elements
+from .http_cache import HttpCache
+from .rate_limiter import parse_retry_after
+
+# Tree builder used unless a scraper asks for another; parser='lxml' is several times faster when installed,
+# but repairs broken markup differently, so it is opt-in
+DEFAULT_PARSER = 'html.parser'
+
+# Statuses worth retrying; every other error status fails straight away
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class RetryableStatus(Exception):
+    """Raised internally for a response whose status is worth retrying."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Page:
+    """A page fetched by the async client."""
+    
+    def __init__(self, url, status_code, headers, content, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = from_cache
+    
+    @property
+    def text(self):
+        """The body decoded with the charset of its Content-Type, UTF-8 by default."""
+        content_type = self.headers.get('Content-Type', '')
+        charset = 'utf-8'
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=')[-1].split(';')[0].strip() or charset
+        return self.content.decode(charset, errors='replace')
+
+
+def make_strainer(targets):
+    """
+    Build a SoupStrainer from parse targets.
+    
+    Args:
+        targets: A tag name, a list of tag names, or a SoupStrainer for
+            finer filters (e.g. SoupStrainer('a', href=True))
+            
+    Returns:
+        SoupStrainer: The strainer, or None when targets is None
+    """
+    if targets is None or isinstance(targets, SoupStrainer):
+        return targets
+    if isinstance(targets, str):
+        return SoupStrainer(targets)
+    return SoupStrainer(list(targets))
+
+
 class BaseScraper:
-    """Base class for web scrapers with common functionality."""
+    """
+    Base class for web scrapers with common functionality.
+    
+    Subclasses that only read a few elements of a page can set parse_targets
+    (see make_strainer) so parse_html builds just those subtrees.
+    """
     
-    def __init__(self, headers=None):
+    # Parts of a page parse_html builds by default; None parses the whole document
+    parse_targets = None
+    
+    def __init__(self, headers=None, pool_size=20, timeout=(5, 30), cache=None, max_delay=60, parser=None):
         """
         Initialize the scraper with request headers.
         
         Args:
             headers (dict): Optional request headers
+            pool_size (int): Connections kept open per host
+            timeout (float or tuple): Request timeout, or (connect, read) timeouts, in seconds
+            cache (HttpCache): Optional on-disk cache revalidated with conditional requests;
+                pass True to use one in the default directory
+            max_delay (float): Longest backoff between retries, in seconds
+            parser (str): BeautifulSoup tree builder, html.parser by default; 'lxml' is faster when installed
         """
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_delay = max_delay
+        self.cache = HttpCache() if cache is True else cache
+        self.parser = parser or DEFAULT_PARSER
+        self._strainer = make_strainer(self.parse_targets)
+        
+        # Keep connections alive and let concurrent threads share the pool
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
         # Configure logging
         logging.basicConfig(
@@ -27,43 +126,203 @@ class BaseScraper:
         )
         self.logger = logging.getLogger('scraper')
     
-    def make_request(self, url, params=None, retries=3, delay=1):
+    def backoff(self, attempt, delay, retry_after=None):
+        """
+        Return how long to wait before the next attempt.
+        
+        Waits are drawn uniformly up to an exponentially growing cap ("full
+        jitter") so clients that failed together do not retry together. A
+        server's Retry-After is always honoured.
+        
+        Args:
+            attempt (int): Number of the failed attempt, starting at 0
+            delay (float): Base delay in seconds
+            retry_after (float): Optional wait requested by the server
+            
+        Returns:
+            float: Seconds to wait
+        """
+        wait = random.uniform(0, min(self.max_delay, delay * 2 ** attempt))
+        if retry_after is not None:
+            wait = max(wait, retry_after)
+        return wait
+    
+    def make_request(self, url, params=None, retries=3, delay=1, use_cache=True):
         """
         Make an HTTP request with retries.
         
+        Connection errors and 429/5xx responses are retried with jittered
+        exponential backoff; other error statuses fail straight away. With a
+        cache, a page that was fetched before is revalidated and served from
+        disk when the server answers 304 Not Modified.
+        
         Args:
             url (str): The URL to request
             params (dict): Optional query parameters
-            retries (int): Number of retries on failure
-            delay (float): Delay between retries in seconds
+            retries (int): Number of attempts before giving up
+            delay (float): Base delay of the backoff between retries in seconds
+            use_cache (bool): Revalidate against and update the cache, if one is configured
             
         Returns:
-            requests.Response: The response object
+            requests.Response: The response object; from_cache is True when it was served from the cache
         """
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        cache = self.cache if use_cache else None
+        entry = cache.get(full_url) if cache is not None else None
+        conditional = cache.validators(entry) if entry is not None else {}
+        
         for attempt in range(retries):
             try:
-                response = self.session.get(url, params=params, timeout=10)
+                response = self.session.get(full_url, headers=conditional, timeout=self.timeout)
+                if response.status_code == 304 and entry is not None:
+                    return self._cached_response(full_url, entry)
+                if response.status_code in RETRY_STATUSES:
+                    raise RetryableStatus(response.status_code, parse_retry_after(response.headers.get('Retry-After')))
                 response.raise_for_status()
+                
+                response.from_cache = False
+                if cache is not None:
+                    cache.set(full_url, response.status_code, response.headers, response.content)
                 return response
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, RetryableStatus) as e:
                 self.logger.warning(f"Request failed (attempt {attempt+1}/{retries}): {e}")
                 if attempt < retries - 1:
-                    time.sleep(delay)
+                    time.sleep(self.backoff(attempt, delay, getattr(e, 'retry_after', None)))
                 else:
                     self.logger.error(f"Failed to retrieve {url} after {retries} attempts")
+                    if isinstance(e, RetryableStatus):
+                        response.raise_for_status()
                     raise
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Failed to retrieve {url}: {e}")
+                raise
+    
+    def _cached_response(self, url, entry):
+        """Build a requests.Response from a cache entry."""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
     
-    def parse_html(self, html):
+    def fetch_all(self, urls, concurrency=10, retries=3, delay=1, use_cache=True):
+        """
+        Fetch many pages concurrently with the async client.
+        
+        Args:
+            urls (list): URLs to fetch
+            concurrency (int): Maximum requests in flight
+            retries (int): Number of attempts per URL
+            delay (float): Base backoff delay in seconds
+            use_cache (bool): Revalidate against and update the cache, if one is configured
+            
+        Returns:
+            list: Page objects in URL order, or the exception for URLs that failed
+        """
+        return asyncio.run(self.fetch_all_async(urls, concurrency, retries, delay, use_cache))
+    
+    async def fetch_all_async(self, urls, concurrency=10, retries=3, delay=1, use_cache=True):
+        """Async version of fetch_all, for callers already running an event loop."""
+        if aiohttp is None:
+            raise RuntimeError("Async fetching requires aiohttp to be installed")
+        
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        connector = aiohttp.TCPConnector(limit=min(concurrency, self.pool_size) or concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(session, url):
+            async with semaphore:
+                return await self.make_request_async(session, url, retries, delay, use_cache)
+        
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(*(fetch(session, url) for url in urls), return_exceptions=True)
+    
+    async def make_request_async(self, session, url, retries=3, delay=1, use_cache=True):
+        """
+        Fetch one page on an aiohttp session, with the retry and cache rules of make_request.
+        
+        Cache reads and writes are file IO, so they run in a worker thread
+        instead of blocking the event loop.
+        
+        Args:
+            session (aiohttp.ClientSession): Session to use
+            url (str): Full URL to fetch
+            
+        Returns:
+            Page: The fetched page
+        """
+        cache = self.cache if use_cache else None
+        entry = await asyncio.to_thread(cache.get, url) if cache is not None else None
+        conditional = cache.validators(entry) if entry is not None else {}
+        
+        for attempt in range(retries):
+            try:
+                async with session.get(url, headers=conditional) as response:
+                    if response.status == 304 and entry is not None:
+                        return Page(url, entry['status'], entry['headers'], entry['body'], from_cache=True)
+                    if response.status in RETRY_STATUSES:
+                        raise RetryableStatus(response.status, parse_retry_after(response.headers.get('Retry-After')))
+                    response.raise_for_status()
+                    
+                    body = await response.read()
+                    if cache is not None:
+                        await asyncio.to_thread(cache.set, url, response.status, response.headers, body)
+                    return Page(url, response.status, dict(response.headers), body)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError, RetryableStatus) as e:
+                self.logger.warning(f"Request failed (attempt {attempt+1}/{retries}): {url}: {e}")
+                if attempt < retries - 1:
+                    await asyncio.sleep(self.backoff(attempt, delay, getattr(e, 'retry_after', None)))
+                else:
+                    self.logger.error(f"Failed to retrieve {url} after {retries} attempts")
+                    raise
+    
+    def parse_html(self, html, targets=None, full=False):
         """
         Parse HTML content with BeautifulSoup.
         
         Args:
             html (str): HTML content
+            targets: Optional parse targets overriding parse_targets (see make_strainer)
+            full (bool): Parse the whole document even when parse targets are set
+            
+        Returns:
+            BeautifulSoup: Parsed HTML, holding only the targeted elements when targets are set
+        """
+        strainer = None if full else make_strainer(targets) if targets is not None else self._strainer
+        return BeautifulSoup(html, self.parser, parse_only=strainer)
+    
+    def iter_elements(self, source, tags):
+        """
+        Stream elements out of a large document without parsing it into a tree.
+        
+        Args:
+            source: HTML as a string, bytes, a file-like object or an iterable of chunks
+            tags (iterable): Tag names to extract
             
         Returns:
-            BeautifulSoup: Parsed HTML
+            iterator: Element (tag, attrs, text) tuples, see html_stream.iter_elements
         """
-        return BeautifulSoup(html, 'html.parser')
+        return iter_elements(source, tags)
+    
+    def stream_elements(self, url, tags, params=None):
+        """
+        Download a page and extract elements from it while it arrives.
+        
+        Args:
+            url (str): The URL to request
+            tags (iterable): Tag names to extract
+            params (dict): Optional query parameters
+            
+        Yields:
+            Element: (tag, attrs, text) for each matching element
+        """
+        with self.session.get(url, params=params, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            yield from iter_elements(response.iter_content(CHUNK_SIZE), tags, response.encoding or 'utf-8')
     
     def extract_text(self, element):
         """
@@ -87,45 +346,4 @@ class BaseScraper:
         Returns:
             float: Sentiment score (-1.0 to 1.0)
         """
-        if not text:
-            return 0.0
-            
-        # Simple lists of positive and negative words
-        positive_words = [
-            'good', 'great', 'excellent', 'amazing', 'awesome', 'fantastic',
-            'wonderful', 'best', 'love', 'happy', 'helpful', 'useful', 'recommend',
-            'positive', 'success', 'successful', 'beneficial', 'effective',
-            'impressive', 'innovative', 'outstanding', 'perfect', 'brilliant',
-            'excited', 'exciting', 'enjoy', 'enjoyed', 'interesting', 'valuable',
-            'favorite', 'thanks', 'thank', 'appreciation', 'appreciate', 'win',
-            'winning', 'winner', 'improvement', 'improve', 'improved'
-        ]
-        
-        negative_words = [
-            'bad', 'terrible', 'awful', 'horrible', 'poor', 'disappointing',
-            'disappointed', 'hate', 'dislike', 'worst', 'waste', 'useless',
-            'negative', 'fail', 'failure', 'problem', 'issue', 'trouble',
-            'difficult', 'hard', 'complicated', 'confusing', 'confused',
-            'annoying', 'annoyed', 'frustrated', 'frustrating', 'sad',
-            'unhappy', 'angry', 'broke', 'broken', 'expensive', 'overpriced',
-            'avoid', 'avoid', 'sucks', 'suck', 'stupid', 'ridiculous'
-        ]
-        
-        text_lower = text.lower()
-        words = text_lower.split()
-        
-        # Count positive and negative words
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
-        
-        # Calculate total words (excluding very short words)
-        total_words = len([word for word in words if len(word) > 2])
-        
-        if total_words == 0:
-            return 0.0
-            
-        # Calculate sentiment score
-        sentiment_score = (positive_count - negative_count) / (total_words ** 0.5)
-        
-        # Clamp score between -1 and 1
-        return max(min(sentiment_score, 1.0), -1.0)
+        return sentiment.score(text)
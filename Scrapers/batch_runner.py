@@ -0,0 +1,249 @@
+# batch_runner.py
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .post_store import PostStore
+from .query_planner import plan_groups
+from .rate_limiter import PRIORITY_BATCH, RateLimiter
+from .results import ResultSet
+
+CREDENTIAL_FIELDS = ('client_id', 'client_secret', 'user_agent')
+
+
+def load_credentials(path=None):
+    """
+    Load the pool of Reddit API credential sets.
+
+    The pool is read from a JSON or YAML file holding a list of
+    {client_id, client_secret, user_agent} objects, or from the
+    REDDIT_CREDENTIALS environment variable holding the same list as JSON.
+    Without either, the single REDDIT_CLIENT_ID / REDDIT_CLIENT_SECRET /
+    REDDIT_USER_AGENT set is used.
+
+    Args:
+        path (str): Optional credentials file
+
+    Returns:
+        list: Credential dicts, one per API client
+    """
+    if path:
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                import yaml
+                pool = yaml.safe_load(f)
+            else:
+                pool = json.load(f)
+    elif os.environ.get('REDDIT_CREDENTIALS'):
+        pool = json.loads(os.environ['REDDIT_CREDENTIALS'])
+    else:
+        pool = [{
+            'client_id': os.environ.get('REDDIT_CLIENT_ID'),
+            'client_secret': os.environ.get('REDDIT_CLIENT_SECRET'),
+            'user_agent': os.environ.get('REDDIT_USER_AGENT')
+        }]
+
+    credentials = []
+    for entry in pool or []:
+        missing = [field for field in CREDENTIAL_FIELDS if not entry.get(field)]
+        if missing:
+            raise ValueError(f"Credential set is missing {', '.join(missing)}")
+        credentials.append({field: entry[field] for field in CREDENTIAL_FIELDS})
+    return credentials
+
+
+def remaining_budget(client_id):
+    """Return the requests a client can still make in the current window, according to the shared limiter."""
+    status = RateLimiter(client_id).status()
+    return status['remaining'] if status['remaining'] is not None else status['tokens']
+
+
+def plan_work(keyword_list, subreddit_list, post_limit, collapse=False):
+    """
+    Split a scrape into independent units of work.
+
+    Args:
+        keyword_list (list): Keywords
+        subreddit_list (list): Subreddits
+        post_limit (int): Posts per (subreddit, keyword) pair
+        collapse (bool): Keep packed queries whole so each unit is one OR search
+
+    Returns:
+        list: (subreddits, keywords) units; 'all' stands for a site-wide search
+    """
+    if collapse:
+        return plan_groups(keyword_list, subreddit_list, post_limit)
+    return [([subreddit], [keyword] if keyword else [])
+            for subreddit in subreddit_list or ['all']
+            for keyword in keyword_list or ['']]
+
+
+def shard_work(units, budgets):
+    """
+    Assign units of work to clients in proportion to their remaining budgets.
+
+    Each unit costs one request per (subreddit, keyword) pair it covers and
+    goes to the client whose load relative to its budget stays lowest, so a
+    client with twice the budget gets about twice the work.
+
+    Args:
+        units (list): (subreddits, keywords) units from plan_work
+        budgets (list): Remaining budget of each client
+
+    Returns:
+        list: One list of units per client
+    """
+    weights = [max(float(budget or 0), 1.0) for budget in budgets]
+    shards = [[] for _ in budgets]
+    loads = [0.0] * len(budgets)
+
+    # Place the largest units first so the smaller ones can even out the loads
+    for unit in sorted(units, key=lambda unit: -len(unit[0]) * max(len(unit[1]), 1)):
+        cost = len(unit[0]) * max(len(unit[1]), 1)
+        client = min(range(len(shards)), key=lambda i: (loads[i] + cost) / weights[i])
+        shards[client].append(unit)
+        loads[client] += cost
+    return shards
+
+
+def _run_shard(credentials, units, options):
+    """
+    Run one client's share of the work in a worker process.
+
+    Returns:
+        tuple: (client_id, posts, plan report dict)
+    """
+    # Imported here so forked workers build their own PRAW client
+    from .reddit_scraper import RedditScraper
+
+    store = PostStore(options['store_path']) if options.get('store_path') else None
+    scraper = RedditScraper(
+        client_id=credentials['client_id'],
+        client_secret=credentials['client_secret'],
+        user_agent=credentials['user_agent'],
+        max_workers=options.get('max_workers', 4),
+        priority=PRIORITY_BATCH,
+        store=store
+    )
+
+    # Units searching the same subreddits become one scrape, so its queries run concurrently
+    grouped = {}
+    for subreddits, keywords in units:
+        grouped.setdefault(tuple(subreddits), []).extend(keywords)
+
+    posts = []
+    executed = api_requests = 0
+    try:
+        for subreddits, keywords in grouped.items():
+            results = scraper.scrape_reddit(
+                keywords=','.join(keywords),
+                subreddits=','.join(subreddit for subreddit in subreddits if subreddit != 'all'),
+                post_limit=options['post_limit'],
+                time_filter=options.get('time_filter', 'month'),
+                sort=options.get('sort', 'relevance'),
+                incremental=options.get('incremental', False),
+                collapse=options.get('collapse', False)
+            )
+            posts.extend(results)
+            executed += scraper.plan_report.executed_queries
+            api_requests += scraper.plan_report.api_requests
+    finally:
+        scraper.close()
+
+    return credentials['client_id'], posts, {'executed_queries': executed, 'api_requests': api_requests}
+
+
+class BatchRunner:
+    """
+    Runs a large scrape across a pool of API credentials, one process per client.
+
+    The (subreddit, keyword) work list is sharded across the clients by
+    their remaining rate limit budget. Every worker process owns its
+    client, so throughput grows with the number of credential sets
+    instead of being capped by a single client's budget. Results are
+    merged and deduplicated in the parent process.
+    """
+
+    def __init__(self, credentials, store_path=None, max_workers_per_client=4):
+        """
+        Initialize the runner.
+
+        Args:
+            credentials (list): Credential dicts from load_credentials
+            store_path (str): Optional PostStore database shared by the workers
+            max_workers_per_client (int): Concurrent queries inside each worker process
+        """
+        if not credentials:
+            raise ValueError("BatchRunner needs at least one credential set")
+        self.credentials = credentials
+        self.store_path = store_path
+        self.max_workers_per_client = max_workers_per_client
+        self.logger = logging.getLogger('scraper')
+        self.stats = {}
+
+    def run(self, keywords, subreddits, post_limit=100, time_filter='month', sort='relevance',
+            incremental=False, collapse=False):
+        """
+        Scrape every (subreddit, keyword) pair and return the merged results.
+
+        Args:
+            keywords (list): Keywords to search for
+            subreddits (list): Subreddits to search within
+            post_limit (int): Maximum posts per (subreddit, keyword) pair
+            time_filter (str): Time filter for results
+            sort (str): Sort method
+            incremental (bool): Only fetch posts newer than the last run; requires store_path
+            collapse (bool): Pack keywords and subreddits into fewer queries
+
+        Returns:
+            ResultSet: Deduplicated posts from every client
+        """
+        if incremental and not self.store_path:
+            raise ValueError("Incremental scraping requires a post store")
+
+        units = plan_work(keywords, subreddits, post_limit, collapse)
+        budgets = [remaining_budget(credentials['client_id']) for credentials in self.credentials]
+        shards = shard_work(units, budgets)
+        self.logger.info(f"Sharded {len(units)} units of work across {len(self.credentials)} clients: "
+                         f"{[len(shard) for shard in shards]}")
+
+        options = {
+            'post_limit': post_limit,
+            'time_filter': time_filter,
+            'sort': sort,
+            'incremental': incremental,
+            'collapse': collapse,
+            'store_path': self.store_path,
+            'max_workers': self.max_workers_per_client
+        }
+
+        results = ResultSet()
+        per_client = {}
+        active = [(credentials, shard) for credentials, shard in zip(self.credentials, shards) if shard]
+
+        with ProcessPoolExecutor(max_workers=max(len(active), 1)) as executor:
+            futures = {
+                executor.submit(_run_shard, credentials, shard, options): credentials['client_id']
+                for credentials, shard in active
+            }
+            for future in as_completed(futures):
+                client_id = futures[future]
+                try:
+                    _, posts, report = future.result()
+                except Exception as e:
+                    self.logger.error(f"Batch worker for client {client_id} failed: {e}")
+                    per_client[client_id] = {'error': str(e)}
+                    continue
+
+                for post in posts:
+                    results.add(post, post.get('keyword', ''))
+                per_client[client_id] = dict(report, posts=len(posts))
+
+        self.stats = {
+            'units': len(units),
+            'clients': per_client,
+            'unique_posts': len(results),
+            'duplicates': results.duplicates
+        }
+        return results
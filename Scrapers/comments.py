@@ -0,0 +1,152 @@
+# comments.py
+import threading
+from collections import deque
+
+from . import metrics, sentiment
+
+
+class CommentBudget:
+    """API call budget shared by every post of one comment harvest."""
+
+    def __init__(self, max_requests=None):
+        """
+        Initialize the budget.
+
+        Args:
+            max_requests (int): Maximum API calls for the whole harvest; None for no limit
+        """
+        self.max_requests = max_requests
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self, requests=1):
+        """
+        Take requests from the budget if enough are left.
+
+        Returns:
+            bool: True if the calls may be made
+        """
+        with self._lock:
+            if self.max_requests is not None and self.spent + requests > self.max_requests:
+                return False
+            self.spent += requests
+            return True
+
+    @property
+    def exhausted(self):
+        return self.max_requests is not None and self.spent >= self.max_requests
+
+
+class CommentStats:
+    """
+    Running sentiment aggregate of one post's comments.
+
+    Comments are scored one at a time and only the totals are kept, so
+    memory does not grow with the size of the discussion.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.positive = 0
+        self.negative = 0
+        self.total = 0.0
+        self.weighted_total = 0.0
+        self.weight = 0.0
+        self.requests = 0
+        self.truncated = False
+
+    def add(self, text, score=0):
+        """Score one comment and add it to the totals."""
+        with metrics.span('comment_sentiment'):
+            value = sentiment.score(text)
+        # Upvoted comments speak for more readers, so they weigh more
+        weight = 1.0 + max(score or 0, 0)
+        self.count += 1
+        self.total += value
+        self.weighted_total += value * weight
+        self.weight += weight
+        if value > 0:
+            self.positive += 1
+        elif value < 0:
+            self.negative += 1
+
+    def to_fields(self):
+        """
+        Return the aggregate as post fields.
+
+        Returns:
+            dict: comments_scored, comment_sentiment (mean), comment_sentiment_weighted
+                (mean weighted by comment score), comments_positive, comments_negative,
+                comment_requests and comments_truncated (a budget cut the harvest short)
+        """
+        return {
+            'comments_scored': self.count,
+            'comment_sentiment': round(self.total / self.count, 4) if self.count else 0.0,
+            'comment_sentiment_weighted': round(self.weighted_total / self.weight, 4) if self.weight else 0.0,
+            'comments_positive': self.positive,
+            'comments_negative': self.negative,
+            'comment_requests': self.requests,
+            'comments_truncated': self.truncated
+        }
+
+
+def harvest_tree(submission, budget, max_comments=200, max_depth=3, max_more=2, cancelled=None):
+    """
+    Walk a submission's comment tree breadth first, scoring comments as they are reached.
+
+    Top-level comments come first, so a budget cut keeps the most visible
+    discussion. Each "more comments" stub costs an API call and is only
+    expanded while the post's max_more and the shared budget allow it;
+    unexpanded stubs are skipped rather than loaded with replace_more, so
+    the tree is never completed in memory.
+
+    Args:
+        submission: PRAW submission whose comments to read
+        budget (CommentBudget): Shared API call budget; the initial fetch costs one call
+        max_comments (int): Maximum comments scored for this post
+        max_depth (int): Deepest reply level scored, 0 being top-level comments only
+        max_more (int): Maximum "more comments" stubs expanded for this post
+        cancelled (threading.Event): Optional event that stops the walk when set
+
+    Returns:
+        CommentStats: The post's aggregate, or None if the budget did not allow fetching it
+    """
+    # praw is only imported once comments are harvested
+    from praw.models import MoreComments
+
+    if not budget.try_spend():
+        return None
+
+    stats = CommentStats()
+    stats.requests = 1
+    pending = deque((comment, 0) for comment in submission.comments)
+    expanded = 0
+
+    while pending:
+        if stats.count >= max_comments or (cancelled is not None and cancelled.is_set()):
+            stats.truncated = True
+            break
+
+        node, depth = pending.popleft()
+        # Read the depth Reddit sent without getattr, which would make PRAW fetch a missing attribute
+        depth = vars(node).get('depth', depth)
+
+        if isinstance(node, MoreComments):
+            if depth > max_depth:
+                continue
+            if expanded >= max_more or not budget.try_spend():
+                stats.truncated = True
+                continue
+            expanded += 1
+            stats.requests += 1
+            # Expanded stubs return their comments flat, each with its own depth
+            pending.extend((child, depth) for child in node.comments())
+            continue
+
+        if depth > max_depth:
+            continue
+        stats.add(node.body or '', node.score)
+        if depth < max_depth:
+            pending.extend((reply, depth + 1) for reply in node.replies)
+
+    return stats
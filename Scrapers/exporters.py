@@ -0,0 +1,230 @@
+# exporters.py
+import csv
+import io
+import zlib
+
+from .lazy import optional_import
+from .serialization import get_serializer
+
+# pyarrow is optional and slow to import, so it is loaded by the first parquet or arrow export
+pa = None
+pq = None
+
+# Columns written by every export format, in order
+EXPORT_COLUMNS = (
+    'id', 'title', 'content', 'subreddit', 'url', 'upvotes', 'comments', 'date', 'keyword',
+    'matched_keywords', 'sentiment'
+)
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow')
+}
+
+
+class ExportError(ValueError):
+    """Raised when an export format is unknown or its optional dependency is missing."""
+
+
+def _row_values(post):
+    """Return a post's values in EXPORT_COLUMNS order, with matched keywords joined."""
+    values = [post.get(column) for column in EXPORT_COLUMNS]
+    values[EXPORT_COLUMNS.index('matched_keywords')] = ', '.join(post.get('matched_keywords') or ())
+    return values
+
+
+def iter_csv(posts, rows_per_chunk=500):
+    """
+    Encode posts as CSV, yielding one chunk of text every rows_per_chunk rows.
+
+    Args:
+        posts (iterable): Post dicts
+        rows_per_chunk (int): Rows encoded per yielded chunk
+
+    Yields:
+        str: CSV text, starting with the header
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for count, post in enumerate(posts, 1):
+        writer.writerow(_row_values(post))
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_jsonl(posts, rows_per_chunk=500):
+    """
+    Encode posts as newline-delimited JSON, one object per line.
+
+    Yields:
+        bytes: Chunks of UTF-8 JSON lines
+    """
+    dumps = get_serializer()
+    lines = []
+    for post in posts:
+        lines.append(dumps({column: post.get(column) for column in EXPORT_COLUMNS}))
+        if len(lines) >= rows_per_chunk:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until they are drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _load_pyarrow():
+    """Import pyarrow on first use, raising ExportError if it is not installed."""
+    global pa, pq
+    if pa is None:
+        arrow, parquet = optional_import('pyarrow'), optional_import('pyarrow.parquet')
+        if arrow is None or parquet is None:
+            raise ExportError("The parquet and arrow export formats require pyarrow to be installed")
+        pa, pq = arrow, parquet
+
+
+def _arrow_schema():
+    return pa.schema([
+        ('id', pa.string()),
+        ('title', pa.string()),
+        ('content', pa.string()),
+        ('subreddit', pa.string()),
+        ('url', pa.string()),
+        ('upvotes', pa.int64()),
+        ('comments', pa.int64()),
+        ('date', pa.float64()),
+        ('keyword', pa.string()),
+        ('matched_keywords', pa.string()),
+        ('sentiment', pa.float64())
+    ])
+
+
+def _record_batches(posts, schema, rows_per_batch):
+    """Group posts into Arrow record batches of rows_per_batch rows."""
+    columns = [[] for _ in EXPORT_COLUMNS]
+    for post in posts:
+        for column, value in zip(columns, _row_values(post)):
+            column.append(value)
+        if len(columns[0]) >= rows_per_batch:
+            yield pa.record_batch(columns, schema=schema)
+            columns = [[] for _ in EXPORT_COLUMNS]
+
+    if columns[0]:
+        yield pa.record_batch(columns, schema=schema)
+
+
+def _iter_arrow_format(posts, rows_per_batch, open_writer, write_batch):
+    _load_pyarrow()
+
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = open_writer(sink, schema)
+    try:
+        for batch in _record_batches(posts, schema, rows_per_batch):
+            write_batch(writer, batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(posts, rows_per_batch=10000):
+    """
+    Encode posts as a Parquet file, one row group per rows_per_batch rows.
+
+    Only one row group is held in memory at a time.
+
+    Yields:
+        bytes: Chunks of the Parquet file
+    """
+    return _iter_arrow_format(
+        posts,
+        rows_per_batch,
+        lambda sink, schema: pq.ParquetWriter(sink, schema, compression='snappy'),
+        lambda writer, batch: writer.write_batch(batch)
+    )
+
+
+def iter_arrow(posts, rows_per_batch=10000):
+    """
+    Encode posts in the Arrow IPC streaming format.
+
+    Yields:
+        bytes: Chunks of the Arrow stream
+    """
+    return _iter_arrow_format(
+        posts,
+        rows_per_batch,
+        lambda sink, schema: pa.ipc.new_stream(sink, schema),
+        lambda writer, batch: writer.write_batch(batch)
+    )
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Gzip-compress a stream of text or byte chunks without buffering it.
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(posts, export_format, compress=False):
+    """
+    Encode posts in an export format as a stream of chunks.
+
+    Args:
+        posts (iterable): Post dicts, consumed lazily
+        export_format (str): One of EXPORT_FORMATS
+        compress (bool): Gzip the output
+
+    Returns:
+        iterator: Chunks of the encoded export
+    """
+    encoders = {
+        'csv': iter_csv,
+        'jsonl': iter_jsonl,
+        'parquet': iter_parquet,
+        'arrow': iter_arrow
+    }
+    if export_format not in encoders:
+        raise ExportError(f"Unknown export format '{export_format}'")
+    if export_format in ('parquet', 'arrow'):
+        _load_pyarrow()
+
+    chunks = encoders[export_format](posts)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,144 @@
+# html_stream.py
+import codecs
+from collections import namedtuple
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the standard library parser is used without it
+    etree = None
+
+# An extracted element: its tag, attributes and whitespace-normalized text
+Element = namedtuple('Element', ['tag', 'attrs', 'text'])
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'
+])
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _chunks(source, chunk_size=CHUNK_SIZE):
+    """Turn a string, bytes, file-like object or iterable of chunks into an iterable of chunks."""
+    if isinstance(source, (str, bytes)):
+        return (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(chunk_size), source.read(0))
+    return source
+
+
+def _normalize(text):
+    return ' '.join(text.split())
+
+
+def iter_elements(source, tags, encoding='utf-8'):
+    """
+    Extract elements from an HTML document without building a tree of the whole page.
+
+    The document is fed to the parser chunk by chunk and every element
+    with one of the given tags is yielded as soon as it is closed. Parsed
+    parts of the document are discarded as the parser moves on, so memory
+    stays flat however large the page is. lxml is used when installed,
+    the standard library parser otherwise.
+
+    Args:
+        source: HTML as a string, bytes, a file-like object or an iterable of chunks
+            (e.g. response.iter_content())
+        tags (iterable): Tag names to extract, e.g. ['a', 'title']
+        encoding (str): Encoding of byte chunks for the standard library parser
+
+    Yields:
+        Element: (tag, attrs, text) for each matching element, in document order
+    """
+    tags = frozenset(tag.lower() for tag in tags)
+    chunks = _chunks(source)
+    if etree is not None:
+        return _iter_lxml(chunks, tags)
+    return _iter_stdlib(chunks, tags, encoding)
+
+
+def _iter_lxml(chunks, tags):
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    inside = 0
+
+    def drain():
+        nonlocal inside
+        for event, element in parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ''
+            if event == 'start':
+                if tag in tags:
+                    inside += 1
+                continue
+
+            if tag in tags:
+                inside -= 1
+                yield Element(tag, dict(element.attrib), _normalize(''.join(element.itertext())))
+            if inside == 0:
+                # Nothing open still needs this subtree: drop it and the siblings before it
+                element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+class _Extractor(HTMLParser):
+    """Standard library parser that collects the elements with the wanted tags."""
+
+    def __init__(self, tags):
+        super().__init__(convert_charrefs=True)
+        self.tags = tags
+        self.open = []
+        self.found = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in self.tags:
+            return
+        attrs = {name: value if value is not None else '' for name, value in attrs}
+        if tag in VOID_ELEMENTS:
+            self.found.append(Element(tag, attrs, ''))
+        else:
+            self.open.append((tag, attrs, []))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.tags:
+            self.found.append(Element(tag, {name: value or '' for name, value in attrs}, ''))
+
+    def handle_data(self, data):
+        for _, _, text in self.open:
+            text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag not in self.tags or not any(name == tag for name, _, _ in self.open):
+            return
+        # Close elements left open inside this one, as a browser would
+        while self.open:
+            name, attrs, text = self.open.pop()
+            self.found.append(Element(name, attrs, _normalize(''.join(text))))
+            if name == tag:
+                break
+
+    def close(self):
+        super().close()
+        while self.open:
+            name, attrs, text = self.open.pop()
+            self.found.append(Element(name, attrs, _normalize(''.join(text))))
+
+
+def _iter_stdlib(chunks, tags, encoding):
+    parser = _Extractor(tags)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        yield from parser.found
+        parser.found.clear()
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    yield from parser.found
@@ -0,0 +1,118 @@
+# http_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'scraper_http_cache')
+
+
+class HttpCache:
+    """
+    On-disk cache of HTTP responses, revalidated with conditional requests.
+
+    Only responses carrying an ETag or Last-Modified header are stored. On
+    the next request for the same URL those validators are sent back as
+    If-None-Match / If-Modified-Since, and a 304 answer is served from the
+    stored body, so an unchanged page costs headers instead of a transfer.
+    Entries are written atomically, so threads and processes can share a
+    cache directory.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Initialize the cache, creating its directory if needed.
+
+        Args:
+            directory (str): Cache directory, overridable with HTTP_CACHE_DIR
+        """
+        self.directory = directory or os.environ.get('HTTP_CACHE_DIR', DEFAULT_CACHE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(url):
+        """Return the cache key of a full URL, query string included."""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, url):
+        base = os.path.join(self.directory, self.key(url))
+        return base + '.json', base + '.body'
+
+    def get(self, url):
+        """
+        Load the stored response for a URL.
+
+        Returns:
+            dict: Metadata (url, status, headers, etag, last_modified, stored_at) with
+                the body under 'body', or None if the URL is not cached
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def validators(self, entry):
+        """Return the conditional request headers for a stored entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def set(self, url, status, headers, body):
+        """
+        Store a response if it can be revalidated later.
+
+        Args:
+            url (str): Full URL of the request
+            status (int): Response status code
+            headers (Mapping): Response headers
+            body (bytes): Response body
+
+        Returns:
+            bool: True if the response was stored
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if status != 200 or not (etag or last_modified) or 'no-store' in headers.get('Cache-Control', ''):
+            return False
+
+        entry = {
+            'url': url,
+            'status': status,
+            'headers': {name: value for name, value in headers.items()
+                        if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')},
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        }
+        meta_path, body_path = self._paths(url)
+        # Body first: a reader that finds the metadata always finds a complete body
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps(entry).encode('utf-8'))
+        return True
+
+    def _write(self, path, data):
+        """Write a file atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def clear(self):
+        """Delete every stored response."""
+        for name in os.listdir(self.directory):
+            if name.endswith(('.json', '.body')):
+                os.remove(os.path.join(self.directory, name))
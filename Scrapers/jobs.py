@@ -0,0 +1,299 @@
+# jobs.py
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .query_planner import PlanReport
+from .results import ResultSet
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while too many jobs are already waiting."""
+
+
+class Job:
+    """A single scrape run in the background, with its own results and progress."""
+
+    def __init__(self, params, timing=False, comments=None):
+        """
+        Initialize the job.
+
+        Args:
+            params (dict): Keyword arguments for RedditScraper.iter_posts
+            timing (bool): Collect a per-stage timing breakdown of the scrape
+            comments (dict): Optional comment harvest run once the scrape has finished:
+                max_posts (the most commented posts harvested) and keyword arguments
+                for RedditScraper.harvest_comments
+        """
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.comments = comments
+        self.status = QUEUED
+        self.error = None
+        # Compact, deduplicated posts, filled in by the scraper as they are extracted
+        self.results = ResultSet()
+        # Queries planned for the scrape and API calls actually made
+        self.plan = PlanReport()
+        # Time spent in each stage of this scrape, when requested
+        self.breakdown = metrics.Breakdown() if timing else None
+
+        self.queries_done = 0
+        self.queries_total = 0
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self.cancel_event = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def _update(self, **attributes):
+        """Set attributes and wake up anyone waiting on this job."""
+        with self._changed:
+            for name, value in attributes.items():
+                setattr(self, name, value)
+            self._changed.notify_all()
+
+    def notify(self):
+        """Wake up anyone waiting for new results."""
+        with self._changed:
+            self._changed.notify_all()
+
+    def set_progress(self, done, total):
+        """Record how many of the job's queries have completed."""
+        self._update(queries_done=done, queries_total=total)
+
+    def cancel(self):
+        """Ask the job to stop; queued jobs are cancelled before they start."""
+        self.cancel_event.set()
+        with self._changed:
+            if self.status == QUEUED:
+                self.status = CANCELLED
+                self.finished_at = time.time()
+            self._changed.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job has finished.
+
+        Returns:
+            bool: True if the job finished within the timeout
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: self.finished, timeout)
+
+    def iter_results(self, start=0, poll_interval=1.0, content_limit=None, include_content=True):
+        """
+        Yield the job's posts, waiting for new ones until the job has finished.
+
+        Args:
+            start (int): Index of the first post to yield
+            poll_interval (float): Maximum seconds to wait between checks
+            content_limit (int): Optional maximum length of every post's 'content'
+            include_content (bool): Leave 'content' out entirely when False
+
+        Yields:
+            dict: Scraped posts, in the order they were added
+        """
+        index = start
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: index < len(self.results) or self.finished, poll_interval)
+                batch = self.results.to_dicts(range(index, len(self.results)), content_limit=content_limit,
+                                              include_content=include_content)
+                finished = self.finished
+
+            for post in batch:
+                yield post
+            index += len(batch)
+
+            if finished and index >= len(self.results):
+                return
+
+    def to_dict(self):
+        """
+        Summarize the job's state.
+
+        Returns:
+            dict: Id, status, progress counters, timestamps and error
+        """
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'comments': self.comments,
+            'progress': {
+                'queries_done': self.queries_done,
+                'queries_total': self.queries_total,
+                'posts': len(self.results),
+                'duplicates': self.results.duplicates
+            },
+            'plan': self.plan.to_dict(),
+            'timing': self.breakdown.to_dict() if self.breakdown is not None else None,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """
+    Runs scrape jobs on a bounded pool of background workers.
+
+    Jobs and their results are kept in process memory. Once more than
+    max_jobs are held, the oldest finished jobs are discarded.
+    """
+
+    def __init__(self, scraper, max_workers=2, max_pending=50, max_jobs=100):
+        """
+        Initialize the job manager.
+
+        Args:
+            scraper (RedditScraper): Scraper the jobs run on
+            max_workers (int): Number of jobs run at the same time
+            max_pending (int): Maximum number of jobs waiting to start
+            max_jobs (int): Number of jobs kept before finished ones are discarded
+        """
+        self.scraper = scraper
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self.logger = logging.getLogger('scraper')
+
+    def submit(self, params, timing=False, comments=None):
+        """
+        Queue a scrape job.
+
+        Args:
+            params (dict): Keyword arguments for RedditScraper.iter_posts
+            timing (bool): Collect a per-stage timing breakdown of the scrape
+            comments (dict): Optional comment harvest options, see Job
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(params, timing, comments)
+        with self._lock:
+            pending = sum(1 for queued in self._jobs.values() if queued.status == QUEUED)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Too many scrape jobs waiting ({pending}), try again later")
+
+            self._jobs[job.id] = job
+            self._evict()
+
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None if it is unknown or was discarded."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self, status=SUCCEEDED):
+        """Return the most recently created job with the given status, if any."""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.status == status:
+                    return job
+        return None
+
+    def list(self):
+        """Return all known jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """
+        Cancel a job.
+
+        Returns:
+            Job: The job, or None if it is unknown
+        """
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def shutdown(self):
+        """Cancel every unfinished job and stop the workers."""
+        for job in self.list():
+            if not job.finished:
+                job.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _evict(self):
+        """Discard the oldest finished jobs beyond max_jobs."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job.id for job in self._jobs.values() if job.finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        """Execute a job on a worker thread."""
+        if job.cancel_event.is_set():
+            return
+
+        job._update(status=RUNNING, started_at=time.time())
+        self.logger.info(f"Starting scrape job {job.id}")
+        if job.breakdown is not None:
+            # Time the scrape itself, not the time the job spent queued
+            job.breakdown = metrics.Breakdown()
+
+        try:
+            # The scraper adds every new post to job.results itself
+            with metrics.use_breakdown(job.breakdown):
+                for _ in self.scraper.iter_posts(
+                    **job.params,
+                    cancelled=job.cancel_event,
+                    on_progress=job.set_progress,
+                    index=job.results,
+                    report=job.plan
+                ):
+                    job.notify()
+
+                if job.comments is not None and not job.cancel_event.is_set():
+                    self._harvest_comments(job)
+
+            status = CANCELLED if job.cancel_event.is_set() else SUCCEEDED
+            if job.breakdown is not None:
+                job.breakdown.finish()
+            job._update(status=status, finished_at=time.time())
+        except Exception as e:
+            self.logger.error(f"Scrape job {job.id} failed: {e}")
+            if job.breakdown is not None:
+                job.breakdown.finish()
+            job._update(status=FAILED, error=str(e), finished_at=time.time())
+
+        self.logger.info(f"Scrape job {job.id} {job.status} with {len(job.results)} posts")
+
+    def _harvest_comments(self, job):
+        """Attach comment sentiment to the job's most discussed posts."""
+        options = dict(job.comments)
+        max_posts = options.pop('max_posts', 25)
+        rows = job.results.order_by('comments', descending=True)[:max_posts]
+        self.scraper.harvest_comments(
+            [job.results.ids[row] for row in rows],
+            result_sets=[job.results],
+            cancelled=job.cancel_event,
+            **options
+        )
+        job.notify()
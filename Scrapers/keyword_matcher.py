@@ -0,0 +1,103 @@
+# keyword_matcher.py
+import string
+from collections import deque
+
+# Punctuation is turned into spaces so keywords match at word boundaries
+_PUNCTUATION_TABLE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+
+
+def normalize(text):
+    """Lowercase text, replace punctuation with spaces and collapse whitespace."""
+    return ' '.join(text.lower().translate(_PUNCTUATION_TABLE).split())
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton that finds every configured keyword in one pass.
+
+    Text and keywords are normalized the same way, and both are padded
+    with spaces, so "seo" matches "SEO tips" and "(seo)" but not "seoul",
+    and multi-word keywords match across any punctuation or whitespace.
+    Matching costs one pass over the text however many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        """
+        Build the automaton.
+
+        Args:
+            keywords (iterable): Keywords to look for; their original spelling is reported
+        """
+        self.keywords = []
+        # Each state is a dict of transitions; fail links and outputs are indexed by state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword in keywords:
+            pattern = normalize(keyword)
+            if pattern and keyword not in self.keywords:
+                self._add(f" {pattern} ", len(self.keywords))
+                self.keywords.append(keyword)
+
+        self._build_fail_links()
+
+    def _add(self, pattern, keyword_index):
+        """Add a pattern to the trie."""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (keyword_index,)
+
+    def _build_fail_links(self):
+        """Compute fail links breadth-first and merge the outputs they lead to."""
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """
+        Return the keywords that occur in a text.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            list: Matched keywords in configuration order
+        """
+        if not text or not self.keywords:
+            return []
+
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in f" {normalize(text)} ":
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return [self.keywords[index] for index in sorted(found)]
+
+    def match_post(self, title, content=''):
+        """Return the keywords that occur in a post's title or body."""
+        return self.find(f"{title}\n{content or ''}")
+
+    def __len__(self):
+        return len(self.keywords)
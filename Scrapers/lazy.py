@@ -0,0 +1,34 @@
+# lazy.py
+import importlib
+import threading
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def optional_import(name):
+    """
+    Import an optional module on first use and remember the outcome.
+
+    Heavy optional dependencies are imported through this instead of at
+    module level, so processes that never need them do not pay for the
+    import at startup.
+
+    Args:
+        name (str): Dotted module name, e.g. 'numpy' or 'pyarrow.parquet'
+
+    Returns:
+        module: The module, or None if it is not installed
+    """
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except ImportError:
+                _modules[name] = None
+        return _modules[name]
@@ -0,0 +1,331 @@
+# metrics.py
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from sub-millisecond stages to slow scrapes
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_local = threading.local()
+
+
+class Registry:
+    """
+    Process-wide collection of counters and histograms.
+
+    Metrics are rendered in the Prometheus text exposition format. When the
+    registry is disabled, recording is a single attribute check, so the
+    instrumented hot paths cost next to nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        """Return the counter called name, creating it on first use."""
+        return self._get(name, lambda: Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Return the histogram called name, creating it on first use."""
+        return self._get(name, lambda: Histogram(self, name, documentation, labelnames, buckets))
+
+    def _get(self, name, create):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = create()
+            return metric
+
+    def render(self):
+        """
+        Render every metric.
+
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return ''.join(metric.render() for metric in metrics)
+
+    def reset(self):
+        """Clear every recorded value."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+def _labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the counter for the given label values."""
+        if not self.registry.enabled:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Return the current count for the given label values."""
+        return self._values.get(tuple(labels.get(name, '') for name in self.labelnames), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}\n", f"# TYPE {self.name} counter\n"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}\n")
+        return ''.join(lines)
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels."""
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation for the given label values."""
+        if not self.registry.enabled:
+            return
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}\n", f"# TYPE {self.name} histogram\n"]
+        with self._lock:
+            values = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _labels(self.labelnames, key, ('le', _number(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}\n")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}\n")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}\n")
+        return ''.join(lines)
+
+
+class Breakdown:
+    """
+    Timing breakdown of one scrape, for returning alongside its results.
+
+    Stage times are summed across the worker threads of the scrape, so
+    with concurrent queries they can add up to more than the wall time.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.queries = []
+        self.started = time.perf_counter()
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        """Add one timed call of a stage."""
+        with self._lock:
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = [0.0, 0]
+            totals[0] += seconds
+            totals[1] += 1
+
+    def add_query(self, description, seconds, api_requests=0, posts=0, cached=False, local=False):
+        """Record one finished (subreddit, keyword) query."""
+        with self._lock:
+            self.queries.append({
+                'query': description,
+                'seconds': round(seconds, 6),
+                'api_requests': api_requests,
+                'posts': posts,
+                'cached': cached,
+                'local': local
+            })
+
+    def finish(self):
+        """Mark the end of the timed work."""
+        self.finished = time.perf_counter()
+
+    def to_dict(self):
+        """
+        Summarize the breakdown.
+
+        Returns:
+            dict: Wall time, total seconds and call count per stage, and per-query timings
+        """
+        end = self.finished if self.finished is not None else time.perf_counter()
+        with self._lock:
+            return {
+                'wall_seconds': round(end - self.started, 6),
+                'stages': {stage: {'seconds': round(seconds, 6), 'calls': calls}
+                           for stage, (seconds, calls) in sorted(self.stages.items())},
+                'queries': list(self.queries)
+            }
+
+
+class _Span:
+    __slots__ = ('stage', 'breakdown', 'start')
+
+    def __init__(self, stage, breakdown):
+        self.stage = stage
+        self.breakdown = breakdown
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        if self.breakdown is not None:
+            self.breakdown.add(self.stage, elapsed)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def current_breakdown():
+    """Return the breakdown collecting the current thread's timings, if any."""
+    return getattr(_local, 'breakdown', None)
+
+
+@contextmanager
+def use_breakdown(breakdown):
+    """Send the current thread's spans to a breakdown for the duration of the block."""
+    previous = getattr(_local, 'breakdown', None)
+    _local.breakdown = breakdown
+    try:
+        yield breakdown
+    finally:
+        _local.breakdown = previous
+
+
+def span(stage):
+    """
+    Time a block as one call of a stage.
+
+    The time goes to the scraper_stage_seconds histogram and to the
+    current thread's breakdown. With metrics disabled and no breakdown
+    active, a shared no-op context manager is returned.
+
+    Args:
+        stage (str): Stage name, e.g. 'extract' or 'sentiment'
+
+    Returns:
+        context manager: The span
+    """
+    breakdown = getattr(_local, 'breakdown', None)
+    if breakdown is None and not registry.enabled:
+        return _NOOP
+    return _Span(stage, breakdown)
+
+
+def record_stage(stage, seconds):
+    """Record an already measured call of a stage, like span does."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    breakdown = getattr(_local, 'breakdown', None)
+    if breakdown is not None:
+        breakdown.add(stage, seconds)
+
+
+def record_query(description, seconds, api_requests=0, posts=0, cached=False, local=False, looked_up=False):
+    """
+    Record a finished (subreddit, keyword) query in the histograms and the current breakdown.
+
+    Cache hits and misses are only counted when the query cache was consulted (looked_up);
+    scrapers without a cache, refreshes and incremental runs skip it.
+    """
+    if local:
+        # Local-first queries bypass the query cache
+        QUERY_SECONDS.observe(seconds, source='store')
+    else:
+        QUERY_SECONDS.observe(seconds, source='cache' if cached else 'api')
+        if looked_up or cached:
+            QUERY_CACHE.inc(result='hit' if cached else 'miss')
+    breakdown = getattr(_local, 'breakdown', None)
+    if breakdown is not None:
+        breakdown.add_query(description, seconds, api_requests, posts, cached, local)
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    'scraper_stage_seconds', 'Time spent in each scrape stage.', ['stage'])
+QUERY_SECONDS = registry.histogram(
+    'scraper_query_seconds', 'Duration of (subreddit, keyword) queries.', ['source'])
+QUERY_CACHE = registry.counter(
+    'scraper_query_cache_total', 'Query cache lookups by result.', ['result'])
+POSTS_EXTRACTED = registry.counter(
+    'scraper_posts_extracted_total', 'Submissions extracted into posts.')
+API_REQUESTS = registry.counter(
+    'scraper_api_requests_total', 'Reddit API requests by response status.', ['status'])
+API_RETRIES = registry.counter(
+    'scraper_api_retries_total', 'Reddit API requests that failed in a way PRAW retries.')
+API_RATE_LIMITED = registry.counter(
+    'scraper_api_rate_limited_total', 'Reddit API responses with status 429.')
+API_REQUEST_SECONDS = registry.histogram(
+    'scraper_api_request_seconds', 'Latency of Reddit API requests, excluding rate limit waits.')
+API_WAIT_SECONDS = registry.histogram(
+    'scraper_api_wait_seconds', 'Time API requests waited for rate limit budget.')
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'app_request_seconds', 'Latency of HTTP requests served by the app.', ['endpoint', 'method', 'status'])
@@ -0,0 +1,386 @@
+# post_store.py
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = 'posts.sqlite3'
+
+# Columns of a stored post, in the order used by every query
+POST_COLUMNS = (
+    'id', 'title', 'content', 'url', 'subreddit', 'upvotes', 'comments', 'date', 'keyword', 'sentiment'
+)
+
+# ORDER BY clause of each local search sort; relevance falls back to new without a keyword
+SEARCH_ORDERS = {
+    'relevance': 'bm25(posts_fts), p.date DESC',
+    'new': 'p.date DESC',
+    'top': 'p.upvotes DESC, p.date DESC',
+    'hot': 'p.upvotes DESC, p.date DESC',
+    'comments': 'p.comments DESC, p.date DESC'
+}
+
+
+def match_expression(keyword):
+    """Turn a keyword into an FTS5 phrase query, so punctuation and operators are matched literally."""
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+class PostStore:
+    """
+    Durable SQLite store for scraped posts, keyed by Reddit submission id.
+
+    Re-scraped posts only have their score and comment count updated. The
+    store also keeps a per-(subreddit, keyword) high-water mark on
+    created_utc so recurring jobs can stop paging at posts they have
+    already seen.
+
+    Titles and bodies are indexed with SQLite FTS5 for local keyword
+    searches, and the coverage table records which time ranges of a
+    (subreddit, keyword) pair are known to be completely stored, so a
+    repeat query can be answered without asking Reddit. Without FTS5 the
+    search falls back to a LIKE scan.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path or os.environ.get('POST_STORE_PATH', DEFAULT_DB_PATH)
+        self._local = threading.local()
+        self.full_text = True
+        self._create_schema()
+
+    def _connection(self):
+        """Return the SQLite connection owned by the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        """Create the posts, full-text index, high-water mark and coverage tables if they do not exist."""
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS posts (
+                    id TEXT PRIMARY KEY,
+                    title TEXT,
+                    content TEXT,
+                    url TEXT,
+                    subreddit TEXT,
+                    upvotes INTEGER,
+                    comments INTEGER,
+                    date REAL,
+                    keyword TEXT,
+                    sentiment REAL,
+                    first_seen REAL,
+                    last_seen REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS posts_subreddit_date ON posts (subreddit, date)')
+            conn.execute('CREATE INDEX IF NOT EXISTS posts_subreddit_nocase_date ON posts (subreddit COLLATE NOCASE, date)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS high_water_marks (
+                    subreddit TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    created_utc REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (subreddit, keyword)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS coverage (
+                    subreddit TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    covered_from REAL NOT NULL,
+                    covered_until REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (subreddit, keyword)
+                )
+            ''')
+        self._create_full_text_index()
+
+    def _create_full_text_index(self):
+        """Create the FTS5 index over titles and bodies, filling it from existing posts the first time."""
+        conn = self._connection()
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+        ).fetchone()
+        try:
+            with conn:
+                # The post id is stored rather than shared as the rowid, which VACUUM may renumber
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                        id UNINDEXED, title, content, tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+                        INSERT INTO posts_fts (id, title, content) VALUES (new.id, new.title, new.content);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF title, content ON posts BEGIN
+                        UPDATE posts_fts SET title = new.title, content = new.content WHERE id = old.id;
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+                        DELETE FROM posts_fts WHERE id = old.id;
+                    END
+                ''')
+                if not exists:
+                    conn.execute('INSERT INTO posts_fts (id, title, content) SELECT id, title, content FROM posts')
+        except sqlite3.OperationalError:
+            # SQLite was built without FTS5
+            self.full_text = False
+
+    def upsert_posts(self, posts):
+        """
+        Insert new posts and refresh the score and comment count of known ones.
+
+        Args:
+            posts (list): Post dicts as produced by RedditScraper
+
+        Returns:
+            int: Number of posts that were not stored before
+        """
+        posts = [post for post in posts if post.get('id')]
+        if not posts:
+            return 0
+
+        known = self._existing_ids([post['id'] for post in posts])
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                '''
+                INSERT INTO posts (
+                    id, title, content, url, subreddit, upvotes, comments, date, keyword, sentiment,
+                    first_seen, last_seen
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    upvotes = excluded.upvotes,
+                    comments = excluded.comments,
+                    last_seen = excluded.last_seen
+                ''',
+                [tuple(post.get(column) for column in POST_COLUMNS) + (now, now) for post in posts]
+            )
+
+        return len({post['id'] for post in posts} - known)
+
+    def _existing_ids(self, ids):
+        """Return the subset of ids that are already stored."""
+        known = set()
+        conn = self._connection()
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(f"SELECT id FROM posts WHERE id IN ({placeholders})", chunk)
+            known.update(row['id'] for row in rows)
+        return known
+
+    def get_posts(self, ids):
+        """
+        Load stored posts by submission id.
+
+        Args:
+            ids (iterable): Submission ids
+
+        Returns:
+            list: Post dicts for the ids that are stored
+        """
+        ids = list(ids)
+        posts = []
+        conn = self._connection()
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT {', '.join(POST_COLUMNS)} FROM posts WHERE id IN ({placeholders})",
+                chunk
+            )
+            posts.extend(dict(row) for row in rows)
+        return posts
+
+    def update_metrics(self, metrics):
+        """
+        Update the score and comment count of stored posts.
+
+        Args:
+            metrics (dict): {id: {'upvotes': int, 'comments': int}}
+        """
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                'UPDATE posts SET upvotes = ?, comments = ?, last_seen = ? WHERE id = ?',
+                [(values['upvotes'], values['comments'], now, post_id) for post_id, values in metrics.items()]
+            )
+
+    def ids(self, since=None):
+        """
+        Return the ids of stored posts.
+
+        Args:
+            since (float): Only return posts created at or after this timestamp
+
+        Returns:
+            list: Submission ids, newest first
+        """
+        rows = self._connection().execute(
+            'SELECT id FROM posts WHERE date >= ? ORDER BY date DESC',
+            (since if since is not None else float('-inf'),)
+        )
+        return [row['id'] for row in rows]
+
+    def iter_posts(self, since=None, batch_size=1000):
+        """
+        Yield stored posts without loading the whole table.
+
+        Args:
+            since (float): Only yield posts created at or after this timestamp
+            batch_size (int): Rows fetched from SQLite at a time
+
+        Yields:
+            dict: Stored posts, newest first
+        """
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(POST_COLUMNS)} FROM posts WHERE date >= ? ORDER BY date DESC",
+            (since if since is not None else float('-inf'),)
+        )
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
+    def get_high_water(self, subreddit, keyword=''):
+        """
+        Return the newest created_utc seen for a (subreddit, keyword) pair.
+
+        Returns:
+            float: created_utc of the newest stored post, or None if never scraped
+        """
+        row = self._connection().execute(
+            'SELECT created_utc FROM high_water_marks WHERE subreddit = ? AND keyword = ?',
+            ((subreddit or '').lower(), (keyword or '').lower())
+        ).fetchone()
+        return row['created_utc'] if row else None
+
+    def set_high_water(self, subreddit, keyword, created_utc):
+        """Advance the high-water mark of a (subreddit, keyword) pair; it never moves back."""
+        with self._connection() as conn:
+            conn.execute(
+                '''
+                INSERT INTO high_water_marks (subreddit, keyword, created_utc, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (subreddit, keyword) DO UPDATE SET
+                    created_utc = MAX(created_utc, excluded.created_utc),
+                    updated_at = excluded.updated_at
+                ''',
+                ((subreddit or '').lower(), (keyword or '').lower(), created_utc, time.time())
+            )
+
+    def search(self, keyword='', subreddit=None, since=None, until=None, sort='new', limit=100):
+        """
+        Find stored posts by keyword with the full-text index.
+
+        Args:
+            keyword (str): Phrase matched against titles and bodies; every post matches if empty
+            subreddit (str): Only posts from this subreddit, case-insensitively; 'all' or None for any
+            since (float): Only posts created at or after this timestamp
+            until (float): Only posts created at or before this timestamp
+            sort (str): relevance (BM25 rank), new, top, hot (approximated by score) or comments
+            limit (int): Maximum number of posts returned
+
+        Returns:
+            list: Post dicts in sort order
+        """
+        conditions, params = [], []
+        use_index = bool(keyword) and self.full_text
+        if use_index:
+            conditions.append('posts_fts MATCH ?')
+            params.append(match_expression(keyword))
+        elif keyword:
+            conditions.append("(p.title LIKE ? ESCAPE '\\' OR p.content LIKE ? ESCAPE '\\')")
+            pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            params.extend((pattern, pattern))
+        if subreddit and subreddit.lower() != 'all':
+            conditions.append('p.subreddit = ? COLLATE NOCASE')
+            params.append(subreddit)
+        if since is not None:
+            conditions.append('p.date >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('p.date <= ?')
+            params.append(until)
+
+        order = SEARCH_ORDERS.get(sort, SEARCH_ORDERS['new'])
+        if not use_index and sort == 'relevance':
+            order = SEARCH_ORDERS['new']
+        source = 'posts_fts f JOIN posts p ON p.id = f.id' if use_index else 'posts p'
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        rows = self._connection().execute(
+            f"SELECT {', '.join('p.' + column for column in POST_COLUMNS)} FROM {source} {where} "
+            f"ORDER BY {order} LIMIT ?",
+            params + [limit]
+        )
+        return [dict(row) for row in rows]
+
+    def get_coverage(self, subreddit, keyword=''):
+        """
+        Return the time range in which every post of a (subreddit, keyword) pair is stored.
+
+        Returns:
+            tuple: (covered_from, covered_until) created_utc bounds, or None if nothing is covered
+        """
+        row = self._connection().execute(
+            'SELECT covered_from, covered_until FROM coverage WHERE subreddit = ? AND keyword = ?',
+            ((subreddit or '').lower(), (keyword or '').lower())
+        ).fetchone()
+        return (row['covered_from'], row['covered_until']) if row else None
+
+    def add_coverage(self, subreddit, keyword, covered_from, covered_until):
+        """
+        Record that every post of a (subreddit, keyword) pair created in a time range is stored.
+
+        Overlapping ranges are merged. A range that does not touch the
+        recorded one replaces it if it is newer and is ignored otherwise,
+        so the coverage always stays one contiguous range.
+        """
+        with self._connection() as conn:
+            conn.execute(
+                '''
+                INSERT INTO coverage (subreddit, keyword, covered_from, covered_until, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (subreddit, keyword) DO UPDATE SET
+                    covered_from = CASE
+                        WHEN excluded.covered_from > covered_until THEN excluded.covered_from
+                        WHEN excluded.covered_until < covered_from THEN covered_from
+                        ELSE MIN(covered_from, excluded.covered_from)
+                    END,
+                    covered_until = CASE
+                        WHEN excluded.covered_until < covered_from THEN covered_until
+                        ELSE MAX(covered_until, excluded.covered_until)
+                    END,
+                    updated_at = excluded.updated_at
+                ''',
+                ((subreddit or '').lower(), (keyword or '').lower(), covered_from, covered_until, time.time())
+            )
+
+    def count(self):
+        """Return the number of stored posts."""
+        return self._connection().execute('SELECT COUNT(*) FROM posts').fetchone()[0]
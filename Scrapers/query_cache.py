@@ -0,0 +1,127 @@
+# query_cache.py
+import threading
+import time
+
+from cachetools import TLRUCache
+
+# How long results stay fresh for each time filter, in seconds
+TIME_FILTER_TTLS = {
+    'hour': 120,
+    'day': 600,
+    'week': 1800,
+    'month': 3600,
+    'year': 6 * 3600,
+    'all': 12 * 3600
+}
+
+# Listings ordered by recency change constantly whatever the time filter
+VOLATILE_SORTS = ('hot', 'new')
+
+
+class QueryCache:
+    """
+    Size-bounded cache of per-query results with time_filter-dependent TTLs.
+
+    Entries are keyed on (kind, subreddit, keyword, sort, time_filter) and
+    remember the post_limit they were fetched with, so a later query asking
+    for the same or fewer posts is served from the cache. Least recently
+    used entries are evicted once maxsize is reached.
+    """
+
+    def __init__(self, maxsize=512, ttls=None, default_ttl=600):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of cached queries
+            ttls (dict): Optional TTL overrides per time filter, in seconds
+            default_ttl (float): TTL for unknown time filters, in seconds
+        """
+        self.ttls = dict(TIME_FILTER_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._expires_at, timer=time.monotonic)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def make_key(kind, subreddit, keyword, sort, time_filter):
+        """Build the cache key for a single query."""
+        return (kind, (subreddit or '').lower(), (keyword or '').lower(), sort, time_filter)
+
+    def ttl_for(self, key):
+        """Return the TTL in seconds for a cache key."""
+        sort, time_filter = key[3], key[4]
+        if sort in VOLATILE_SORTS:
+            return self.ttls['hour']
+        return self.ttls.get(time_filter, self.default_ttl)
+
+    def _expires_at(self, key, value, now):
+        return now + self.ttl_for(key)
+
+    def get(self, key, limit):
+        """
+        Look up cached posts for a query.
+
+        Args:
+            key (tuple): Key from make_key
+            limit (int): Number of posts requested
+
+        Returns:
+            list: Copies of the cached posts, or None on a miss
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+
+            # Usable if it was fetched with at least this limit or the listing ran out
+            if entry is not None:
+                fetched_limit, posts = entry
+                if limit <= fetched_limit or len(posts) < fetched_limit:
+                    self.hits += 1
+                    return [dict(post) for post in posts[:limit]]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, limit, posts):
+        """
+        Store the posts returned by a query.
+
+        Args:
+            key (tuple): Key from make_key
+            limit (int): post_limit the query was run with
+            posts (list): Posts returned by the query
+        """
+        with self._lock:
+            self._cache[key] = (limit, [dict(post) for post in posts])
+
+    def record_refresh(self):
+        """Count a lookup that was skipped because the caller asked for fresh data."""
+        with self._lock:
+            self.refreshes += 1
+
+    def clear(self):
+        """Remove every cached query."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Size, capacity, hits, misses, refreshes and hit rate
+        """
+        with self._lock:
+            self._cache.expire()
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'maxsize': self._cache.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
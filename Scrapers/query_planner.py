@@ -0,0 +1,129 @@
+# query_planner.py
+import threading
+
+# Reddit rejects search queries longer than 512 characters
+MAX_QUERY_LENGTH = 512
+
+# Listings and searches can be paged through at most 1000 results, 100 per request
+MAX_PACKED_LIMIT = 1000
+PAGE_SIZE = 100
+
+# Subreddits combined into one "a+b+c" multireddit
+MAX_MULTIREDDIT_SIZE = 50
+
+
+def or_query(keywords):
+    """
+    Combine keywords into one Reddit search query.
+
+    Multi-word keywords are quoted so they are searched as phrases.
+
+    Returns:
+        str: e.g. '"email marketing" OR seo'
+    """
+    terms = []
+    for keyword in keywords:
+        keyword = keyword.replace('"', '')
+        terms.append(f'"{keyword}"' if ' ' in keyword else keyword)
+    return ' OR '.join(terms)
+
+
+def _pack(items, max_items, max_length=None, render=None):
+    """Greedily split items into groups of at most max_items whose rendering fits max_length."""
+    groups = []
+    group = []
+    for item in items:
+        candidate = group + [item]
+        too_long = max_length is not None and len(render(candidate)) > max_length
+        if group and (len(candidate) > max_items or too_long):
+            groups.append(group)
+            candidate = [item]
+        group = candidate
+    if group:
+        groups.append(group)
+    return groups
+
+
+def plan_groups(keyword_list, subreddit_list, post_limit):
+    """
+    Pack keywords into OR searches and subreddits into multireddits.
+
+    Every (subreddit, keyword) pair of a packed query may still return up
+    to post_limit posts, so a query covers at most
+    MAX_PACKED_LIMIT // post_limit pairs. Keywords are packed first, then
+    subreddits fill the pairs left over. Pairs wanting a page or more of
+    posts each save no requests by sharing pages, so they are not packed.
+
+    Args:
+        keyword_list (list): Keywords; empty for subreddit listings
+        subreddit_list (list): Subreddits; empty for searches across all of Reddit
+        post_limit (int): Posts wanted per (subreddit, keyword) pair
+
+    Returns:
+        list: (subreddits, keywords) groups, one per API query
+    """
+    max_pairs = max(1, MAX_PACKED_LIMIT // max(1, post_limit)) if post_limit < PAGE_SIZE else 1
+
+    keyword_groups = _pack(keyword_list, max_pairs, MAX_QUERY_LENGTH, or_query) if keyword_list else [[]]
+
+    groups = []
+    for keywords in keyword_groups:
+        if not subreddit_list:
+            groups.append((['all'], keywords))
+            continue
+        per_query = max(1, min(MAX_MULTIREDDIT_SIZE, max_pairs // max(1, len(keywords))))
+        groups.extend((subreddits, keywords) for subreddits in _pack(subreddit_list, per_query))
+    return groups
+
+
+class PlanReport:
+    """Counts of the queries a scrape planned and the API calls it actually made."""
+
+    def __init__(self, unpacked_queries=0, planned_queries=0, collapsed=False):
+        """
+        Initialize the report.
+
+        Args:
+            unpacked_queries (int): Queries one search per (subreddit, keyword) pair would issue
+            planned_queries (int): Queries in the plan
+            collapsed (bool): Whether keywords and subreddits were packed
+        """
+        self.unpacked_queries = unpacked_queries
+        self.planned_queries = planned_queries
+        self.collapsed = collapsed
+        self.executed_queries = 0
+        self.cached_queries = 0
+        self.local_queries = 0
+        self.api_requests = 0
+        self.unattributed_posts = 0
+        self._lock = threading.Lock()
+
+    def record(self, cached=False, api_requests=0, unattributed_posts=0, local=False):
+        """Record one finished query; local queries answered from the post store may still make API requests."""
+        with self._lock:
+            if cached:
+                self.cached_queries += 1
+            elif local:
+                self.local_queries += 1
+            else:
+                self.executed_queries += 1
+            self.api_requests += api_requests
+            self.unattributed_posts += unattributed_posts
+
+    def to_dict(self):
+        """
+        Summarize the report.
+
+        Returns:
+            dict: Planned and executed query counts and API requests made
+        """
+        return {
+            'collapsed': self.collapsed,
+            'unpacked_queries': self.unpacked_queries,
+            'planned_queries': self.planned_queries,
+            'executed_queries': self.executed_queries,
+            'cached_queries': self.cached_queries,
+            'local_queries': self.local_queries,
+            'api_requests': self.api_requests,
+            'unattributed_posts': self.unattributed_posts
+        }
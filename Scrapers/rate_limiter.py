@@ -0,0 +1,275 @@
+# rate_limiter.py
+import email.utils
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BATCH = 'batch'
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'reddit_rate_limit.sqlite3')
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value (str): Seconds to wait, or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket for Reddit API calls shared by every thread and process on a host.
+
+    The bucket lives in a small SQLite database so gunicorn workers and batch
+    jobs using the same OAuth client draw from one budget. Reddit reports the
+    remaining budget in the X-Ratelimit-* response headers; those values cap
+    the bucket and set its refill rate so the remaining budget is spread
+    evenly until the window resets. Batch callers leave a reserve of tokens
+    untouched so interactive requests are served first.
+    """
+
+    def __init__(self, key, path=None, capacity=100, refill_rate=100 / 60, batch_reserve=0.2):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            key (str): Budget identifier, usually the OAuth client id
+            path (str): SQLite database shared between processes
+            capacity (int): Maximum burst of requests
+            refill_rate (float): Tokens added per second when Reddit has not reported a budget
+            batch_reserve (float): Fraction of the budget batch callers may not consume
+        """
+        self.key = key or 'default'
+        self.path = path or os.environ.get('REDDIT_RATE_LIMIT_DB', DEFAULT_DB_PATH)
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.batch_reserve = float(batch_reserve)
+
+        self._local = threading.local()
+        self._interactive_waiting = 0
+        self._waiting_lock = threading.Lock()
+        self.logger = logging.getLogger('scraper')
+
+        self._create_schema()
+
+    def _connection(self):
+        """Return the SQLite connection owned by the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        """Create the bucket table and this key's row if they do not exist."""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limit (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                rate REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                remaining REAL,
+                reset_at REAL
+            )
+        ''')
+        conn.execute(
+            'INSERT OR IGNORE INTO rate_limit (key, tokens, rate, updated_at) VALUES (?, ?, ?, ?)',
+            (self.key, self.capacity, self.refill_rate, time.time())
+        )
+
+    def _load(self, conn, now):
+        """Load the bucket row and apply refill and window expiry."""
+        tokens, rate, updated_at, remaining, reset_at = conn.execute(
+            'SELECT tokens, rate, updated_at, remaining, reset_at FROM rate_limit WHERE key = ?',
+            (self.key,)
+        ).fetchone()
+
+        # Reddit's window has rolled over, so its last report no longer applies
+        if reset_at is not None and now >= reset_at:
+            remaining, reset_at, rate = None, None, self.refill_rate
+
+        tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * rate)
+        return tokens, rate, remaining, reset_at
+
+    def _reserve_for(self, priority):
+        """Return how many tokens a caller of this priority must leave untouched."""
+        if priority == PRIORITY_BATCH:
+            return self.capacity * self.batch_reserve
+        return 0.0
+
+    def try_acquire(self, priority=PRIORITY_INTERACTIVE):
+        """
+        Take one token if the budget allows it.
+
+        Args:
+            priority (str): PRIORITY_INTERACTIVE or PRIORITY_BATCH
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one should be available
+        """
+        reserve = self._reserve_for(priority)
+        conn = self._connection()
+        now = time.time()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            tokens, rate, remaining, reset_at = self._load(conn, now)
+
+            if remaining is not None and remaining - 1 < reserve:
+                wait_time = max(reset_at - now, 0.05)
+            elif tokens - 1 < reserve:
+                wait_time = (1 + reserve - tokens) / max(rate, 1e-6)
+            else:
+                tokens -= 1
+                if remaining is not None:
+                    remaining -= 1
+                wait_time = 0.0
+
+            conn.execute(
+                'UPDATE rate_limit SET tokens = ?, rate = ?, updated_at = ?, remaining = ?, reset_at = ? '
+                'WHERE key = ?',
+                (tokens, rate, now, remaining, reset_at, self.key)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return wait_time
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Block until a token is available and take it.
+
+        Batch callers also wait while interactive callers in this process are queued.
+
+        Args:
+            priority (str): PRIORITY_INTERACTIVE or PRIORITY_BATCH
+            timeout (float): Optional maximum number of seconds to wait
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = time.monotonic()
+        interactive = priority != PRIORITY_BATCH
+        if interactive:
+            with self._waiting_lock:
+                self._interactive_waiting += 1
+
+        try:
+            while True:
+                if interactive or not self._interactive_waiting:
+                    wait_time = self.try_acquire(priority)
+                    if wait_time == 0:
+                        return time.monotonic() - start
+                else:
+                    wait_time = 0.05
+
+                if timeout is not None and time.monotonic() - start + wait_time > timeout:
+                    raise TimeoutError(f"Reddit rate limit budget for '{self.key}' exhausted")
+
+                # Re-check regularly; other processes may update the shared budget
+                time.sleep(min(wait_time, 1.0))
+        finally:
+            if interactive:
+                with self._waiting_lock:
+                    self._interactive_waiting -= 1
+
+    def update(self, remaining, reset_seconds):
+        """
+        Record the budget reported by Reddit.
+
+        Args:
+            remaining (float): Requests left in the current window
+            reset_seconds (float): Seconds until the window resets
+        """
+        conn = self._connection()
+        now = time.time()
+        remaining = max(0.0, float(remaining))
+        reset_seconds = max(1.0, float(reset_seconds))
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            tokens, _, _, _ = self._load(conn, now)
+            # Spread what is left evenly over the rest of the window
+            rate = remaining / reset_seconds
+            conn.execute(
+                'UPDATE rate_limit SET tokens = ?, rate = ?, updated_at = ?, remaining = ?, reset_at = ? '
+                'WHERE key = ?',
+                (min(tokens, remaining), rate, now, remaining, now + reset_seconds, self.key)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def update_from_headers(self, headers, status_code=200):
+        """
+        Update the budget from a Reddit API response.
+
+        Args:
+            headers (Mapping): Response headers
+            status_code (int): Response status code
+        """
+        remaining = headers.get('x-ratelimit-remaining')
+        reset = headers.get('x-ratelimit-reset')
+
+        if status_code == 429:
+            # Retry-After may be an HTTP date; a malformed one falls back to the reset header
+            retry_after = parse_retry_after(headers.get('retry-after'))
+            if retry_after is None:
+                try:
+                    retry_after = float(reset)
+                except (TypeError, ValueError):
+                    retry_after = 60
+            self.logger.warning(f"Reddit rate limit hit for '{self.key}', backing off {retry_after:.0f}s")
+            self.update(0, retry_after)
+        elif remaining is not None and reset is not None:
+            try:
+                self.update(remaining, reset)
+            except ValueError:
+                self.logger.debug(f"Ignoring malformed rate limit headers: {remaining!r}, {reset!r}")
+
+    def status(self):
+        """
+        Return the current state of the shared budget.
+
+        Returns:
+            dict: tokens, rate, remaining and reset_at for this key
+        """
+        conn = self._connection()
+        tokens, rate, remaining, reset_at = self._load(conn, time.time())
+        return {
+            'tokens': tokens,
+            'rate': rate,
+            'remaining': remaining,
+            'reset_at': reset_at
+        }
+
+
+def __getattr__(name):
+    # The requestor needs prawcore, which is only imported once a Reddit client is built
+    if name == 'RateLimitedRequestor':
+        from .requestor import RateLimitedRequestor
+        return RateLimitedRequestor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,88 @@
-import praw
+import queue
+import threading
 import time
-from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from . import metrics, sentiment
+from .comments import CommentBudget, harvest_tree
+from .keyword_matcher import KeywordMatcher
+from .query_cache import QueryCache
+from .query_planner import MAX_MULTIREDDIT_SIZE, MAX_PACKED_LIMIT, PAGE_SIZE, PlanReport, or_query, plan_groups
+from .rate_limiter import RateLimiter, PRIORITY_INTERACTIVE
+from .results import ResultSet
+
+# A single API query: a log description, the method and arguments that run it,
+# the key and post limit used to cache its results, the (subreddit, keyword)
+# high-water marks it advances in incremental mode, the subreddit and keyword
+# its posts are attributed to, and the (subreddit, keyword, sort, time_filter, since)
+# it can prove stored coverage for
+Query = namedtuple('Query', [
+    'description', 'method', 'args', 'cache_key', 'limit', 'watermarks', 'subreddit', 'keyword', 'coverage'
+], defaults=(None,))
+
+# Length of each time filter's window in seconds, rounded up; None reaches back to the first post
+TIME_FILTER_WINDOWS = {
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 31 * 86400,
+    'year': 366 * 86400,
+    'all': None
+}
+
+# Sorts a local-first scrape can reproduce from the post store
+LOCAL_SORTS = ('relevance', 'new', 'top', 'comments')
+
+# How old stored coverage may be before a local-first query also fetches newer posts, in seconds
+LOCAL_MAX_AGE = 3600
+
+# Outcome of each credential check made by this process: (credentials, live) -> error message or None
+_credential_checks = {}
+_credential_lock = threading.Lock()
 
 class RedditScraper:
     """Scraper for Reddit content using official PRAW library."""
     
-    def __init__(self, client_id, client_secret, user_agent):
-        """Initialize the Reddit scraper with API credentials."""
-        self.reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent
-        )
+    def __init__(self, client_id, client_secret, user_agent, max_workers=8, rate_limiter=None,
+                 priority=PRIORITY_INTERACTIVE, cache=None, store=None, client_factory=None, lazy=True,
+                 analytics=None):
+        """
+        Initialize the Reddit scraper with API credentials.
+        
+        Args:
+            client_id (str): Reddit API client id
+            client_secret (str): Reddit API client secret
+            user_agent (str): User agent sent with every API request
+            max_workers (int): Maximum number of queries run concurrently
+            rate_limiter (RateLimiter): Shared API budget; one keyed on client_id is created if omitted
+            priority (str): Priority of this scraper's API calls (interactive or batch)
+            cache (QueryCache): Optional per-query result cache
+            store (PostStore): Optional durable store every scraped post is saved to
+            client_factory (callable): Optional stand-in for praw.Reddit, called with the
+                requestor kwargs (rate_limiter, priority, on_request) to build each thread's client
+            lazy (bool): Import praw and build clients on first use; otherwise the calling
+                thread's client is built straight away
+            analytics (TrendIndex): Optional trend aggregates every scraped post is counted in
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_agent = user_agent
+        self.max_workers = max(1, int(max_workers or 1))
+        self.rate_limiter = rate_limiter or RateLimiter(client_id)
+        self.priority = priority
+        self.cache = cache
+        self.store = store
+        self.client_factory = client_factory
+        self.analytics = analytics
+        
+        # PRAW instances are not thread-safe, so every worker thread gets its own
+        self._local = threading.local()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
+        if not lazy:
+            self._client()
         self.results = []
         
         # Configure logging
@@ -22,7 +93,9 @@ class RedditScraper:
         )
         self.logger = logging.getLogger('scraper')
     
-    def scrape_reddit(self, keywords=None, subreddits=None, post_limit=100, time_filter="month", sort="relevance"):
+    def scrape_reddit(self, keywords=None, subreddits=None, post_limit=100, time_filter="month", sort="relevance",
+                      max_workers=None, use_cache=True, refresh=False, incremental=False, collapse=False,
+                      local_first=False, max_age=LOCAL_MAX_AGE):
         """
         Scrape Reddit posts based on keywords and subreddits using PRAW.
         
@@ -32,42 +105,894 @@ class RedditScraper:
             post_limit (int): Maximum number of posts to retrieve per keyword/subreddit
             time_filter (str): Time filter for results (hour, day, week, month, year, all)
             sort (str): Sort method (relevance, hot, new, top, comments)
+            max_workers (int): Optional cap on concurrent queries for this call
+            use_cache (bool): Read and populate the query cache, if one is configured
+            refresh (bool): Skip cached results but store the freshly fetched ones
+            incremental (bool): Only fetch posts newer than the last run, using the post store's
+                high-water marks. Results are always sorted by new in this mode.
+            collapse (bool): Pack keywords into OR searches and subreddits into multireddits,
+                then attribute each post to the keywords and subreddit it matches. Each pair still
+                keeps up to post_limit posts, but relevance ranking is shared by the packed
+                keywords. Saves requests when post_limit is under a page (100 posts); see
+                self.plan_report for the savings.
+            local_first (bool): Answer queries from the post store's full-text index when its
+                coverage reaches back over the whole time_filter window, fetching only posts
+                newer than the coverage from the API once it is older than max_age. Relevance
+                is approximated by BM25 rank. Cannot be combined with incremental or collapse.
+            max_age (float): Seconds stored coverage stays fresh in local-first mode
             
         Returns:
-            list: List of scraped posts
+            ResultSet: Scraped posts, one per submission, in the order they were first found.
+                It indexes and iterates like a list of post dicts, materializing each one as it
+                is read. Posts matched by several queries carry every match in
+                'matched_keywords' and 'matched_subreddits'.
         """
         self.results = []
         
+        queries, cache, report = self._prepare(keywords, subreddits, post_limit, time_filter, sort, use_cache,
+                                               incremental, collapse, local_first=local_first, max_age=max_age)
+        index = ResultSet()
+        # Queries only feed the result set, so no per-query list outlives its query
+        self._run_queries(queries, max_workers, cache, refresh, index=index, report=report)
+        self.results = index
+        
+        self.dedup_stats = index.stats()
+        self.plan_report = report
+        if index.duplicates:
+            self.logger.info(f"Collapsed {index.duplicates} duplicate posts into {len(index)} unique posts")
+        
+        return self.results
+    
+    def iter_posts(self, keywords=None, subreddits=None, post_limit=100, time_filter="month", sort="relevance",
+                   max_workers=None, use_cache=True, refresh=False, incremental=False, collapse=False,
+                   local_first=False, max_age=LOCAL_MAX_AGE, buffer_size=256, cancelled=None, on_progress=None,
+                   index=None, report=None):
+        """
+        Yield posts as soon as they are extracted instead of returning them all at the end.
+        
+        Takes the same arguments as scrape_reddit. Queries run concurrently on
+        the worker pool and posts arrive in completion order. Nothing is kept
+        in self.results, and workers pause once buffer_size posts are waiting
+        for the consumer. Closing the generator early cancels the remaining
+        queries.
+        
+        Args:
+            buffer_size (int): Maximum number of extracted posts waiting to be consumed
+            cancelled (threading.Event): Optional event that cancels the scrape when set
+            on_progress (callable): Optional callback receiving (queries_done, queries_total)
+            index (ResultSet): Optional result set that collapses duplicates and keeps the
+                merged records; pass one to read them and their statistics afterwards
+            report (PlanReport): Optional report filled in with planned and executed queries
+            
+        Yields:
+            dict: Scraped posts, each submission once
+        """
+        queries, cache, report = self._prepare(keywords, subreddits, post_limit, time_filter, sort, use_cache,
+                                               incremental, collapse, report, local_first, max_age)
+        index = index if index is not None else ResultSet()
+        
+        buffer = queue.Queue(maxsize=buffer_size)
+        cancelled = cancelled or threading.Event()
+        finished = object()
+        
+        def emit(post):
+            # Block while the consumer is behind, but give up once it has gone away
+            while not cancelled.is_set():
+                try:
+                    buffer.put(post, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        breakdown = metrics.current_breakdown()
+        
+        def produce():
+            try:
+                with metrics.use_breakdown(breakdown):
+                    self._run_queries(queries, max_workers, cache, refresh, on_post=emit, cancelled=cancelled,
+                                      on_progress=on_progress, index=index, report=report)
+            finally:
+                emit(finished)
+        
+        producer = threading.Thread(target=produce, name='reddit-stream', daemon=True)
+        producer.start()
+        
+        completed = False
+        try:
+            while True:
+                try:
+                    post = buffer.get(timeout=0.5)
+                except queue.Empty:
+                    # A cancelled producer may exit without delivering the end marker
+                    if producer.is_alive():
+                        continue
+                    if buffer.empty():
+                        break
+                    post = buffer.get()
+                if post is finished:
+                    completed = True
+                    break
+                yield post
+        finally:
+            # The consumer stopped early, so stop the remaining queries too
+            if not completed:
+                cancelled.set()
+    
+    def watch(self, keywords=None, subreddits=None, poll_interval=2.0, group_size=MAX_MULTIREDDIT_SIZE, skip_existing=True,
+              cancelled=None):
+        """
+        Watch subreddits for new submissions and yield the ones that mention a keyword.
+        
+        Instead of one search per keyword and subreddit, the subreddits are
+        combined into multireddits ("a+b+c", group_size at a time) whose new
+        submissions are polled once per round, and every keyword is matched
+        in a single pass over each title and body. API calls per round scale
+        with the number of subreddit groups, not keywords times subreddits.
+        Matched posts are saved to the post store, if one is configured.
+        
+        Args:
+            keywords (str): Comma-separated keywords; every new submission is yielded if empty
+            subreddits (str): Comma-separated subreddits to watch, all of Reddit if empty
+            poll_interval (float): Seconds to wait after a round without new submissions
+            group_size (int): Maximum subreddits combined into one multireddit
+            skip_existing (bool): Ignore the submissions already posted when watching starts.
+                With a post store, pass False to catch up on posts made while not
+                watching; posts already stored are not yielded again.
+            cancelled (threading.Event): Optional event that stops watching when set
+        
+        Yields:
+            dict: Matching posts, with every matched keyword in 'matched_keywords'
+        """
+        keyword_list = [k.strip() for k in keywords.split(',') if k.strip()] if keywords else []
+        subreddit_list = [s.strip() for s in subreddits.split(',') if s.strip()] if subreddits else []
+        matcher = KeywordMatcher(keyword_list) if keyword_list else None
+        cancelled = cancelled or threading.Event()
+        
+        groups = ['+'.join(subreddit_list[i:i + group_size]) for i in range(0, len(subreddit_list), group_size)]
+        groups = groups or ['all']
+    
+        def open_stream(group, skip):
+            # pause_after=-1 hands control back after every request, so groups are polled in turn
+            return self._client().subreddit(group).stream.submissions(pause_after=-1, skip_existing=skip)
+        
+        streams = {group: open_stream(group, skip_existing) for group in groups}
+        self.logger.info(f"Watching {len(subreddit_list) or 'all'} subreddits in {len(groups)} streams "
+                         f"for {len(keyword_list)} keywords")
+        
+        seen = matched = 0
+        try:
+            while not cancelled.is_set():
+                found = failed = False
+                for group in groups:
+                    try:
+                        for submission in streams[group]:
+                            if submission is None or cancelled.is_set():
+                                break
+                            found = True
+                            seen += 1
+                            post = self._match_submission(submission, matcher)
+                            if post is not None:
+                                matched += 1
+                                yield post
+                    except Exception as e:
+                        # A generator that raised is finished, so start a fresh stream for the group
+                        self.logger.error(f"Error watching r/{group}: {e}")
+                        streams[group] = open_stream(group, True)
+                        failed = True
+                
+                if failed or not found:
+                    cancelled.wait(poll_interval)
+        finally:
+            self.logger.info(f"Stopped watching after {seen} new submissions, {matched} matched")
+    
+    def _match_submission(self, submission, matcher):
+        """
+        Turn a watched submission into a post if it mentions any keyword.
+        
+        Returns:
+            dict: The post, or None if nothing matched or it is already stored
+        """
+        content = submission.selftext if submission.is_self else submission.url
+        matches = matcher.match_post(submission.title, content) if matcher is not None else ['']
+        if not matches:
+            return None
+        
+        # Only matches are scored
+        post = self._extract_post_data(submission, keyword=matches[0])
+        post['matched_keywords'] = [keyword for keyword in matches if keyword]
+        post['matched_subreddits'] = [post['subreddit']]
+        
+        if self.store is not None and not self.store.upsert_posts([post]):
+            return None
+        if self.analytics is not None:
+            self.analytics.add_posts([post])
+        return post
+    
+    def served_locally(self, keywords=None, subreddits=None, post_limit=100, time_filter="month", sort="relevance",
+                       max_age=LOCAL_MAX_AGE):
+        """
+        Check whether a local-first scrape would be answered by the post store alone.
+        
+        Returns:
+            bool: True if every query is covered and fresh, so the scrape makes no API calls
+        """
+        queries, _, _ = self._prepare(keywords, subreddits, post_limit, time_filter, sort, False, False,
+                                      local_first=True, max_age=max_age)
+        return all(query.method == self._search_local and query.args[2] is None for query in queries)
+    
+    def _prepare(self, keywords, subreddits, post_limit, time_filter, sort, use_cache, incremental, collapse=False,
+                 report=None, local_first=False, max_age=LOCAL_MAX_AGE):
+        """Parse the scrape arguments into queries, pick the cache to use and start the plan report."""
         # Parse keywords and subreddits
         keyword_list = [k.strip() for k in keywords.split(',')] if keywords else []
         subreddit_list = [s.strip() for s in subreddits.split(',')] if subreddits else []
         
+        if incremental and self.store is None:
+            raise ValueError("Incremental scraping requires a post store")
+        if local_first and self.store is None:
+            raise ValueError("Local-first scraping requires a post store")
+        if local_first and (incremental or collapse):
+            raise ValueError("Local-first scraping cannot be combined with incremental or collapsed scraping")
+        
+        if collapse:
+            queries = self._build_packed_queries(keyword_list, subreddit_list, post_limit, time_filter, sort,
+                                                 incremental)
+        else:
+            queries = self._build_queries(keyword_list, subreddit_list, post_limit, time_filter, sort, incremental)
+        
+        if local_first:
+            queries = [self._plan_local(query, max_age) for query in queries]
+        
+        report = report if report is not None else PlanReport()
+        report.unpacked_queries = max(len(keyword_list), 1) * max(len(subreddit_list), 1)
+        report.planned_queries = len(queries)
+        report.collapsed = collapse
+        if collapse:
+            self.logger.info(f"Planned {len(queries)} queries instead of {report.unpacked_queries}")
+        
+        # A delta since the last run is never served from the cache, and the store replaces it in local-first mode
+        cache = self.cache if use_cache and not incremental and not local_first else None
+        return queries, cache, report
+    
+    def _build_queries(self, keyword_list, subreddit_list, post_limit, time_filter, sort, incremental=False):
+        """Build the list of queries for a scrape."""
+        queries = []
+        
+        # Paging can only stop at already-seen posts when listings are newest first
+        if incremental:
+            sort = "new"
+        
+        def since(subreddit, keyword=''):
+            return self.store.get_high_water(subreddit, keyword) if incremental else None
+        
+        def watermark(subreddit, keyword=''):
+            return ((subreddit, keyword),) if incremental else ()
+        
         # If both keywords and subreddits are provided
         if keyword_list and subreddit_list:
             for subreddit in subreddit_list:
                 for keyword in keyword_list:
-                    self.logger.info(f"Scraping posts for keyword '{keyword}' in r/{subreddit}")
-                    posts = self._search_subreddit(subreddit, keyword, post_limit, time_filter, sort)
-                    self.results.extend(posts)
+                    mark = since(subreddit, keyword)
+                    queries.append(Query(
+                        f"posts for keyword '{keyword}' in r/{subreddit}",
+                        self._search_subreddit,
+                        (subreddit, keyword, post_limit, time_filter, sort, mark),
+                        QueryCache.make_key('search', subreddit, keyword, sort, time_filter),
+                        post_limit,
+                        watermark(subreddit, keyword),
+                        subreddit,
+                        keyword,
+                        (subreddit, keyword, sort, time_filter, mark)
+                    ))
         
         # If only keywords are provided, search all of Reddit
         elif keyword_list:
             for keyword in keyword_list:
-                self.logger.info(f"Scraping posts for keyword '{keyword}' across all Reddit")
-                posts = self._search_reddit(keyword, post_limit, time_filter, sort)
-                self.results.extend(posts)
+                mark = since('all', keyword)
+                queries.append(Query(
+                    f"posts for keyword '{keyword}' across all Reddit",
+                    self._search_reddit,
+                    (keyword, post_limit, time_filter, sort, mark),
+                    QueryCache.make_key('search', 'all', keyword, sort, time_filter),
+                    post_limit,
+                    watermark('all', keyword),
+                    'all',
+                    keyword,
+                    ('all', keyword, sort, time_filter, mark)
+                ))
         
         # If only subreddits are provided, get recent posts from each
         elif subreddit_list:
             for subreddit in subreddit_list:
-                self.logger.info(f"Scraping recent posts from r/{subreddit}")
-                posts = self._get_subreddit_posts(subreddit, post_limit, time_filter, sort)
-                self.results.extend(posts)
+                mark = since(subreddit)
+                queries.append(Query(
+                    f"recent posts from r/{subreddit}",
+                    self._get_subreddit_posts,
+                    (subreddit, post_limit, time_filter, sort, mark),
+                    QueryCache.make_key('listing', subreddit, '', sort, time_filter),
+                    post_limit,
+                    watermark(subreddit),
+                    subreddit,
+                    '',
+                    (subreddit, '', sort, time_filter, mark)
+                ))
         
-        return self.results
+        return queries
     
-    def _search_reddit(self, query, limit, time_filter, sort):
-        """Search all of Reddit for a keyword using PRAW."""
+    def _plan_local(self, query, max_age):
+        """
+        Turn a query into a local-first one if the post store covers its whole window.
+        
+        Returns:
+            Query: A query answered by _search_local, or the API query unchanged
+        """
+        subreddit, keyword, sort, time_filter, _ = query.coverage
+        # Listings are ranked by hot for every sort but new and top
+        if sort not in LOCAL_SORTS or (not keyword and sort not in ('new', 'top')):
+            return query
+        
+        now = time.time()
+        window_start = self._window_start(time_filter, now, bool(keyword) or sort == 'top')
+        
+        # Coverage of the whole subreddit includes every keyword searched in it
+        ranges = [self.store.get_coverage(subreddit, keyword)]
+        if keyword:
+            ranges.append(self.store.get_coverage(subreddit))
+        ranges = [covered for covered in ranges if covered is not None]
+        if not ranges:
+            return query
+        covered_from, covered_until = max(ranges, key=lambda covered: (covered[0] <= window_start, covered[1]))
+        
+        complete = covered_from <= window_start
+        if not complete and sort == 'new':
+            # The newest posts are enough when the covered range alone holds the limit
+            stored = self.store.search(keyword, subreddit, since=covered_from, sort='new', limit=query.limit)
+            complete = len(stored) >= query.limit
+        if not complete:
+            return query
+        
+        stale = now - covered_until > max_age
+        description = f"{query.description} from the post store" + (" and newer posts" if stale else "")
+        return query._replace(
+            description=description,
+            method=self._search_local,
+            args=(query, window_start, covered_until if stale else None),
+            watermarks=(),
+            coverage=None
+        )
+    
+    @staticmethod
+    def _window_start(time_filter, now, filtered=True):
+        """Return the oldest created_utc a query's time filter reaches; listings other than top ignore it."""
+        window = TIME_FILTER_WINDOWS.get(time_filter) if filtered else None
+        return now - window if window is not None else 0.0
+    
+    def _build_packed_queries(self, keyword_list, subreddit_list, post_limit, time_filter, sort, incremental=False):
+        """
+        Build as few queries as possible by packing keywords and subreddits together.
+        
+        Each query searches a multireddit for an OR of keywords (or lists a
+        multireddit when there are no keywords) and keeps post_limit posts
+        per (subreddit, keyword) pair it covers.
+        """
+        queries = []
+        
+        # Paging can only stop at already-seen posts when listings are newest first
+        if incremental:
+            sort = "new"
+        
+        for subreddits, keywords in plan_groups(keyword_list, subreddit_list, post_limit):
+            pairs = [(subreddit, keyword) for subreddit in subreddits for keyword in keywords or ['']]
+            since = {pair: self.store.get_high_water(*pair) for pair in pairs} if incremental else {}
+            target = '+'.join(subreddits)
+            
+            if keywords:
+                description = f"posts for {or_query(keywords)} in r/{target}"
+                kind, cache_keyword = 'search', or_query(sorted(keywords))
+            else:
+                description = f"recent posts from r/{target}"
+                kind, cache_keyword = 'listing', ''
+            
+            limit = min(post_limit * len(pairs), MAX_PACKED_LIMIT)
+            queries.append(Query(
+                description,
+                self._search_packed,
+                (subreddits, keywords, post_limit, time_filter, sort, since),
+                QueryCache.make_key(kind, '+'.join(sorted(subreddits)), cache_keyword, sort, time_filter),
+                limit,
+                tuple(pairs) if incremental else (),
+                '',
+                ''
+            ))
+        
+        return queries
+    
+    def _run_queries(self, queries, max_workers=None, cache=None, refresh=False, on_post=None, cancelled=None,
+                     on_progress=None, index=None, report=None):
+        """
+        Run queries on the worker pool, keeping at most max_workers in flight.
+        
+        Every query method isolates its own errors, so one failing query
+        never affects the others.
+        
+        Args:
+            queries (list): Query tuples
+            max_workers (int): Optional cap on concurrent queries
+            cache (QueryCache): Optional cache consulted before each query
+            refresh (bool): Skip cache lookups but still store results
+            on_post (callable): Optional callback receiving each post as soon as it is extracted
+            cancelled (threading.Event): Optional event that stops remaining queries when set
+            on_progress (callable): Optional callback receiving (queries_done, queries_total)
+                after each query
+            index (ResultSet): Optional result set that collapses duplicates across queries;
+                on_post then only receives each submission's merged record once
+            report (PlanReport): Optional report each finished query is recorded in
+        """
+        # Worker threads report their timings to the caller's breakdown
+        breakdown = metrics.current_breakdown()
+        
+        def run(query):
+            with metrics.use_breakdown(breakdown):
+                self._run_query(query, cache, refresh, on_post, cancelled, index, report)
+        
+        self._map_concurrently(run, queries, max_workers, cancelled, on_progress)
+    
+    def _map_concurrently(self, fn, items, max_workers=None, cancelled=None, on_progress=None):
+        """
+        Call fn on every item on the worker pool, keeping at most max_workers calls in flight.
+        
+        Args:
+            fn (callable): Function called with each item
+            items (list): Items to process
+            max_workers (int): Optional cap on concurrent calls
+            cancelled (threading.Event): Optional event that stops remaining calls when set
+            on_progress (callable): Optional callback receiving (items_done, items_total)
+            
+        Returns:
+            list: fn's result for each item in item order, None for items skipped by cancellation
+        """
+        limit = min(max_workers or self.max_workers, self.max_workers, len(items))
+        results = [None] * len(items)
+        completed = 0
+        
+        def is_cancelled():
+            return cancelled is not None and cancelled.is_set()
+        
+        if on_progress is not None:
+            on_progress(0, len(items))
+        
+        if limit <= 1:
+            for position, item in enumerate(items):
+                if is_cancelled():
+                    break
+                results[position] = fn(item)
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed, len(items))
+            return results
+        
+        executor = self._get_executor()
+        pending = {}
+        next_index = 0
+        
+        while (next_index < len(items) and not is_cancelled()) or pending:
+            # Keep the pool topped up to the concurrency cap
+            while next_index < len(items) and len(pending) < limit and not is_cancelled():
+                future = executor.submit(fn, items[next_index])
+                pending[future] = next_index
+                next_index += 1
+            
+            if not pending:
+                break
+            
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed, len(items))
+        
+        return results
+    
+    def _run_query(self, query, cache=None, refresh=False, on_post=None, cancelled=None, index=None, report=None):
+        """Run a single query, serving it from the cache when possible."""
+        self._local.query_failed = False
+        self._local.api_requests = 0
+        self._local.unattributed = 0
+        self._local.on_post = on_post
+        self._local.cancelled = cancelled
+        self._local.index = index
+        self._local.served_locally = False
+        start = time.perf_counter()
+        fetched_at = time.time()
+        
+        if cache is not None:
+            if refresh:
+                cache.record_refresh()
+            else:
+                posts = cache.get(query.cache_key, query.limit)
+                if posts is not None:
+                    self.logger.info(f"Serving {query.description} from cache")
+                    self._match_case(posts, query)
+                    for post in posts:
+                        self._emit(post, query.keyword, query.subreddit)
+                    if report is not None:
+                        report.record(cached=True)
+                    metrics.record_query(query.description, time.perf_counter() - start, posts=len(posts),
+                                         cached=True, looked_up=True)
+                    return posts
+        
+        self.logger.info(f"Scraping {query.description}")
+        posts = query.method(*query.args)
+        local = self._local.served_locally
+        if report is not None:
+            report.record(api_requests=self._local.api_requests, unattributed_posts=self._local.unattributed,
+                          local=local)
+        metrics.record_query(query.description, time.perf_counter() - start, self._local.api_requests, len(posts),
+                             local=local, looked_up=cache is not None and not refresh)
+        
+        # Never cache the partial results of a failed query
+        if cache is not None and not self._local.query_failed:
+            cache.set(query.cache_key, query.limit, posts)
+        
+        # Posts served from the store are already stored
+        if self.store is not None and posts and not local:
+            with metrics.span('store'):
+                new_posts = self.store.upsert_posts(posts)
+            self.logger.info(f"Stored {len(posts)} posts ({new_posts} new) for {query.description}")
+            
+            # Only a complete query proves nothing newer was missed
+            if query.watermarks and not self._local.query_failed:
+                newest = max(post['date'] for post in posts)
+                for subreddit, keyword in query.watermarks:
+                    self.store.set_high_water(subreddit, keyword, newest)
+        
+        if self.store is not None and query.coverage is not None and not self._local.query_failed:
+            self._record_coverage(query.coverage, query.limit, posts, fetched_at)
+        
+        # Posts counted before only replace their old scores
+        if self.analytics is not None and posts:
+            with metrics.span('analytics'):
+                self.analytics.add_posts(posts)
+        
+        return posts
+    
+    def _match_case(self, posts, query):
+        """
+        Give cached posts the keyword and subreddit spelling of the query they are served to.
+        
+        Cache keys ignore case, so a hit may hold posts fetched for 'Newsletter'
+        when 'newsletter' was asked for. The posts are the cache's own copies.
+        """
+        if query.method == self._search_packed:
+            subreddits, keywords = query.args[0], query.args[1]
+        else:
+            subreddits, keywords = [query.subreddit], [query.keyword]
+        subreddits = {name.lower(): name for name in subreddits if name}
+        keywords = {name.lower(): name for name in keywords if name}
+        
+        for post in posts:
+            if post.get('keyword'):
+                post['keyword'] = keywords.get(post['keyword'].lower(), post['keyword'])
+            if 'matched_keywords' in post:
+                post['matched_keywords'] = [keywords.get(name.lower(), name) for name in post['matched_keywords']]
+            if 'matched_subreddits' in post:
+                post['matched_subreddits'] = [subreddits.get(name.lower(), name)
+                                              for name in post['matched_subreddits']]
+    
+    def _record_coverage(self, coverage, limit, posts, fetched_at):
+        """
+        Record the time range a finished API query proves is completely stored.
+        
+        A query that returned fewer posts than its limit ran out of results,
+        so its whole window (back to since, if it stopped there) is stored.
+        A full page of newest-first results covers back to its oldest post.
+        Any other ranking says nothing about the posts it did not return.
+        """
+        subreddit, keyword, sort, time_filter, since = coverage
+        if len(posts) < limit:
+            covered_from = max(since or 0.0, self._window_start(time_filter, fetched_at, bool(keyword) or sort == 'top'))
+        elif sort == 'new' and posts:
+            covered_from = min(post['date'] for post in posts)
+        else:
+            return
+        self.store.add_coverage(subreddit, keyword, covered_from, fetched_at)
+    
+    def _search_local(self, query, since, delta_since=None):
+        """
+        Answer a query from the post store's full-text index.
+        
+        With delta_since, posts created after it are first fetched newest
+        first from the API and stored, extending the coverage. If they fill
+        the whole limit, the gap to the stored range is not closed, and
+        rankings other than new fall back to the original API query.
+        
+        Args:
+            query (Query): The API query being answered
+            since (float): Oldest created_utc of the query's window
+            delta_since (float): End of the stored coverage, when it is no longer fresh
+        """
+        subreddit, keyword, sort, time_filter, _ = query.coverage
+        self._local.served_locally = True
+        
+        if delta_since is not None:
+            fetched_at = time.time()
+            delta = self._fetch_delta(subreddit, keyword, query.limit, time_filter, delta_since)
+            if not self._local.query_failed:
+                if delta:
+                    with metrics.span('store'):
+                        self.store.upsert_posts(delta)
+                self._record_coverage((subreddit, keyword, 'new', time_filter, delta_since), query.limit, delta,
+                                      fetched_at)
+                if len(delta) >= query.limit and sort != 'new':
+                    self.logger.info(f"Too many new posts to merge locally, running {query.description} in full")
+                    self._local.served_locally = False
+                    return query.method(*query.args)
+        
+        try:
+            with metrics.span('local_search'):
+                stored = self.store.search(keyword, subreddit, since=since, sort=sort, limit=query.limit)
+        except Exception as e:
+            self.logger.error(f"Error searching the post store: {e}")
+            self._local.query_failed = True
+            return []
+        
+        cancelled = getattr(self._local, 'cancelled', None)
+        index = getattr(self._local, 'index', None)
+        posts = []
+        for record in stored:
+            if cancelled is not None and cancelled.is_set():
+                self._local.query_failed = True
+                break
+            existing = index.get(record['id']) if index is not None else None
+            post = self._copy_post(existing if existing is not None else record, keyword)
+            posts.append(post)
+            self._emit(post, keyword, subreddit)
+        return posts
+    
+    def _fetch_delta(self, subreddit, keyword, limit, time_filter, since):
+        """Fetch posts created after since, newest first, without emitting them."""
+        on_post, index = self._local.on_post, self._local.index
+        self._local.on_post = self._local.index = None
+        try:
+            if keyword and subreddit != 'all':
+                return self._search_subreddit(subreddit, keyword, limit, time_filter, 'new', since)
+            if keyword:
+                return self._search_reddit(keyword, limit, time_filter, 'new', since)
+            return self._get_subreddit_posts(subreddit, limit, time_filter, 'new', since)
+        finally:
+            self._local.on_post, self._local.index = on_post, index
+    
+    def _get_executor(self):
+        """Return the shared worker pool, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='reddit-query'
+                )
+            return self._executor
+    
+    @property
+    def reddit(self):
+        """The calling thread's PRAW client, built on first use."""
+        return self._client()
+    
+    def validate_credentials(self, live=False):
+        """
+        Check the API credentials, once per process.
+        
+        Missing settings are reported without any network call. With live,
+        an application token is also requested from Reddit. Valid and
+        rejected credentials are cached, so later calls return or raise
+        straight away; a check that could not reach Reddit (connection
+        errors, timeouts, server errors) is not, so the next call checks
+        again. Stand-in clients from client_factory are not checked live.
+        
+        Args:
+            live (bool): Also authenticate against Reddit
+            
+        Raises:
+            ValueError: If the credentials are missing, Reddit rejects them, or Reddit
+                could not be reached to check them
+        """
+        key = (self.client_id, self.client_secret, self.user_agent, live and self.client_factory is None)
+        with _credential_lock:
+            if key in _credential_checks:
+                error = _credential_checks[key]
+            else:
+                error, conclusive = self._check_credentials(key[3])
+                if conclusive:
+                    _credential_checks[key] = error
+        if error is not None:
+            raise ValueError(error)
+    
+    def _check_credentials(self, live):
+        """
+        Check the credentials.
+        
+        Returns:
+            tuple: (why the credentials are unusable or None if they are fine,
+                whether the outcome is final and may be cached)
+        """
+        missing = [name for name, value in (
+            ('client_id', self.client_id),
+            ('client_secret', self.client_secret),
+            ('user_agent', self.user_agent)
+        ) if not value]
+        if missing:
+            return f"Missing Reddit API credentials: {', '.join(missing)}", True
+        if live:
+            from prawcore.exceptions import OAuthException, ResponseException
+            
+            try:
+                self._client().auth.scopes()
+            except OAuthException as e:
+                self.logger.error(f"Reddit rejected the API credentials: {e}")
+                return f"Reddit rejected the API credentials: {e}", True
+            except ResponseException as e:
+                if e.response.status_code in (401, 403):
+                    self.logger.error(f"Reddit rejected the API credentials: {e}")
+                    return f"Reddit rejected the API credentials: {e}", True
+                self.logger.warning(f"Could not check the API credentials: {e}")
+                return f"Could not reach Reddit to check the API credentials: {e}", False
+            except Exception as e:
+                self.logger.warning(f"Could not check the API credentials: {e}")
+                return f"Could not reach Reddit to check the API credentials: {e}", False
+        return None, True
+    
+    def _client(self):
+        """Return the PRAW client owned by the current thread."""
+        reddit = getattr(self._local, 'reddit', None)
+        if reddit is None:
+            requestor_kwargs = {
+                'rate_limiter': self.rate_limiter,
+                'priority': self.priority,
+                'on_request': self._count_request
+            }
+            if self.client_factory is not None:
+                reddit = self.client_factory(requestor_kwargs)
+            else:
+                reddit = self._praw_client(requestor_kwargs)
+            self._local.reddit = reddit
+        return reddit
+    
+    def _praw_client(self, requestor_kwargs):
+        """Build a PRAW client; praw and prawcore are first imported here rather than at startup."""
+        import praw
+        from .requestor import RateLimitedRequestor
+        
+        return praw.Reddit(
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            user_agent=self.user_agent,
+            requestor_class=RateLimitedRequestor,
+            requestor_kwargs=requestor_kwargs,
+            # Otherwise every new client process asks PyPI for a newer PRAW release
+            check_for_updates=False
+        )
+    
+    def _count_request(self):
+        """Count an API request made by the current thread's query."""
+        self._local.api_requests = getattr(self._local, 'api_requests', 0) + 1
+    
+    def refresh_metrics(self, post_ids, max_workers=None, batch_size=100, result_sets=()):
+        """
+        Refresh upvotes and comment counts of known submissions with batched id lookups.
+        
+        Ids are looked up up to batch_size (Reddit's maximum of 100) per API
+        call, and batches run concurrently within the shared rate budget, so
+        N posts cost ceil(N / 100) requests instead of re-running searches.
+        
+        Args:
+            post_ids (iterable): Submission ids, with or without the 't3_' prefix
+            max_workers (int): Optional cap on concurrent batches
+            batch_size (int): Ids per API call, at most 100
+            result_sets (iterable): ResultSets to update in place
+            
+        Returns:
+            dict: {id: {'upvotes': int, 'comments': int}} for every submission Reddit returned
+        """
+        ids = list(dict.fromkeys(
+            post_id[3:] if post_id.startswith('t3_') else post_id for post_id in post_ids if post_id
+        ))
+        batch_size = max(1, min(batch_size, 100))
+        batches = [ids[start:start + batch_size] for start in range(0, len(ids), batch_size)]
+        
+        refreshed = {}
+        for batch_metrics in self._map_concurrently(self._fetch_metrics, batches, max_workers):
+            refreshed.update(batch_metrics or {})
+        
+        if self.store is not None and refreshed:
+            self.store.update_metrics(refreshed)
+        if self.analytics is not None:
+            for post_id, values in refreshed.items():
+                self.analytics.update_metrics(post_id, values['upvotes'], values['comments'])
+        for result_set in result_sets:
+            for post_id, values in refreshed.items():
+                result_set.update_metrics(post_id, values['upvotes'], values['comments'])
+        
+        self.logger.info(f"Refreshed metrics for {len(refreshed)} of {len(ids)} posts in {len(batches)} requests")
+        return refreshed
+    
+    def harvest_comments(self, post_ids, max_comments=200, max_depth=3, max_more=2, max_requests=None,
+                         sort="top", max_workers=None, result_sets=(), cancelled=None):
+        """
+        Score the discussion of selected posts and attach its aggregate sentiment.
+        
+        Comment trees are fetched concurrently on the worker pool within the
+        shared rate budget. Each tree is walked breadth first and scored
+        comment by comment, keeping only running totals, and is dropped as
+        soon as its post is done. "More comments" stubs are expanded only
+        while the per-post and per-harvest budgets allow.
+        
+        Args:
+            post_ids (iterable): Submission ids, in priority order
+            max_comments (int): Maximum comments scored per post
+            max_depth (int): Deepest reply level scored, 0 being top-level comments only
+            max_more (int): Maximum "more comments" expansions (API calls) per post
+            max_requests (int): Optional API call budget for the whole harvest
+            sort (str): Comment sort (top, best, new, controversial, old, q&a)
+            max_workers (int): Optional cap on concurrent posts
+            result_sets (iterable): ResultSets whose records get the comment fields
+            cancelled (threading.Event): Optional event that stops the harvest when set
+            
+        Returns:
+            dict: {id: comment fields} for every post harvested, see CommentStats.to_fields
+        """
+        ids = list(dict.fromkeys(
+            post_id[3:] if post_id.startswith('t3_') else post_id for post_id in post_ids if post_id
+        ))
+        budget = CommentBudget(max_requests)
+        
+        def harvest(post_id):
+            if budget.exhausted:
+                return None
+            try:
+                submission = self._client().submission(id=post_id)
+                submission.comment_sort = sort
+                submission.comment_limit = max_comments
+                with metrics.span('comments'):
+                    stats = harvest_tree(submission, budget, max_comments, max_depth, max_more, cancelled)
+            except Exception as e:
+                self.logger.error(f"Error harvesting comments of {post_id}: {e}")
+                return None
+            return stats.to_fields() if stats is not None else None
+        
+        harvested = {}
+        for post_id, fields in zip(ids, self._map_concurrently(harvest, ids, max_workers, cancelled)):
+            if fields is not None:
+                harvested[post_id] = fields
+        
+        for result_set in result_sets:
+            for post_id, fields in harvested.items():
+                result_set.annotate(post_id, fields)
+        
+        self.logger.info(f"Harvested comments of {len(harvested)} of {len(ids)} posts in {budget.spent} requests")
+        return harvested
+    
+    def _fetch_metrics(self, post_ids):
+        """Fetch the score and comment count of up to 100 submissions in one API call."""
+        refreshed = {}
+        try:
+            for submission in self._client().info(fullnames=[f"t3_{post_id}" for post_id in post_ids]):
+                refreshed[submission.id] = {
+                    'upvotes': submission.score,
+                    'comments': submission.num_comments
+                }
+        except Exception as e:
+            self.logger.error(f"Error refreshing post metrics: {e}")
+        return refreshed
+    
+    def close(self):
+        """Shut down the worker pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
+    def _search_reddit(self, query, limit, time_filter, sort, since=None):
+        """Search all of Reddit for a keyword using PRAW, stopping at posts created at or before since."""
         posts = []
         
         try:
@@ -76,14 +1001,14 @@ class RedditScraper:
             
             # Search Reddit
             if sort == "relevance":
-                search_results = self.reddit.subreddit("all").search(
+                search_results = self._client().subreddit("all").search(
                     query, 
                     sort=sort_method, 
                     time_filter=time_filter, 
                     limit=limit
                 )
             else:
-                search_results = self.reddit.subreddit("all").search(
+                search_results = self._client().subreddit("all").search(
                     query, 
                     sort=sort_method,
                     time_filter=time_filter,
@@ -91,17 +1016,16 @@ class RedditScraper:
                 )
                 
             # Extract posts
-            for submission in search_results:
-                post = self._extract_post_data(submission, keyword=query)
-                posts.append(post)
+            self._collect(search_results, posts, since, keyword=query)
                 
         except Exception as e:
             self.logger.error(f"Error searching Reddit: {e}")
+            self._local.query_failed = True
             
         return posts
     
-    def _search_subreddit(self, subreddit, query, limit, time_filter, sort):
-        """Search a specific subreddit for a keyword using PRAW."""
+    def _search_subreddit(self, subreddit, query, limit, time_filter, sort, since=None):
+        """Search a specific subreddit for a keyword using PRAW, stopping at posts created at or before since."""
         posts = []
         
         try:
@@ -109,7 +1033,7 @@ class RedditScraper:
             sort_method = self._convert_sort_method(sort)
             
             # Search subreddit
-            search_results = self.reddit.subreddit(subreddit).search(
+            search_results = self._client().subreddit(subreddit).search(
                 query, 
                 sort=sort_method, 
                 time_filter=time_filter, 
@@ -117,22 +1041,21 @@ class RedditScraper:
             )
                 
             # Extract posts
-            for submission in search_results:
-                post = self._extract_post_data(submission, keyword=query, subreddit=subreddit)
-                posts.append(post)
+            self._collect(search_results, posts, since, keyword=query, subreddit=subreddit)
                 
         except Exception as e:
             self.logger.error(f"Error searching subreddit: {e}")
+            self._local.query_failed = True
             
         return posts
     
-    def _get_subreddit_posts(self, subreddit, limit, time_filter, sort):
-        """Get recent posts from a subreddit using PRAW."""
+    def _get_subreddit_posts(self, subreddit, limit, time_filter, sort, since=None):
+        """Get recent posts from a subreddit using PRAW, stopping at posts created at or before since."""
         posts = []
         
         try:
             # Get subreddit
-            subreddit_obj = self.reddit.subreddit(subreddit)
+            subreddit_obj = self._client().subreddit(subreddit)
             
             # Get posts based on sort method
             if sort == "hot":
@@ -145,42 +1068,308 @@ class RedditScraper:
                 submissions = subreddit_obj.hot(limit=limit)
                 
             # Extract posts
-            for submission in submissions:
-                post = self._extract_post_data(submission, subreddit=subreddit)
-                posts.append(post)
+            self._collect(submissions, posts, since, subreddit=subreddit)
                 
         except Exception as e:
             self.logger.error(f"Error getting subreddit posts: {e}")
+            self._local.query_failed = True
             
         return posts
     
+    def _search_packed(self, subreddits, keywords, per_pair_limit, time_filter, sort, since=None):
+        """
+        Run one packed query and attribute its posts to the pairs they match.
+        
+        Args:
+            subreddits (list): Subreddits searched together, ['all'] for all of Reddit
+            keywords (list): Keywords searched together; empty lists the subreddits instead
+            per_pair_limit (int): Maximum posts kept per (subreddit, keyword) pair
+            time_filter (str): Time filter for results
+            sort (str): Sort method
+            since (dict): Optional {(subreddit, keyword): created_utc} high-water marks
+        """
+        posts = []
+        
+        try:
+            self._page_packed(posts, subreddits, keywords, per_pair_limit, time_filter, sort, since or {}, {})
+        
+        except Exception as e:
+            self.logger.error(f"Error running packed query: {e}")
+            self._local.query_failed = True
+        
+        return posts
+    
+    def _page_packed(self, posts, subreddits, keywords, per_pair_limit, time_filter, sort, since, attributed):
+        """
+        Page through a packed listing, then re-query the pairs it left short.
+        
+        Frequent keywords fill their pairs first, so paging goes on while any
+        pair is short of per_pair_limit, up to Reddit's paging limit; pages
+        are fetched lazily, so it stops as soon as every pair is full. If the
+        paging limit cuts the listing off, the short pairs of each subreddit
+        are packed again without the full ones, whose posts crowded them
+        out, unless querying them one by one takes fewer requests or the
+        round would not narrow them down. Every pair thus keeps post_limit
+        posts as in an unpacked scrape.
+        
+        Args:
+            posts (list): Posts found so far, extended in place
+            subreddits (list): Subreddits searched together, ['all'] for all of Reddit
+            keywords (list): Keywords searched together; empty lists the subreddits instead
+            per_pair_limit (int): Maximum posts kept per (subreddit, keyword) pair
+            time_filter (str): Time filter for results
+            sort (str): Sort method
+            since (dict): {(subreddit, keyword): created_utc} high-water marks
+            attributed (dict): {(subreddit, keyword): ids of the posts attributed to it}, updated in place
+        """
+        target = self._client().subreddit('+'.join(subreddits))
+        
+        if keywords:
+            submissions = target.search(
+                or_query(keywords),
+                sort=self._convert_sort_method(sort),
+                time_filter=time_filter,
+                limit=MAX_PACKED_LIMIT
+            )
+        elif sort == "new":
+            submissions = target.new(limit=MAX_PACKED_LIMIT)
+        elif sort == "top":
+            submissions = target.top(time_filter=time_filter, limit=MAX_PACKED_LIMIT)
+        else:  # Default to hot
+            submissions = target.hot(limit=MAX_PACKED_LIMIT)
+        
+        paged = self._collect_packed(submissions, posts, subreddits, keywords, per_pair_limit, since, attributed)
+        
+        # Short pairs only missed posts if the paging limit cut the listing off
+        if paged < MAX_PACKED_LIMIT or self._local.query_failed:
+            return
+        
+        for subreddit in subreddits:
+            short = [keyword for keyword in keywords or ['']
+                     if len(attributed.get((subreddit, keyword), ())) < per_pair_limit]
+            # A packed round pages through at most MAX_PACKED_LIMIT submissions; single queries need their own pages
+            narrower = len(subreddits) > 1 or len(short) < len(keywords)
+            if narrower and len(short) * -(-per_pair_limit // PAGE_SIZE) > MAX_PACKED_LIMIT // PAGE_SIZE:
+                self._page_packed(posts, [subreddit], short if keywords else [], per_pair_limit, time_filter, sort,
+                                  since, attributed)
+                continue
+            for keyword in short:
+                self._top_up(posts, subreddit, keyword, attributed.setdefault((subreddit, keyword), set()),
+                             per_pair_limit, time_filter, sort, since.get((subreddit, keyword)))
+    
+    def _top_up(self, posts, subreddit, keyword, seen, per_pair_limit, time_filter, sort, since=None):
+        """
+        Fill a pair packed queries left short with the pair's own query.
+        
+        Args:
+            posts (list): Posts found so far, extended in place
+            subreddit (str): Subreddit of the pair, 'all' for all of Reddit
+            keyword (str): Keyword of the pair; empty lists the subreddit instead
+            seen (set): Ids of the posts attributed to the pair, updated in place
+            per_pair_limit (int): Maximum posts kept per pair
+            time_filter (str): Time filter for results
+            sort (str): Sort method
+            since (float): Optional created_utc high-water mark of the pair
+        """
+        cancelled = getattr(self._local, 'cancelled', None)
+        index = getattr(self._local, 'index', None)
+        target = self._client().subreddit(subreddit)
+        
+        if keyword:
+            submissions = target.search(keyword, sort=self._convert_sort_method(sort), time_filter=time_filter,
+                                        limit=per_pair_limit)
+        elif sort == "new":
+            submissions = target.new(limit=per_pair_limit)
+        elif sort == "top":
+            submissions = target.top(time_filter=time_filter, limit=per_pair_limit)
+        else:  # Default to hot
+            submissions = target.hot(limit=per_pair_limit)
+        
+        for submission in submissions:
+            if len(seen) >= per_pair_limit:
+                break
+            if cancelled is not None and cancelled.is_set():
+                self._local.query_failed = True
+                break
+            if since is not None and submission.created_utc <= since:
+                break
+            if submission.id in seen:
+                continue
+            
+            existing = index.get(submission.id) if index is not None else None
+            if existing is not None:
+                post = self._copy_post(existing, keyword)
+            else:
+                post = self._extract_post_data(submission, keyword=keyword)
+            post['matched_keywords'] = [keyword] if keyword else []
+            post['matched_subreddits'] = [subreddit]
+            
+            posts.append(post)
+            self._emit(post, keyword, subreddit)
+            seen.add(submission.id)
+    
+    def _collect_packed(self, submissions, posts, subreddits, keywords, per_pair_limit, since, attributed):
+        """
+        Extract a packed query's submissions, attributing each one locally.
+        
+        The keywords a post matches are found in its title and body with a
+        KeywordMatcher; posts Reddit matched in some other way (stemming,
+        for example) are kept without a keyword. Each (subreddit, keyword)
+        pair keeps at most per_pair_limit posts, and paging stops once every
+        pair is full or the oldest high-water mark is reached.
+        
+        Args:
+            attributed (dict): {(subreddit, keyword): ids of the posts attributed to it}, updated in place
+        
+        Returns:
+            int: Number of submissions paged through
+        """
+        cancelled = getattr(self._local, 'cancelled', None)
+        index = getattr(self._local, 'index', None)
+        
+        matcher = KeywordMatcher(keywords) if len(keywords) > 1 else None
+        searches_all = subreddits == ['all']
+        names = {name.lower(): name for name in subreddits}
+        pairs = [(subreddit, keyword) for subreddit in subreddits for keyword in keywords or ['']]
+        oldest = min(since.values()) if since and None not in since.values() else None
+        
+        full = sum(1 for pair in pairs if len(attributed.get(pair, ())) >= per_pair_limit)
+        paged = 0
+        for submission in submissions:
+            paged += 1
+            if cancelled is not None and cancelled.is_set():
+                self._local.query_failed = True
+                break
+            if oldest is not None and submission.created_utc <= oldest:
+                break
+            
+            display_name = submission.subreddit.display_name
+            subreddit = 'all' if searches_all else names.get(display_name.lower(), display_name)
+            
+            if matcher is not None:
+                content = submission.selftext if submission.is_self else submission.url
+                with metrics.span('attribute'):
+                    matched = matcher.match_post(submission.title, content)
+                if not matched:
+                    self._local.unattributed += 1
+                    matched = ['']
+            else:
+                matched = keywords[:1] or ['']
+            
+            # Skip pairs that are full or have already seen this post
+            matched = [
+                keyword for keyword in matched
+                if len(attributed.get((subreddit, keyword), ())) < per_pair_limit
+                and submission.id not in attributed.get((subreddit, keyword), ())
+                and not (since.get((subreddit, keyword)) is not None
+                         and submission.created_utc <= since[(subreddit, keyword)])
+            ]
+            if not matched:
+                continue
+            
+            existing = index.get(submission.id) if index is not None else None
+            if existing is not None:
+                post = self._copy_post(existing, matched[0])
+            else:
+                post = self._extract_post_data(submission, keyword=matched[0])
+            post['matched_keywords'] = [keyword for keyword in matched if keyword]
+            post['matched_subreddits'] = [subreddit]
+            
+            posts.append(post)
+            self._emit(post, matched[0], subreddit)
+            
+            for keyword in matched:
+                seen = attributed.setdefault((subreddit, keyword), set())
+                seen.add(submission.id)
+                # Posts without a keyword only fill a pair when listing subreddits
+                if len(seen) == per_pair_limit and (keyword or not keywords):
+                    full += 1
+            if full >= len(pairs):
+                break
+        
+        return paged
+    
+    def _collect(self, submissions, posts, since=None, keyword="", subreddit=""):
+        """
+        Extract submissions into posts, stopping at the since high-water mark.
+        
+        Submissions another query of the same scrape already extracted are
+        copied from the result index instead of being extracted and scored
+        again. Each post is also handed to _emit as soon as it is ready. A
+        cancelled query is marked as failed so its partial results are
+        neither cached nor advance a high-water mark.
+        """
+        cancelled = getattr(self._local, 'cancelled', None)
+        index = getattr(self._local, 'index', None)
+        
+        for submission in submissions:
+            if cancelled is not None and cancelled.is_set():
+                self._local.query_failed = True
+                break
+            if since is not None and submission.created_utc <= since:
+                break
+            
+            existing = index.get(submission.id) if index is not None else None
+            if existing is not None:
+                post = self._copy_post(existing, keyword)
+            else:
+                post = self._extract_post_data(submission, keyword=keyword, subreddit=subreddit)
+            
+            posts.append(post)
+            self._emit(post, keyword, subreddit or 'all')
+    
+    def _emit(self, post, keyword, subreddit):
+        """Merge a post into the current result index and pass new submissions to on_post."""
+        index = getattr(self._local, 'index', None)
+        on_post = getattr(self._local, 'on_post', None)
+        
+        if index is not None:
+            row, is_new = index.add(post, keyword, subreddit)
+            if not is_new:
+                return
+            if on_post is not None:
+                post = index.materialize(row)
+        
+        if on_post is not None:
+            on_post(post)
+    
+    def _copy_post(self, record, keyword):
+        """Build a query's own post from an already extracted record."""
+        post = {key: value for key, value in record.items() if not key.startswith('matched_')}
+        post['keyword'] = keyword
+        return post
+    
     def _extract_post_data(self, submission, keyword="", subreddit=""):
         """Extract post data from PRAW submission object."""
-        # Get content based on post type
-        content = ""
-        if submission.is_self:
-            content = submission.selftext
-        else:
-            content = submission.url
+        # Attribute reads may trigger PRAW's lazy loads, so they are timed apart from scoring
+        with metrics.span('extract'):
+            # Get content based on post type
+            content = ""
+            if submission.is_self:
+                content = submission.selftext
+            else:
+                content = submission.url
+            
+            # Create post object
+            title = submission.title
+            post = {
+                'id': submission.id,
+                'title': title,
+                'content': content,
+                'url': f"https://www.reddit.com{submission.permalink}",
+                'subreddit': submission.subreddit.display_name,
+                'upvotes': submission.score,
+                'comments': submission.num_comments,
+                'date': submission.created_utc,
+                'keyword': keyword,
+                'sentiment': 0.0
+            }
         
         # Perform sentiment analysis
-        title = submission.title
-        full_text = f"{title} {content}"
-        sentiment = self._simple_sentiment_analysis(full_text)
-        
-        # Create post object
-        post = {
-            'title': title,
-            'content': content,
-            'url': f"https://www.reddit.com{submission.permalink}",
-            'subreddit': submission.subreddit.display_name,
-            'upvotes': submission.score,
-            'comments': submission.num_comments,
-            'date': submission.created_utc,
-            'keyword': keyword,
-            'sentiment': sentiment
-        }
+        with metrics.span('sentiment'):
+            post['sentiment'] = self._simple_sentiment_analysis(f"{title} {content}")
         
+        metrics.POSTS_EXTRACTED.inc()
         return post
     
     def _convert_sort_method(self, sort):
@@ -200,45 +1389,4 @@ class RedditScraper:
     
     def _simple_sentiment_analysis(self, text):
         """Perform a simple rule-based sentiment analysis."""
-        if not text:
-            return 0.0
-            
-        # Simple lists of positive and negative words
-        positive_words = [
-            'good', 'great', 'excellent', 'amazing', 'awesome', 'fantastic',
-            'wonderful', 'best', 'love', 'happy', 'helpful', 'useful', 'recommend',
-            'positive', 'success', 'successful', 'beneficial', 'effective',
-            'impressive', 'innovative', 'outstanding', 'perfect', 'brilliant',
-            'excited', 'exciting', 'enjoy', 'enjoyed', 'interesting', 'valuable',
-            'favorite', 'thanks', 'thank', 'appreciation', 'appreciate', 'win',
-            'winning', 'winner', 'improvement', 'improve', 'improved'
-        ]
-        
-        negative_words = [
-            'bad', 'terrible', 'awful', 'horrible', 'poor', 'disappointing',
-            'disappointed', 'hate', 'dislike', 'worst', 'waste', 'useless',
-            'negative', 'fail', 'failure', 'problem', 'issue', 'trouble',
-            'difficult', 'hard', 'complicated', 'confusing', 'confused',
-            'annoying', 'annoyed', 'frustrated', 'frustrating', 'sad',
-            'unhappy', 'angry', 'broke', 'broken', 'expensive', 'overpriced',
-            'avoid', 'avoid', 'sucks', 'suck', 'stupid', 'ridiculous'
-        ]
-        
-        text_lower = text.lower()
-        words = text_lower.split()
-        
-        # Count positive and negative words
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
-        
-        # Calculate total words (excluding very short words)
-        total_words = len([word for word in words if len(word) > 2])
-        
-        if total_words == 0:
-            return 0.0
-            
-        # Calculate sentiment score
-        sentiment_score = (positive_count - negative_count) / (total_words ** 0.5)
-        
-        # Clamp score between -1 and 1
-        return max(min(sentiment_score, 1.0), -1.0)
\ No newline at end of file
+        return sentiment.score(text)
@@ -0,0 +1,65 @@
+# requestor.py
+import time
+
+import prawcore
+from prawcore.sessions import Session
+
+from . import metrics
+from .rate_limiter import PRIORITY_INTERACTIVE
+
+
+class RateLimitedRequestor(prawcore.Requestor):
+    """PRAW requestor that paces every API call through a shared RateLimiter."""
+
+    def __init__(self, *args, rate_limiter=None, priority=PRIORITY_INTERACTIVE, on_request=None, **kwargs):
+        """
+        Initialize the requestor.
+
+        Args:
+            rate_limiter (RateLimiter): Shared budget to draw from
+            priority (str): Priority of the requests made through this requestor
+            on_request (callable): Optional callback invoked before every API request
+        """
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.priority = priority
+        self.on_request = on_request
+
+    def request(self, *args, **kwargs):
+        """Wait for budget, issue the request and record the budget Reddit reports."""
+        url = args[1] if len(args) > 1 else kwargs.get('url', '')
+        # Token requests go to www.reddit.com and do not count against the API budget
+        is_api_call = str(url).startswith(self.oauth_url)
+        limited = self.rate_limiter is not None and is_api_call
+
+        if is_api_call and self.on_request is not None:
+            self.on_request()
+        if limited:
+            waited = self.rate_limiter.acquire(self.priority)
+            metrics.API_WAIT_SECONDS.observe(waited)
+            metrics.record_stage('api_wait', waited)
+
+        start = time.perf_counter()
+        try:
+            response = super().request(*args, **kwargs)
+        except prawcore.exceptions.RequestException as e:
+            if is_api_call:
+                metrics.API_REQUESTS.inc(status='error')
+                if isinstance(e.original_exception, Session.RETRY_EXCEPTIONS):
+                    metrics.API_RETRIES.inc()
+            raise
+
+        if is_api_call:
+            elapsed = time.perf_counter() - start
+            metrics.API_REQUEST_SECONDS.observe(elapsed)
+            metrics.record_stage('api_request', elapsed)
+            metrics.API_REQUESTS.inc(status=str(response.status_code))
+            if response.status_code == 429:
+                metrics.API_RATE_LIMITED.inc()
+            if response.status_code in Session.RETRY_STATUSES:
+                metrics.API_RETRIES.inc()
+
+        if limited:
+            self.rate_limiter.update_from_headers(response.headers, response.status_code)
+
+        return response
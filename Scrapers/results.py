@@ -0,0 +1,486 @@
+# results.py
+import base64
+import json
+import math
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+URL_PREFIX = 'https://www.reddit.com'
+
+# Columns that hold numbers, with their array typecodes
+NUMERIC_COLUMNS = {
+    'upvotes': 'q',
+    'comments': 'q',
+    'date': 'd',
+    'sentiment': 'd'
+}
+
+# Post fields stored in their own column; anything else goes to the sparse extras
+POST_FIELDS = (
+    'id', 'title', 'content', 'url', 'subreddit', 'upvotes', 'comments', 'date', 'keyword', 'sentiment'
+)
+
+
+# Columns pages can be sorted on
+SORT_COLUMNS = ('upvotes', 'comments', 'date', 'sentiment')
+
+
+def _intern(value):
+    return sys.intern(value) if value else ''
+
+
+def encode_cursor(sort, descending, value, row):
+    """Encode the position after a page's last row as an opaque URL-safe token."""
+    payload = json.dumps([sort, bool(descending), value, row], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token from encode_cursor.
+
+    Returns:
+        tuple: (sort, descending, value, row)
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort, descending, value, row = json.loads(payload)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if (sort not in SORT_COLUMNS or not isinstance(row, int) or row < 0
+            or not isinstance(value, (int, float)) or not math.isfinite(value)):
+        raise ValueError(f"Invalid cursor: {token}")
+    return sort, bool(descending), value, row
+
+
+class ResultSet:
+    """
+    Compact, columnar set of scraped posts that collapses duplicate submissions.
+
+    Each field is stored as a column: numbers in typed arrays, and
+    subreddit and keyword strings interned so repeated values share one
+    object. Posts are only turned back into dicts when they are read.
+    The first time a submission is added it becomes the merged record;
+    later copies only add the keyword and subreddit they matched to
+    'matched_keywords' and 'matched_subreddits'.
+    """
+
+    def __init__(self, posts=None, max_content=None, content_loader=None):
+        """
+        Initialize the result set.
+
+        Args:
+            posts (iterable): Optional posts to add straight away
+            max_content (int): Optional number of characters of 'content' kept per post
+            content_loader (callable): Optional callable mapping a list of ids to
+                {id: full content}, used to restore truncated bodies on demand
+        """
+        self.max_content = max_content
+        self.content_loader = content_loader
+
+        self.ids = []
+        self.titles = []
+        self.contents = []
+        self.urls = []
+        self.subreddits = []
+        self.keywords = []
+        self.matched_keywords = []
+        self.matched_subreddits = []
+        self.numeric = {name: array(typecode) for name, typecode in NUMERIC_COLUMNS.items()}
+        self.extras = {}
+        self.truncated = set()
+
+        self._rows = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+        # Sorted rows per column, rebuilt on first use after the columns change
+        self._version = 0
+        self._sort_indexes = {}
+        self._index_lock = threading.Lock()
+
+        for post in posts or []:
+            self.add(post)
+
+    def add(self, post, keyword='', subreddit=''):
+        """
+        Add a post, merging it into the existing record for the same submission.
+
+        Args:
+            post (dict): Post as produced by RedditScraper
+            keyword (str): Keyword of the query that returned the post
+            subreddit (str): Subreddit the query searched ('all' for site-wide searches)
+
+        Returns:
+            tuple: (row, is_new) where row is the record's position in the set
+        """
+        keyword = keyword or post.get('keyword') or ''
+        with self._lock:
+            row = self._rows.get(post['id'])
+            is_new = row is None
+
+            if is_new:
+                row = self._append(post)
+            else:
+                self.duplicates += 1
+
+            # Posts of packed queries already carry every keyword they were attributed to
+            for value in (keyword, *(post.get('matched_keywords') or ())):
+                if value and value not in self.matched_keywords[row]:
+                    self.matched_keywords[row] += (_intern(value),)
+            for value in (subreddit, *(post.get('matched_subreddits') or ())):
+                if value and value not in self.matched_subreddits[row]:
+                    self.matched_subreddits[row] += (_intern(value),)
+
+            return row, is_new
+
+    def _append(self, post):
+        """Append a new record to every column and return its row."""
+        row = self._count
+        content = post.get('content') or ''
+        if self.max_content is not None and len(content) > self.max_content:
+            content = content[:self.max_content]
+            self.truncated.add(row)
+
+        url = post.get('url') or ''
+        self.ids.append(post['id'])
+        self.titles.append(post.get('title') or '')
+        self.contents.append(content)
+        self.urls.append(url[len(URL_PREFIX):] if url.startswith(URL_PREFIX) else url)
+        self.subreddits.append(_intern(post.get('subreddit')))
+        self.keywords.append(_intern(post.get('keyword')))
+        self.matched_keywords.append(tuple(_intern(k) for k in post.get('matched_keywords') or ()))
+        self.matched_subreddits.append(tuple(_intern(s) for s in post.get('matched_subreddits') or ()))
+        for name, column in self.numeric.items():
+            column.append(post.get(name) or 0)
+
+        extras = {key: value for key, value in post.items()
+                  if key not in POST_FIELDS and not key.startswith('matched_')}
+        if extras:
+            self.extras[row] = extras
+
+        # Readers only look at rows below the count, so publish the row last
+        self._rows[post['id']] = row
+        self._count += 1
+        self._version += 1
+        return row
+
+    def row_of(self, post_id):
+        """Return the row of a submission id, or None if it has not been added."""
+        return self._rows.get(post_id)
+
+    def get(self, post_id):
+        """Return the merged record for a submission id as a dict, or None if it has not been added."""
+        row = self._rows.get(post_id)
+        return self.materialize(row) if row is not None else None
+
+    def materialize(self, row, content_limit=None, include_content=True):
+        """
+        Build the dict for one row.
+
+        Args:
+            row (int): Row to materialize
+            content_limit (int): Optional maximum length of 'content'
+            include_content (bool): Leave 'content' out entirely when False
+
+        Returns:
+            dict: The post, in the shape produced by RedditScraper
+        """
+        url = self.urls[row]
+        post = {
+            'id': self.ids[row],
+            'title': self.titles[row],
+            'url': URL_PREFIX + url if url.startswith('/') else url,
+            'subreddit': self.subreddits[row],
+            'upvotes': self.numeric['upvotes'][row],
+            'comments': self.numeric['comments'][row],
+            'date': self.numeric['date'][row],
+            'keyword': self.keywords[row],
+            'sentiment': self.numeric['sentiment'][row],
+            'matched_keywords': list(self.matched_keywords[row]),
+            'matched_subreddits': list(self.matched_subreddits[row])
+        }
+        if include_content:
+            content = self.contents[row]
+            post['content'] = content[:content_limit] if content_limit is not None else content
+        if row in self.extras:
+            post.update(self.extras[row])
+        return post
+
+    def to_dicts(self, rows=None, content_limit=None, include_content=True, full_content=False):
+        """
+        Materialize rows as post dicts.
+
+        Args:
+            rows (iterable): Rows to materialize, all rows in order by default
+            content_limit (int): Optional maximum length of 'content'
+            include_content (bool): Leave 'content' out entirely when False
+            full_content (bool): Restore truncated bodies through content_loader
+
+        Returns:
+            list: Post dicts
+        """
+        rows = range(self._count) if rows is None else list(rows)
+        posts = [self.materialize(row, content_limit, include_content) for row in rows]
+
+        if full_content and include_content and self.content_loader is not None:
+            missing = [post['id'] for row, post in zip(rows, posts) if row in self.truncated]
+            if missing:
+                bodies = self.content_loader(missing)
+                for post in posts:
+                    if post['id'] in bodies:
+                        content = bodies[post['id']]
+                        post['content'] = content[:content_limit] if content_limit is not None else content
+
+        return posts
+
+    def iter_dicts(self, content_limit=None, include_content=True):
+        """
+        Yield every row as a post dict, one at a time.
+
+        Rows added while iterating are included, so the set can be read
+        while a scrape is still filling it.
+
+        Yields:
+            dict: Post dicts, in the order they were added
+        """
+        row = 0
+        while row < self._count:
+            yield self.materialize(row, content_limit, include_content)
+            row += 1
+
+    def column(self, name):
+        """Return a column by post field name."""
+        if name in self.numeric:
+            return self.numeric[name]
+        return {
+            'id': self.ids,
+            'title': self.titles,
+            'content': self.contents,
+            'subreddit': self.subreddits,
+            'keyword': self.keywords
+        }[name]
+
+    def order_by(self, name, descending=False, rows=None):
+        """
+        Return rows sorted by a column without materializing any post.
+
+        Args:
+            name (str): Column to sort on (upvotes, comments, date, sentiment, ...)
+            descending (bool): Sort from largest to smallest
+            rows (iterable): Rows to sort, all rows by default
+
+        Returns:
+            list: Sorted rows
+        """
+        column = self.column(name)
+        rows = range(self._count) if rows is None else rows
+        return sorted(rows, key=column.__getitem__, reverse=descending)
+
+    def filter_rows(self, min_sentiment=None, max_sentiment=None, subreddit=None, keyword=None, rows=None,
+                    text=None):
+        """
+        Return the rows matching every given condition.
+
+        Args:
+            min_sentiment (float): Lowest sentiment to keep
+            max_sentiment (float): Highest sentiment to keep
+            subreddit (str): Only keep posts from this subreddit (case-insensitive)
+            keyword (str): Only keep posts that matched this keyword (case-insensitive)
+            rows (iterable): Rows to filter, all rows by default
+            text (str): Only keep posts whose title, content, subreddit or keywords
+                contain this text (case-insensitive)
+
+        Returns:
+            list: Matching rows, in their original order
+        """
+        rows = range(self._count) if rows is None else rows
+        matches = self._row_filter(min_sentiment, max_sentiment, subreddit, keyword, text)
+        if matches is None:
+            return list(rows)
+        return [row for row in rows if matches(row)]
+
+    def _row_filter(self, min_sentiment=None, max_sentiment=None, subreddit=None, keyword=None, text=None):
+        """Return a predicate for rows matching every given condition, or None if there are none."""
+        if min_sentiment is None and max_sentiment is None and not subreddit and not keyword and not text:
+            return None
+
+        sentiments = self.numeric['sentiment']
+        subreddit = subreddit.lower() if subreddit else None
+        keyword = keyword.lower() if keyword else None
+        text = text.lower() if text else None
+
+        def matches(row):
+            if min_sentiment is not None and sentiments[row] < min_sentiment:
+                return False
+            if max_sentiment is not None and sentiments[row] > max_sentiment:
+                return False
+            if subreddit is not None and self.subreddits[row].lower() != subreddit:
+                return False
+            keywords = self.matched_keywords[row] or (self.keywords[row],)
+            if keyword is not None and keyword not in (k.lower() for k in keywords):
+                return False
+            if text is not None and not (
+                    text in self.titles[row].lower() or text in self.contents[row].lower()
+                    or text in self.subreddits[row].lower() or any(text in k.lower() for k in keywords)):
+                return False
+            return True
+
+        return matches
+
+    def sort_index(self, name):
+        """
+        Return every row sorted by a column, ascending, ties broken by row.
+
+        The index is kept until a post is added or its metrics change, so
+        paging through a finished result set sorts each column once.
+
+        Args:
+            name (str): One of SORT_COLUMNS
+
+        Returns:
+            list: Sorted rows
+        """
+        with self._index_lock:
+            version = self._version
+            cached = self._sort_indexes.get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            column = self.numeric[name]
+            rows = sorted(range(self._count), key=lambda row: (column[row], row))
+            self._sort_indexes[name] = (version, rows)
+            return rows
+
+    def page(self, sort='date', descending=True, limit=50, cursor=None, min_sentiment=None, max_sentiment=None,
+             subreddit=None, keyword=None, text=None, with_total=None):
+        """
+        Return one page of rows in sort order, continuing after a cursor.
+
+        Cursors name the (value, row) of the last row served rather than an
+        offset, so pages stay consistent while a running scrape adds posts.
+        Only as many rows are visited as it takes to fill the page, except
+        for counting the total, which scans every row when filters are set.
+
+        Args:
+            sort (str): Column to sort on, one of SORT_COLUMNS
+            descending (bool): Sort from largest to smallest
+            limit (int): Maximum rows in the page
+            cursor (str): next_cursor of the previous page; the first page if None
+            min_sentiment (float): Lowest sentiment to keep
+            max_sentiment (float): Highest sentiment to keep
+            subreddit (str): Only keep posts from this subreddit (case-insensitive)
+            keyword (str): Only keep posts that matched this keyword (case-insensitive)
+            text (str): Only keep posts containing this text, see filter_rows
+            with_total (bool): Count every matching row; defaults to the first page only
+
+        Returns:
+            dict: 'rows', 'next_cursor' (None after the last page) and 'total' (None when not counted)
+
+        Raises:
+            ValueError: If sort is unknown or the cursor belongs to another sort
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort on {sort}; use one of {', '.join(SORT_COLUMNS)}")
+
+        index = self.sort_index(sort)
+        column = self.numeric[sort]
+
+        def key(row):
+            return (column[row], row)
+
+        if cursor is not None:
+            cursor_sort, cursor_descending, value, last_row = decode_cursor(cursor)
+            if (cursor_sort, cursor_descending) != (sort, bool(descending)):
+                raise ValueError("Cursor belongs to a different sort order")
+            if descending:
+                positions = range(bisect_left(index, (value, last_row), key=key) - 1, -1, -1)
+            else:
+                positions = range(bisect_right(index, (value, last_row), key=key), len(index))
+        else:
+            positions = range(len(index) - 1, -1, -1) if descending else range(len(index))
+
+        matches = self._row_filter(min_sentiment, max_sentiment, subreddit, keyword, text)
+        rows = []
+        more = False
+        for position in positions:
+            row = index[position]
+            if matches is not None and not matches(row):
+                continue
+            if len(rows) == limit:
+                more = True
+                break
+            rows.append(row)
+
+        total = None
+        if with_total or (with_total is None and cursor is None):
+            total = len(index) if matches is None else sum(1 for row in index if matches(row))
+
+        next_cursor = None
+        if more and rows:
+            next_cursor = encode_cursor(sort, descending, column[rows[-1]], rows[-1])
+        return {'rows': rows, 'next_cursor': next_cursor, 'total': total}
+
+    def update_metrics(self, post_id, upvotes=None, comments=None):
+        """
+        Update the score and comment count of a stored submission.
+
+        Returns:
+            bool: True if the submission is in the set
+        """
+        row = self._rows.get(post_id)
+        if row is None:
+            return False
+        if upvotes is not None:
+            self.numeric['upvotes'][row] = upvotes
+        if comments is not None:
+            self.numeric['comments'][row] = comments
+        self._version += 1
+        return True
+
+    def annotate(self, post_id, fields):
+        """
+        Add extra fields, such as comment sentiment, to a stored submission.
+
+        Returns:
+            bool: True if the submission is in the set
+        """
+        row = self._rows.get(post_id)
+        if row is None:
+            return False
+        with self._lock:
+            self.extras[row] = dict(self.extras.get(row, {}), **fields)
+        return True
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, post_id):
+        return post_id in self._rows
+
+    def __iter__(self):
+        for row in range(self._count):
+            yield self.materialize(row)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.to_dicts(range(*key.indices(self._count)))
+        if key < 0:
+            key += self._count
+        if not 0 <= key < self._count:
+            raise IndexError('result row out of range')
+        return self.materialize(key)
+
+    def stats(self):
+        """
+        Return deduplication statistics.
+
+        Returns:
+            dict: Number of unique posts and of duplicates collapsed into them
+        """
+        return {'unique': self._count, 'duplicates': self.duplicates}
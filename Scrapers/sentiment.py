@@ -0,0 +1,116 @@
+# sentiment.py
+import string
+from itertools import repeat
+
+from .lazy import optional_import
+
+POSITIVE_WORDS = frozenset([
+    'good', 'great', 'excellent', 'amazing', 'awesome', 'fantastic',
+    'wonderful', 'best', 'love', 'happy', 'helpful', 'useful', 'recommend',
+    'positive', 'success', 'successful', 'beneficial', 'effective',
+    'impressive', 'innovative', 'outstanding', 'perfect', 'brilliant',
+    'excited', 'exciting', 'enjoy', 'enjoyed', 'interesting', 'valuable',
+    'favorite', 'thanks', 'thank', 'appreciation', 'appreciate', 'win',
+    'winning', 'winner', 'improvement', 'improve', 'improved'
+])
+
+NEGATIVE_WORDS = frozenset([
+    'bad', 'terrible', 'awful', 'horrible', 'poor', 'disappointing',
+    'disappointed', 'hate', 'dislike', 'worst', 'waste', 'useless',
+    'negative', 'fail', 'failure', 'problem', 'issue', 'trouble',
+    'difficult', 'hard', 'complicated', 'confusing', 'confused',
+    'annoying', 'annoyed', 'frustrated', 'frustrating', 'sad',
+    'unhappy', 'angry', 'broke', 'broken', 'expensive', 'overpriced',
+    'avoid', 'sucks', 'suck', 'stupid', 'ridiculous'
+])
+
+# One lookup per token: +1 for positive words, -1 for negative ones
+WORD_SCORES = dict.fromkeys(POSITIVE_WORDS, 1)
+WORD_SCORES.update(dict.fromkeys(NEGATIVE_WORDS, -1))
+
+# Punctuation is turned into spaces so "great!" and "(awful)" still match
+_PUNCTUATION_TABLE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+
+
+def sentiment_counts(text):
+    """
+    Count the sentiment words and scored tokens in a text.
+
+    The text is tokenized once, and tokenizing, word lengths and lexicon
+    lookups all run in C (str.translate, str.split and map), so no
+    Python-level loop touches individual words.
+
+    Args:
+        text (str): Text to analyze
+
+    Returns:
+        tuple: (net, total) where net is positive minus negative words and
+            total is the number of words longer than two characters
+    """
+    if not text:
+        return 0, 0
+
+    words = text.lower().translate(_PUNCTUATION_TABLE).split()
+    lengths = list(map(len, words))
+    total = len(words) - lengths.count(1) - lengths.count(2)
+    net = sum(map(WORD_SCORES.get, words, repeat(0)))
+    return net, total
+
+
+def score_counts(net, total):
+    """Turn (net, total) counts into a sentiment score between -1.0 and 1.0."""
+    if total == 0:
+        return 0.0
+    return max(min(net / (total ** 0.5), 1.0), -1.0)
+
+
+def score(text):
+    """
+    Perform a simple rule-based sentiment analysis.
+
+    Args:
+        text (str): Text to analyze
+
+    Returns:
+        float: Sentiment score (-1.0 to 1.0)
+    """
+    return score_counts(*sentiment_counts(text))
+
+
+def score_batch(texts):
+    """
+    Score many texts at once.
+
+    Args:
+        texts (iterable): Texts to analyze
+
+    Returns:
+        list: Sentiment scores (-1.0 to 1.0), in input order
+    """
+    counts = [sentiment_counts(text) for text in texts]
+    # NumPy is optional and only imported by the first batch; batches fall back to pure Python
+    np = optional_import('numpy') if counts else None
+    if np is None:
+        return [score_counts(net, total) for net, total in counts]
+
+    net, total = np.array(counts, dtype=np.float64).T
+    scores = np.zeros(len(counts))
+    scored = total > 0
+    scores[scored] = np.clip(net[scored] / np.sqrt(total[scored]), -1.0, 1.0)
+    return scores.tolist()
+
+
+def score_posts(posts):
+    """
+    Set the 'sentiment' of every post from its title and content.
+
+    Args:
+        posts (list): Post dicts with 'title' and 'content'
+
+    Returns:
+        list: The same posts, updated in place
+    """
+    scores = score_batch(f"{post.get('title') or ''} {post.get('content') or ''}" for post in posts)
+    for post, sentiment in zip(posts, scores):
+        post['sentiment'] = sentiment
+    return posts
@@ -0,0 +1,318 @@
+# sheets.py
+import collections
+import logging
+import queue
+import random
+import threading
+import time
+
+from .rate_limiter import parse_retry_after
+
+# Columns written for every post; the id comes first so rows can be deduplicated
+SHEET_COLUMNS = (
+    'id', 'title', 'content', 'url', 'subreddit', 'date', 'keyword', 'upvotes', 'comments', 'sentiment'
+)
+
+SHEET_HEADER = [
+    'ID', 'Title', 'Content', 'URL', 'Subreddit', 'Date', 'Keyword', 'Upvotes', 'Comments', 'Sentiment'
+]
+
+# Google Sheets accepts at most 50,000 characters per cell
+MAX_CELL_CHARS = 50000
+
+# Google Sheets allows 60 write requests per minute per user
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+
+class SheetRateLimited(Exception):
+    """Raised by a sheet backend when the API rejects a request with HTTP 429."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def post_to_row(post):
+    """
+    Convert a post to a sheet row in SHEET_COLUMNS order.
+
+    Args:
+        post (dict): Post as produced by RedditScraper
+
+    Returns:
+        list: Cell values
+    """
+    row = []
+    for column in SHEET_COLUMNS:
+        value = post.get(column)
+        if column == 'date' and value:
+            value = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(value))
+        elif isinstance(value, str):
+            value = value[:MAX_CELL_CHARS]
+        row.append('' if value is None else value)
+    return row
+
+
+class GspreadBackend:
+    """Sheet backend that writes to a gspread worksheet."""
+
+    def __init__(self, worksheet, insert_at=None):
+        """
+        Initialize the backend.
+
+        Args:
+            worksheet (gspread.Worksheet): Worksheet to write to
+            insert_at (int): Insert new rows at this row (2 keeps the newest rows
+                under the header); rows are appended at the bottom by default
+        """
+        self.worksheet = worksheet
+        self.insert_at = insert_at
+        self._has_rows = True
+
+    def read_ids(self):
+        """Return the values of the id column, including the header."""
+        ids = self._call(self.worksheet.col_values, 1)
+        self._has_rows = any(ids)
+        return ids
+
+    def append_rows(self, rows):
+        """Write rows with a single API call."""
+        # An empty sheet is filled from the top, so the header lands in row 1
+        if self.insert_at is not None and self._has_rows:
+            self._call(self.worksheet.insert_rows, rows, row=self.insert_at, value_input_option='RAW')
+        else:
+            self._call(self.worksheet.append_rows, rows, value_input_option='RAW')
+        self._has_rows = True
+
+    @staticmethod
+    def _call(method, *args, **kwargs):
+        """Call a gspread method, translating HTTP 429 responses into SheetRateLimited."""
+        from gspread.exceptions import APIError
+
+        try:
+            return method(*args, **kwargs)
+        except APIError as e:
+            response = getattr(e, 'response', None)
+            if response is not None and response.status_code == 429:
+                raise SheetRateLimited(str(e), parse_retry_after(response.headers.get('Retry-After')))
+            raise
+
+
+class FakeSheetBackend:
+    """
+    In-process stand-in for a worksheet, for offline tests and benchmarks.
+
+    Rows are kept in a list. Each request can be given an artificial
+    latency, and a per-window request quota makes the backend reject
+    requests with SheetRateLimited the way the Sheets API answers 429.
+    """
+
+    def __init__(self, rows=None, latency=0.0, requests_per_window=None, window=60.0):
+        """
+        Initialize the backend.
+
+        Args:
+            rows (list): Optional rows already in the sheet
+            latency (float): Seconds each request takes
+            requests_per_window (int): Requests accepted per window, unlimited by default
+            window (float): Length of the quota window in seconds
+        """
+        self.rows = [list(row) for row in rows or []]
+        self.latency = latency
+        self.requests_per_window = requests_per_window
+        self.window = window
+
+        self.requests = 0
+        self.rejected = 0
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+
+    def _request(self):
+        """Simulate one API request, enforcing the quota."""
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= self.window:
+                self._recent.popleft()
+            if self.requests_per_window is not None and len(self._recent) >= self.requests_per_window:
+                self.rejected += 1
+                raise SheetRateLimited(
+                    'Quota exceeded for write requests',
+                    retry_after=self.window - (now - self._recent[0])
+                )
+            self._recent.append(now)
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def read_ids(self):
+        self._request()
+        with self._lock:
+            return [row[0] if row else '' for row in self.rows]
+
+    def append_rows(self, rows):
+        self._request()
+        with self._lock:
+            self.rows.extend(list(row) for row in rows)
+
+
+class SheetWriter:
+    """
+    Background writer that coalesces posts into few, large sheet requests.
+
+    Posts are queued and written by one worker thread, up to batch_size
+    rows per request. Requests are spaced to stay inside the API quota,
+    and rejected requests are retried with exponential backoff and jitter,
+    honouring Retry-After. The queue is bounded, so callers block once the
+    writer falls behind. Posts whose id is already in the sheet are skipped.
+    """
+
+    def __init__(self, backend, batch_size=500, max_queue=5000,
+                 requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, max_retries=6,
+                 base_delay=1.0, max_delay=64.0, write_header=True):
+        """
+        Initialize the writer and start its worker thread.
+
+        Args:
+            backend: GspreadBackend, FakeSheetBackend or any object with
+                read_ids() and append_rows(rows)
+            batch_size (int): Maximum rows per request
+            max_queue (int): Maximum rows waiting to be written
+            requests_per_minute (int): Request quota to stay under, None for no pacing
+            max_retries (int): Attempts per batch after a rate-limited request
+            base_delay (float): First backoff delay in seconds
+            max_delay (float): Longest backoff delay in seconds
+            write_header (bool): Write SHEET_HEADER when the sheet is empty
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.logger = logging.getLogger('scraper')
+
+        existing = backend.read_ids()
+        self._seen = set(existing)
+        self._pending_header = write_header and not any(existing)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._seen_lock = threading.Lock()
+        self._next_request = 0.0
+
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.requests = 0
+        self.retries = 0
+
+        self._worker = threading.Thread(target=self._run, name='sheet-writer', daemon=True)
+        self._worker.start()
+
+    def write(self, posts):
+        """
+        Queue posts for writing, blocking while the queue is full.
+
+        Args:
+            posts (iterable): Post dicts
+
+        Returns:
+            int: Number of posts queued (posts already in the sheet are skipped)
+        """
+        if self._closed:
+            raise RuntimeError('SheetWriter is closed')
+
+        queued = 0
+        for post in posts:
+            with self._seen_lock:
+                if post.get('id') in self._seen:
+                    self.skipped += 1
+                    continue
+                self._seen.add(post.get('id'))
+            self._queue.put(post_to_row(post))
+            queued += 1
+        return queued
+
+    def close(self):
+        """Write every queued row and stop the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        """
+        Return the writer's counters.
+
+        Returns:
+            dict: Rows written, skipped as duplicates and failed, requests and retries
+        """
+        return {
+            'written': self.written,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'requests': self.requests,
+            'retries': self.retries
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        """Drain the queue in batches until close() is called."""
+        finished = False
+        while not finished:
+            rows = [self._queue.get()]
+            # Coalesce whatever else is already waiting into the same request
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in rows:
+                rows = [row for row in rows if row is not None]
+                finished = True
+
+            for start in range(0, len(rows), self.batch_size):
+                self._write_batch(rows[start:start + self.batch_size])
+
+    def _write_batch(self, rows):
+        """Write one batch, pacing requests and backing off when rate limited."""
+        if not rows:
+            return
+        if self._pending_header:
+            rows = [SHEET_HEADER] + rows
+
+        for attempt in range(self.max_retries + 1):
+            delay = self._next_request - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_request = time.monotonic() + self.min_interval
+
+            try:
+                self.requests += 1
+                self.backend.append_rows(rows)
+                if self._pending_header:
+                    self._pending_header = False
+                    rows = rows[1:]
+                self.written += len(rows)
+                return
+            except SheetRateLimited as e:
+                if attempt == self.max_retries:
+                    break
+                backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+                backoff = max(backoff, e.retry_after or 0) + random.uniform(0, self.base_delay)
+                self.retries += 1
+                self.logger.warning(f"Sheet write rate limited, retrying in {backoff:.1f}s")
+                self._next_request = time.monotonic() + backoff
+            except Exception as e:
+                self.logger.error(f"Error writing {len(rows)} rows to the sheet: {e}")
+                break
+
+        self.failed += len(rows) - (1 if self._pending_header else 0)
+        self.logger.error(f"Giving up on {len(rows)} sheet rows")
@@ -1,7 +1,16 @@
-from flask import Flask, request, jsonify, render_template
-import json
+from flask import Flask, Response, g, request, jsonify, render_template
+from flask.json.provider import DefaultJSONProvider
 import os
+import threading
+import time
+from Scrapers import metrics
 from Scrapers.reddit_scraper import RedditScraper
+from Scrapers.query_cache import QueryCache
+from Scrapers.post_store import PostStore
+from Scrapers.analytics import INTERVALS, TrendIndex
+from Scrapers.jobs import JobManager, JobQueueFull, FAILED
+from Scrapers.exporters import EXPORT_FORMATS, ExportError, export_stream
+from Scrapers.serialization import compress, compress_chunks, get_serializer, is_compressible, negotiate_encoding
 import logging
 from dotenv import load_dotenv
 
@@ -26,13 +35,217 @@ CLIENT_ID = os.environ.get('REDDIT_CLIENT_ID')
 CLIENT_SECRET = os.environ.get('REDDIT_CLIENT_SECRET')
 USER_AGENT = os.environ.get('REDDIT_USER_AGENT')
 
+# Maximum number of subreddit/keyword queries run concurrently per scrape
+SCRAPER_MAX_WORKERS = int(os.environ.get('SCRAPER_MAX_WORKERS', 8))
+
+# Maximum number of (subreddit, keyword) query results kept in memory
+SCRAPE_CACHE_SIZE = int(os.environ.get('SCRAPE_CACHE_SIZE', 512))
+
+# Optional durable post store; enables incremental and local-first scrapes when set
+POST_STORE_PATH = os.environ.get('POST_STORE_PATH')
+
+# Seconds the post store's coverage of a query stays fresh before local-first scrapes fetch newer posts
+SCRAPE_LOCAL_MAX_AGE = float(os.environ.get('SCRAPE_LOCAL_MAX_AGE', 3600))
+
+# Number of scrape jobs run at the same time, and how many may wait to start
+SCRAPE_JOB_WORKERS = int(os.environ.get('SCRAPE_JOB_WORKERS', 2))
+SCRAPE_JOB_QUEUE_SIZE = int(os.environ.get('SCRAPE_JOB_QUEUE_SIZE', 50))
+
+# Pack keywords into OR searches and subreddits into multireddits. Opt-in: pairs keep post_limit each,
+# but packed searches rank results across all their keywords instead of per (subreddit, keyword)
+SCRAPE_COLLAPSE_QUERIES = os.environ.get('SCRAPE_COLLAPSE_QUERIES', '0').lower() in ('1', 'true', 'yes')
+
+# Comment harvesting defaults: posts harvested per job and the API calls they may use in total
+SCRAPE_COMMENT_POSTS = int(os.environ.get('SCRAPE_COMMENT_POSTS', 25))
+SCRAPE_COMMENT_MAX_REQUESTS = int(os.environ.get('SCRAPE_COMMENT_MAX_REQUESTS', 100))
+
+# Options a /scrape request may set for its comment harvest
+COMMENT_OPTIONS = ('max_posts', 'max_comments', 'max_depth', 'max_more', 'max_requests', 'sort')
+
+# Default and maximum number of posts in one page of /jobs/<id>/results
+RESULTS_PAGE_SIZE = int(os.environ.get('RESULTS_PAGE_SIZE', 100))
+RESULTS_PAGE_MAX = int(os.environ.get('RESULTS_PAGE_MAX', 1000))
+
+# Import praw and build Reddit clients on first use, keeping cold starts short; 0 builds one at startup
+SCRAPER_LAZY_INIT = os.environ.get('SCRAPER_LAZY_INIT', '1').lower() in ('1', 'true', 'yes')
+
+# Authenticate against Reddit once, before the first scrape, instead of failing inside the job
+SCRAPER_VALIDATE_CREDENTIALS = os.environ.get('SCRAPER_VALIDATE_CREDENTIALS', '1').lower() in ('1', 'true', 'yes')
+
+# Finest bucket of the /analytics trend aggregates in seconds, and the top posts kept per bucket
+ANALYTICS_BUCKET_SECONDS = int(os.environ.get('ANALYTICS_BUCKET_SECONDS', 3600))
+ANALYTICS_TOP_POSTS = int(os.environ.get('ANALYTICS_TOP_POSTS', 3))
+
+# Days of posts kept in the trend aggregates; older posts age out (0 keeps everything)
+ANALYTICS_RETENTION_DAYS = float(os.environ.get('ANALYTICS_RETENTION_DAYS', 90))
+
+# Fold the post store into the trend aggregates on the first /analytics request
+ANALYTICS_BACKFILL = os.environ.get('ANALYTICS_BACKFILL', '1').lower() in ('1', 'true', 'yes')
+
+# JSON serializer of API responses: auto (orjson when installed), orjson or json
+JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'auto')
+
+# Compress text and JSON responses with brotli or gzip, as the client accepts; smaller bodies are sent as they are
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '1').lower() in ('1', 'true', 'yes')
+RESPONSE_COMPRESS_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESS_MIN_SIZE', 1024))
+
+# Brotli quality and gzip level of compressed responses; higher ones cost more time than they save on the wire
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', 4))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', 1))
+
+# Record counters and latency histograms for /metrics; disabling leaves only a flag check on hot paths
+SCRAPER_METRICS = os.environ.get('SCRAPER_METRICS', '1').lower() in ('1', 'true', 'yes')
+metrics.registry.enabled = SCRAPER_METRICS
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Encodes JSON responses with the configured serializer, keeping keys in insertion order."""
+    
+    sort_keys = False
+    
+    def __init__(self, app, serializer='auto'):
+        super().__init__(app)
+        self.serialize = get_serializer(serializer, default=self.default)
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.serialize(obj).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        # Debug mode pretty-prints responses
+        if self._app.debug:
+            return super().response(*args, **kwargs)
+        body = self.serialize(self._prepare_response_obj(args, kwargs)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+app.json = FastJSONProvider(app, JSON_SERIALIZER)
+
 # Initialize scraper
 reddit_scraper = RedditScraper(
     client_id=CLIENT_ID,
     client_secret=CLIENT_SECRET,
-    user_agent=USER_AGENT
+    user_agent=USER_AGENT,
+    max_workers=SCRAPER_MAX_WORKERS,
+    cache=QueryCache(maxsize=SCRAPE_CACHE_SIZE),
+    store=PostStore(POST_STORE_PATH) if POST_STORE_PATH else None,
+    lazy=SCRAPER_LAZY_INIT,
+    analytics=TrendIndex(bucket_seconds=ANALYTICS_BUCKET_SECONDS, top_posts=ANALYTICS_TOP_POSTS,
+                         retention=ANALYTICS_RETENTION_DAYS * 86400 or None)
 )
 
+# Background workers that run scrapes; every job keeps its own results
+job_manager = JobManager(
+    reddit_scraper,
+    max_workers=SCRAPE_JOB_WORKERS,
+    max_pending=SCRAPE_JOB_QUEUE_SIZE
+)
+
+# Whether the post store has been folded into the trend aggregates yet
+_analytics_backfill = {'done': not ANALYTICS_BACKFILL, 'lock': threading.Lock()}
+
+@app.before_request
+def start_timer():
+    """Remember when the request started, for the latency histogram."""
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_latency(response):
+    """Record the request's latency; streamed responses are timed until their first byte."""
+    started = g.get('request_started')
+    if started is not None:
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method,
+            status=str(response.status_code)
+        )
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    """
+    Compress text and JSON responses with the best coding the client accepts.
+    
+    Bodies under RESPONSE_COMPRESS_MIN_SIZE are sent as they are. Streamed
+    responses are compressed chunk by chunk, flushing after each one, so
+    streamed posts still arrive as soon as they are scraped.
+    """
+    if (not RESPONSE_COMPRESSION or request.method == 'HEAD' or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or not is_compressible(response.mimetype)):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    level = RESPONSE_BROTLI_QUALITY if encoding == 'br' else RESPONSE_GZIP_LEVEL
+    
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < RESPONSE_COMPRESS_MIN_SIZE:
+            return response
+        start = time.perf_counter()
+        compressed = compress(data, encoding, level)
+        seconds = time.perf_counter() - start
+        metrics.record_stage('compress', seconds)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        if 'Server-Timing' in response.headers:
+            response.headers['Server-Timing'] += f", compress;dur={seconds * 1000:.1f}"
+    
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def content_options(value):
+    """
+    Parse the content option of a request: full (default), omit, or the number of characters to keep.
+    
+    Returns:
+        tuple: (content_limit, include_content)
+        
+    Raises:
+        ValueError: If the value is none of those
+    """
+    if value is None or value in ('', 'full'):
+        return None, True
+    if value == 'omit':
+        return None, False
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('content must be full, omit or a number of characters')
+    if limit < 0:
+        raise ValueError('content must be full, omit or a number of characters')
+    return limit, True
+
+
+def trim_content(posts, content_limit, include_content):
+    """Truncate or drop the content of post dicts as they are consumed."""
+    for post in posts:
+        if not include_content:
+            post.pop('content', None)
+        elif content_limit is not None and post.get('content'):
+            post['content'] = post['content'][:content_limit]
+        yield post
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose counters and histograms in the Prometheus text format."""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/')
 def index():
     """Render the main page."""
@@ -40,7 +253,24 @@ def index():
 
 @app.route('/scrape', methods=['POST'])
 def scrape():
-    """Handle the scraping request from the frontend."""
+    """
+    Queue a scrape job for the request from the frontend.
+    
+    Returns the job id straight away (202). With "stream": true the job's
+    posts are streamed back as NDJSON as they are scraped; with "wait": true
+    the response is held until the job finishes and carries its results.
+    With "timing": true the job records how long each stage took; a waited
+    response carries the breakdown under "timing" and in a Server-Timing
+    header, which also includes the response's own serialization.
+    With "comments": true (or an object of harvest options) the most
+    commented posts also get the aggregate sentiment of their discussion
+    once the scrape has finished; streamed posts are sent before that.
+    With "local_first": true, queries the post store fully covers are
+    answered from its full-text index, and only posts newer than its
+    coverage are fetched once that is older than "max_age" seconds.
+    "content" sets what returned posts carry of their body: "full"
+    (default), "omit", or the number of characters to keep.
+    """
     try:
         # Get parameters from the request
         data = request.json
@@ -49,47 +279,417 @@ def scrape():
         post_limit = int(data.get('post_limit', 50))
         time_filter = data.get('time_filter', 'month')
         sort_by = data.get('sort_by', 'relevance')
+        use_cache = bool(data.get('cache', True))
+        refresh = bool(data.get('refresh', False))
+        incremental = bool(data.get('incremental', False))
+        local_first = bool(data.get('local_first', False))
+        max_age = float(data.get('max_age', SCRAPE_LOCAL_MAX_AGE))
+        # Local-first queries are answered per (subreddit, keyword), so they are not packed by default
+        collapse = bool(data.get('collapse', SCRAPE_COLLAPSE_QUERIES and not local_first))
+        stream = bool(data.get('stream', False))
+        wait = bool(data.get('wait', False))
+        timing = bool(data.get('timing', False))
+        comments = data.get('comments')
         
         # Validate inputs
         if not keywords and not subreddits:
             return jsonify({'error': 'Please provide at least one keyword or subreddit'}), 400
-            
-        # Perform scraping
-        results = reddit_scraper.scrape_reddit(
+        try:
+            content_limit, include_content = content_options(data.get('content'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if comments:
+            options = comments if isinstance(comments, dict) else {}
+            unknown = sorted(set(options) - set(COMMENT_OPTIONS))
+            if unknown:
+                return jsonify({'error': f"Unknown comment options: {', '.join(unknown)}"}), 400
+            comments = dict({'max_posts': SCRAPE_COMMENT_POSTS, 'max_requests': SCRAPE_COMMENT_MAX_REQUESTS}, **options)
+        else:
+            comments = None
+        if incremental and reddit_scraper.store is None:
+            return jsonify({'error': 'Incremental scraping requires POST_STORE_PATH to be set'}), 400
+        if local_first and reddit_scraper.store is None:
+            return jsonify({'error': 'Local-first scraping requires POST_STORE_PATH to be set'}), 400
+        if local_first and (incremental or collapse):
+            return jsonify({'error': 'Local-first scraping cannot be combined with incremental or collapse'}), 400
+        # Reddit is only contacted to check the credentials when some query needs the API
+        live = SCRAPER_VALIDATE_CREDENTIALS and not (local_first and reddit_scraper.served_locally(
+            keywords, subreddits, post_limit, time_filter, sort_by, max_age))
+        try:
+            reddit_scraper.validate_credentials(live=live)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 503
+        
+        job = job_manager.submit(dict(
             keywords=keywords,
             subreddits=subreddits,
             post_limit=post_limit,
             time_filter=time_filter,
-            sort=sort_by
-        )
+            sort=sort_by,
+            use_cache=use_cache,
+            refresh=refresh,
+            incremental=incremental,
+            collapse=collapse,
+            local_first=local_first,
+            max_age=max_age
+        ), timing=timing, comments=comments)
+        
+        # Send posts to the client as they are extracted
+        if stream:
+            return Response(
+                stream_job(job, content_limit, include_content),
+                mimetype='application/x-ndjson',
+                # Stop reverse proxies from buffering the stream
+                headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+            )
         
-        return jsonify({'results': results})
+        if wait:
+            job.wait()
+            if job.status == FAILED:
+                return jsonify({'job_id': job.id, 'error': job.error}), 500
+            return scrape_response(job, content_limit, include_content)
+        
+        return jsonify(job_links(job)), 202
     
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         app.logger.error(f"Scraping error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 
+def scrape_response(job, content_limit=None, include_content=True):
+    """Build the response of a waited scrape, with its timing breakdown when one was collected."""
+    with metrics.use_breakdown(job.breakdown):
+        with metrics.span('materialize'):
+            payload = {
+                'job_id': job.id,
+                'results': job.results.to_dicts(content_limit=content_limit, include_content=include_content),
+                'duplicates': job.results.duplicates
+            }
+        if job.breakdown is not None:
+            payload['timing'] = job.breakdown.to_dict()
+        
+        start = time.perf_counter()
+        response = jsonify(payload)
+        serialize = time.perf_counter() - start
+        metrics.record_stage('serialize', serialize)
+    
+    if job.breakdown is not None:
+        stages = {stage: totals['seconds'] for stage, totals in payload['timing']['stages'].items()}
+        stages['serialize'] = serialize
+        response.headers['Server-Timing'] = ', '.join(
+            f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages.items())
+    return response
+
+
+def job_links(job):
+    """Return a job's summary with the URLs of its status and results."""
+    summary = job.to_dict()
+    summary['status_url'] = f"/jobs/{job.id}"
+    summary['results_url'] = f"/jobs/{job.id}/results"
+    return summary
+
+
+def stream_job(job, content_limit=None, include_content=True):
+    """
+    Generate an NDJSON stream of a job's events.
+    
+    Every line is a JSON object: {"type": "job", "job_id": "..."} first,
+    {"type": "post", "post": {...}} for each post as soon as it is scraped,
+    then {"type": "end", "count": n, "status": "..."}, or
+    {"type": "error", "error": "..."} if the job fails. Disconnecting does
+    not cancel the job; its results stay available under /jobs/<id>.
+    """
+    dumps = app.json.serialize
+    yield dumps({'type': 'job', 'job_id': job.id}) + b'\n'
+    
+    count = 0
+    for post in job.iter_results(content_limit=content_limit, include_content=include_content):
+        count += 1
+        yield dumps({'type': 'post', 'post': post}) + b'\n'
+    
+    if job.status == FAILED:
+        yield dumps({'type': 'error', 'error': job.error}) + b'\n'
+    else:
+        yield dumps({'type': 'end', 'count': count, 'status': job.status}) + b'\n'
+
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """List known scrape jobs, newest first."""
+    return jsonify({'jobs': [job.to_dict() for job in reversed(job_manager.list())]})
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Return the status and progress of a scrape job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(job_links(job))
+
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """
+    Return the posts a scrape job has collected so far.
+    
+    Without limit or cursor every post is returned. With them, one page is
+    returned in sort order along with the cursor of the next page, which
+    is null after the last one; the first page also carries the total
+    number of matching posts.
+    
+    Query parameters:
+        content (str): full (default), omit, or the number of characters of content to keep
+        content_limit (int): Truncate every post's content to this many characters
+        limit (int): Posts per page, at most RESULTS_PAGE_MAX
+        cursor (str): next_cursor of the previous page
+        sort (str): upvotes, comments, date (default) or sentiment
+        order (str): desc (default) or asc
+        subreddit (str): Only posts from this subreddit
+        keyword (str): Only posts that matched this keyword
+        min_sentiment (float): Lowest sentiment to include
+        max_sentiment (float): Highest sentiment to include
+        q (str): Only posts whose title, content, subreddit or keywords contain this text
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    try:
+        content_limit, include_content = content_options(request.args.get('content'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if content_limit is None:
+        content_limit = request.args.get('content_limit', type=int)
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'results': job.results.to_dicts(content_limit=content_limit, include_content=include_content)
+        })
+    
+    limit = request.args.get('limit', RESULTS_PAGE_SIZE, type=int)
+    order = request.args.get('order', 'desc')
+    if not 1 <= limit <= RESULTS_PAGE_MAX:
+        return jsonify({'error': f'limit must be between 1 and {RESULTS_PAGE_MAX}'}), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'order must be asc or desc'}), 400
+    
+    try:
+        page = job.results.page(
+            sort=request.args.get('sort', 'date'),
+            descending=order == 'desc',
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            min_sentiment=request.args.get('min_sentiment', type=float),
+            max_sentiment=request.args.get('max_sentiment', type=float),
+            subreddit=request.args.get('subreddit'),
+            keyword=request.args.get('keyword'),
+            text=request.args.get('q')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'results': job.results.to_dicts(page['rows'], content_limit=content_limit, include_content=include_content),
+        'next_cursor': page['next_cursor'],
+        'total': page['total']
+    })
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running scrape job."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/refresh', methods=['POST'])
+def refresh_metrics():
+    """
+    Refresh upvotes and comment counts of already-scraped posts.
+    
+    The body lists submission "ids" and/or a "job_id" whose results are
+    refreshed in place. Ids are looked up 100 per API call.
+    """
+    try:
+        data = request.json or {}
+        ids = list(data.get('ids') or [])
+        job = None
+        
+        if data.get('job_id'):
+            job = job_manager.get(data['job_id'])
+            if job is None:
+                return jsonify({'error': f"Unknown job {data['job_id']}"}), 404
+            ids.extend(job.results.ids)
+        
+        if not ids:
+            return jsonify({'error': 'Please provide submission ids or a job id'}), 400
+        
+        refreshed = reddit_scraper.refresh_metrics(ids, result_sets=[job.results] if job else ())
+        
+        return jsonify({
+            'requested': len(set(ids)),
+            'refreshed': len(refreshed),
+            'metrics': refreshed
+        })
+    
+    except Exception as e:
+        logger.error(f"Error refreshing metrics: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def backfill_analytics():
+    """Fold the post store into the trend aggregates once, before they are first queried."""
+    if _analytics_backfill['done']:
+        return
+    with _analytics_backfill['lock']:
+        if _analytics_backfill['done']:
+            return
+        if reddit_scraper.store is not None:
+            start = time.perf_counter()
+            added = reddit_scraper.analytics.backfill(reddit_scraper.store.iter_posts())
+            logger.info(f"Backfilled {added} trend entries from the post store in {time.perf_counter() - start:.2f}s")
+        _analytics_backfill['done'] = True
+
+
+@app.route('/analytics', methods=['GET'])
+def analytics():
+    """
+    Return sentiment and volume trends of every post scraped so far.
+    
+    Posts are counted once, as they are scraped, into hourly aggregates
+    per subreddit and keyword, so a trend is rolled up from its buckets
+    without visiting the posts. Stored posts are folded in on the first
+    request.
+    
+    Query parameters:
+        subreddit (str): Only this subreddit
+        keyword (str): Only posts that matched this keyword
+        interval (str): hour, day (default) or week
+        since (float): Only intervals starting at or after this timestamp
+        until (float): Only intervals starting at or before this timestamp
+    """
+    interval = request.args.get('interval', 'day')
+    if interval not in INTERVALS:
+        return jsonify({'error': f"interval must be one of {', '.join(INTERVALS)}"}), 400
+    
+    backfill_analytics()
+    try:
+        trend = reddit_scraper.analytics.trend(
+            subreddit=request.args.get('subreddit'),
+            keyword=request.args.get('keyword'),
+            since=request.args.get('since', type=float),
+            until=request.args.get('until', type=float),
+            interval=interval
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    posts = sum(bucket['posts'] for bucket in trend)
+    return jsonify({
+        'subreddit': request.args.get('subreddit'),
+        'keyword': request.args.get('keyword'),
+        'interval': interval,
+        'totals': {
+            'posts': posts,
+            'upvotes': sum(bucket['upvotes'] for bucket in trend),
+            'comments': sum(bucket['comments'] for bucket in trend),
+            'mean_sentiment': round(sum(bucket['mean_sentiment'] * bucket['posts'] for bucket in trend) / posts, 4)
+            if posts else 0.0
+        },
+        'buckets': trend
+    })
+
+
+@app.route('/analytics/series', methods=['GET'])
+def analytics_series():
+    """List the subreddit and keyword series /analytics can report on; keyword '' covers every post."""
+    backfill_analytics()
+    return jsonify({'series': reddit_scraper.analytics.series()})
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Return hit/miss statistics for the scrape result cache."""
+    return jsonify(reddit_scraper.cache.stats())
+
+
 @app.route('/export', methods=['GET'])
 def export_data():
-    """API endpoint to export previously scraped data."""
+    """
+    Export the data of a scrape job (the latest finished one by default).
+    
+    Without a format the legacy JSON response is returned. With
+    format=csv|jsonl|parquet|arrow the rows are streamed as a file download,
+    encoded a chunk at a time so large exports run in constant memory.
+    
+    Query parameters:
+        format (str): csv, jsonl, parquet or arrow
+        gzip (bool): Gzip-compress the streamed file
+        source (str): "job" (default) or "store" to export the whole post store
+        job_id (str): Job to export
+        since (float): With source=store, only export posts created after this timestamp
+        content (str): full (default), omit, or the number of characters of content to keep
+    """
     try:
-        # Get most recent results
-        results = reddit_scraper.results
+        export_format = request.args.get('format')
+        source = request.args.get('source', 'job')
+        job_id = request.args.get('job_id')
+        try:
+            content_limit, include_content = content_options(request.args.get('content'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
+        if source == 'store':
+            if reddit_scraper.store is None:
+                return jsonify({'status': 'error', 'message': 'Exporting the store requires POST_STORE_PATH to be set'}), 400
+            if not export_format:
+                return jsonify({'status': 'error', 'message': 'Exporting the store requires a format'}), 400
+            posts = trim_content(reddit_scraper.store.iter_posts(since=request.args.get('since', type=float)),
+                                 content_limit, include_content)
+            filename = 'reddit_posts'
+        else:
+            job = job_manager.get(job_id) if job_id else job_manager.latest()
+            if job is None or not len(job.results):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'No data available to export',
+                }), 404
+            posts = job.results.iter_dicts(content_limit=content_limit, include_content=include_content)
+            filename = f'reddit_posts_{job.id}'
         
-        if not results:
+        if not export_format:
+            results = list(posts)
+            # Return data for download
             return jsonify({
-                'status': 'error',
-                'message': 'No data available to export',
-            }), 404
-            
-        # Return data for download
-        return jsonify({
-            'status': 'success',
-            'message': f'Exported {len(results)} records',
-            'data': results
-        })
+                'status': 'success',
+                'message': f'Exported {len(results)} records',
+                'data': results
+            })
         
+        use_gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        chunks = export_stream(posts, export_format, compress=use_gzip)
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"{filename}.{extension}{'.gz' if use_gzip else ''}"
+        
+        return Response(
+            chunks,
+            mimetype='application/gzip' if use_gzip else mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename="{filename}"',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    
+    except ExportError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         logger.error(f"Error exporting data: {e}")
         return jsonify({
@@ -0,0 +1,143 @@
+# bench_analytics.py
+"""
+Benchmark the incremental trend aggregates against recomputing trends from the posts.
+
+Run from the repository root:
+
+    python benchmarks/bench_analytics.py [--posts 200000] [--days 90] [--queries 50]
+
+Posts are folded into a TrendIndex one batch at a time (as scrapes add
+them) and with a single vectorized backfill (as when the post store is
+loaded). Trend queries rolled up from the buckets are timed against a
+scan over every post, and checked to return the same numbers; both ways
+of loading must also agree on every interval's top posts.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers.analytics import INTERVALS, TrendIndex, interval_start, post_weight
+
+SUBREDDITS = ['emailmarketing', 'marketing', 'seo', 'sales', 'startups', 'smallbusiness']
+KEYWORDS = ['newsletter', 'open rate', 'deliverability', 'cold email', 'automation']
+
+
+def make_posts(count, days, seed=42):
+    """Build posts spread over the last days, each matching one or two keywords."""
+    rng = random.Random(seed)
+    now = 1.7e9
+    return [{
+        'id': f'p{i}',
+        'title': f'Post {i}',
+        'subreddit': rng.choice(SUBREDDITS),
+        'matched_keywords': rng.sample(KEYWORDS, rng.choice((1, 1, 2))),
+        'date': now - rng.random() * days * 86400,
+        'sentiment': round(rng.uniform(-1, 1), 3),
+        'upvotes': int(rng.expovariate(1 / 50)),
+        'comments': int(rng.expovariate(1 / 10))
+    } for i in range(count)]
+
+
+def scan_trend(posts, subreddit, keyword, interval):
+    """Recompute a trend from every post, as a query without the aggregates would."""
+    seconds = INTERVALS[interval]
+    totals = {}
+    for post in posts:
+        if subreddit is not None and post['subreddit'] != subreddit:
+            continue
+        if keyword is not None and keyword not in post['matched_keywords']:
+            continue
+        total = totals.setdefault(interval_start(post['date'], seconds), [0, 0.0, 0.0, 0.0, 0])
+        weight = post_weight(post['upvotes'])
+        total[0] += 1
+        total[1] += post['sentiment']
+        total[2] += post['sentiment'] * weight
+        total[3] += weight
+        total[4] += post['upvotes']
+    return [(start, count, sentiment / count, weighted / weight, upvotes)
+            for start, (count, sentiment, weighted, weight, upvotes) in sorted(totals.items())]
+
+
+def summarize(trend):
+    return [(bucket['start'], bucket['posts'], bucket['mean_sentiment'], bucket['weighted_sentiment'],
+             bucket['upvotes']) for bucket in trend]
+
+
+def top_posts(index, subreddit, keyword, interval):
+    return [[post['id'] for post in bucket['top_posts']] for bucket in index.trend(subreddit, keyword,
+                                                                                   interval=interval)]
+
+
+def assert_same(trend, expected):
+    assert len(trend) == len(expected), f"{len(trend)} intervals, expected {len(expected)}"
+    for got, want in zip(trend, expected):
+        assert got[:2] == want[:2] and got[4] == want[4], f"{got} != {want}"
+        assert abs(got[2] - want[2]) < 1e-3 and abs(got[3] - want[3]) < 1e-3, f"{got} != {want}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=200000, help='Number of posts')
+    parser.add_argument('--days', type=int, default=90, help='Days the posts are spread over')
+    parser.add_argument('--batch', type=int, default=100, help='Posts per incremental batch')
+    parser.add_argument('--queries', type=int, default=50, help='Trend queries timed')
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts, args.days)
+
+    incremental = TrendIndex()
+    start = time.perf_counter()
+    for offset in range(0, len(posts), args.batch):
+        incremental.add_posts(posts[offset:offset + args.batch])
+    incremental_seconds = time.perf_counter() - start
+
+    backfilled = TrendIndex()
+    start = time.perf_counter()
+    backfilled.backfill(posts)
+    backfill_seconds = time.perf_counter() - start
+
+    # Seeing every post again must not count it twice
+    assert incremental.add_posts(posts[:args.batch]) == 0
+    assert len(incremental) == len(backfilled) == len(posts)
+
+    print(f"{len(posts)} posts over {args.days} days")
+    print(f"  incremental, {args.batch} per batch: {incremental_seconds:8.3f}s")
+    print(f"  vectorized backfill:        {backfill_seconds:8.3f}s ({incremental_seconds / backfill_seconds:.1f}x)")
+
+    rng = random.Random(7)
+    queries = [(rng.choice(SUBREDDITS + [None]), rng.choice(KEYWORDS + [None]), rng.choice(list(INTERVALS)))
+               for _ in range(args.queries)]
+
+    timings = {interval: [0, 0.0, 0.0] for interval in INTERVALS}
+    for subreddit, keyword, interval in queries:
+        start = time.perf_counter()
+        trend = summarize(incremental.trend(subreddit, keyword, interval=interval))
+        index_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = scan_trend(posts, subreddit, keyword, interval)
+        scan_seconds = time.perf_counter() - start
+
+        assert_same(trend, expected)
+        assert_same(summarize(backfilled.trend(subreddit, keyword, interval=interval)), expected)
+        assert top_posts(incremental, subreddit, keyword, interval) == top_posts(backfilled, subreddit, keyword,
+                                                                                interval)
+        timing = timings[interval]
+        timing[0] += 1
+        timing[1] += index_seconds
+        timing[2] += scan_seconds
+
+    print(f"{len(queries)} trend queries, per query:")
+    print(f"  {'interval':<8} {'aggregates':>11} {'scan':>10}")
+    for interval, (count, index_seconds, scan_seconds) in timings.items():
+        if count:
+            print(f"  {interval:<8} {index_seconds / count * 1000:>9.2f}ms {scan_seconds / count * 1000:>8.2f}ms "
+                  f"({scan_seconds / index_seconds:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+# bench_html.py
+"""
+Compare BaseScraper's HTML parsing modes: parse time and memory per page.
+
+Pages are read from --fixtures (every *.html file in the directory, e.g.
+saved old.reddit.com pages); without it, synthetic old-reddit comment
+pages are generated. Each mode extracts the links and the title of every
+page:
+
+- full:      whole-document BeautifulSoup tree, then find_all
+- strained:  BeautifulSoup building only <a href> and <title> (SoupStrainer)
+- streaming: iter_elements, no tree at all
+
+Memory is the tracemalloc peak while parsing one page, so it counts
+Python objects only; lxml's own C buffers are not included.
+
+Run from the repository root:
+
+    python benchmarks/bench_html.py [--fixtures DIR] [--pages 20] [--comments 500]
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import SoupStrainer
+
+from Scrapers import base_scraper
+from Scrapers.base_scraper import BaseScraper
+from Scrapers.html_stream import _chunks, _iter_stdlib, iter_elements
+
+TARGETS = SoupStrainer(['a', 'title'])
+
+
+def make_page(comments, rng):
+    """Generate a page shaped like an old.reddit.com comment thread."""
+    parts = ['<!DOCTYPE html><html><head><title>Best email tools? : emailmarketing</title>',
+             '<meta charset="utf-8"><link rel="stylesheet" href="/style.css"></head><body>',
+             '<div id="header"><a href="/">reddit</a><ul class="tabmenu"><li><a href="/hot">hot</a></li></ul></div>',
+             '<div class="content" role="main"><div class="sitetable nestedlisting">']
+    for i in range(comments):
+        depth = rng.randint(0, 4)
+        parts.append(
+            f'<div class="thing comment" id="thing_t1_{i:x}" data-depth="{depth}">'
+            f'<div class="entry"><p class="tagline"><a href="/user/u{i}" class="author">u{i}</a>'
+            f'<span class="score">{rng.randint(-5, 900)} points</span><time datetime="2024-01-01">1 day ago</time></p>'
+            f'<form class="usertext"><div class="md"><p>We moved our newsletter to tool {i % 17} and the open rate '
+            f'went up by {rng.randint(1, 40)}% &amp; clicks doubled. '
+            f'<a href="https://example.com/tool/{i % 17}" rel="nofollow">link</a></p></div></form>'
+            f'<ul class="flat-list buttons"><li><a href="/r/emailmarketing/comments/abc/_/{i:x}/">permalink</a></li>'
+            f'<li><a class="reply-button">reply</a></li></ul></div></div>'
+        )
+    parts.append('</div></div><div class="footer"><a href="/help">help</a></div></body></html>')
+    return ''.join(parts)
+
+
+def load_pages(args):
+    if args.fixtures:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.fixtures, '*.html'))):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+        if not pages:
+            sys.exit(f"No *.html fixtures in {args.fixtures}")
+        return pages
+    rng = random.Random(3)
+    return [make_page(args.comments, rng) for _ in range(args.pages)]
+
+
+def extract_soup(soup):
+    title = soup.find('title')
+    links = [a['href'] for a in soup.find_all('a', href=True)]
+    return title.get_text(strip=True) if title else '', links
+
+
+def extract_elements(elements):
+    title = ''
+    links = []
+    for element in elements:
+        if element.tag == 'title':
+            title = title or element.text
+        elif 'href' in element.attrs:
+            links.append(element.attrs['href'])
+    return title, links
+
+
+def modes(parsers):
+    for parser in parsers:
+        scraper = BaseScraper(parser=parser)
+        yield f'full ({parser})', lambda page, s=scraper: extract_soup(s.parse_html(page, full=True))
+        yield f'strained ({parser})', lambda page, s=scraper: extract_soup(s.parse_html(page, targets=TARGETS))
+    if base_scraper.lxml is not None:
+        yield 'streaming (lxml)', lambda page: extract_elements(iter_elements(page, ['a', 'title']))
+    yield 'streaming (html.parser)', lambda page: extract_elements(
+        _iter_stdlib(_chunks(page), frozenset(['a', 'title']), 'utf-8'))
+
+
+def measure(extract, pages):
+    """Return (seconds per page, peak KiB per page, results)."""
+    start = time.perf_counter()
+    results = [extract(page) for page in pages]
+    elapsed = time.perf_counter() - start
+
+    peaks = []
+    for page in pages[:5]:
+        tracemalloc.start()
+        extract(page)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed / len(pages), sum(peaks) / len(peaks) / 1024, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fixtures', help='Directory of saved *.html pages')
+    parser.add_argument('--pages', type=int, default=20, help='Synthetic pages to generate')
+    parser.add_argument('--comments', type=int, default=500, help='Comments per synthetic page')
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    size = sum(len(page) for page in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {size:.0f} KiB on average")
+
+    parsers = ['html.parser'] + (['lxml'] if base_scraper.lxml is not None else [])
+    baseline = None
+    for label, extract in modes(parsers):
+        per_page, peak, results = measure(extract, pages)
+        print(f"{label:<26} {per_page * 1000:8.1f} ms/page  {peak:9.0f} KiB peak/page")
+        if baseline is None:
+            baseline = results
+        assert results == baseline, f"{label} extracted different links or titles"
+    print("parity: OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+# bench_http.py
+"""
+Compare BaseScraper's sequential fetches with the async client and the conditional cache, offline.
+
+A local threaded HTTP server stands in for the web: every page is served
+with an ETag and Last-Modified header after a simulated latency, answers
+If-None-Match with 304 Not Modified, and a fraction of first requests are
+refused with 429 and a Retry-After header to exercise the backoff.
+
+Run from the repository root:
+
+    python benchmarks/bench_http.py [--pages 200] [--latency 0.05] [--concurrency 20]
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers.base_scraper import BaseScraper
+from Scrapers.http_cache import HttpCache
+
+
+class PageServer(ThreadingHTTPServer):
+    """Serves deterministic pages with validators and counts what it sends."""
+
+    daemon_threads = True
+
+    def __init__(self, latency, throttle_rate, page_size, seed=11):
+        super().__init__(('127.0.0.1', 0), PageHandler)
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.page_size = page_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.modified = formatdate(time.time() - 3600, usegmt=True)
+        self.reset_counts()
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts = {'200': 0, '304': 0, '429': 0, 'bytes': 0}
+            self.throttled = set()
+
+    def count(self, status, size=0):
+        with self.lock:
+            self.counts[status] += 1
+            self.counts['bytes'] += size
+
+    def should_throttle(self, path):
+        """Refuse the first request of a random share of the pages."""
+        with self.lock:
+            if path in self.throttled:
+                return False
+            self.throttled.add(path)
+            return self.rng.random() < self.throttle_rate
+
+    def body(self, path):
+        line = f"<p>{path} lorem ipsum dolor sit amet</p>\n".encode('utf-8')
+        return b'<html><body>' + line * (self.page_size // len(line) + 1) + b'</body></html>'
+
+
+class PageHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+
+        if server.should_throttle(self.path):
+            server.count('429')
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = server.body(self.path)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            server.count('304')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        server.count('200', len(body))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', server.modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed(label, server, fetch):
+    """Run one fetch strategy and print its time and traffic."""
+    server.reset_counts()
+    start = time.perf_counter()
+    bodies = fetch()
+    elapsed = time.perf_counter() - start
+    counts = server.counts
+    print(f"{label:<28} {elapsed:7.2f}s  200={counts['200']:<4} 304={counts['304']:<4} "
+          f"429={counts['429']:<4} {counts['bytes'] / 1024:8.0f} KiB")
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=32 * 1024)
+    parser.add_argument('--throttle', type=float, default=0.05, help='Share of pages refused once with 429')
+    args = parser.parse_args()
+
+    server = PageServer(args.latency, args.throttle, args.page_size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/page/{i}" for i in range(args.pages)]
+    cache_dir = tempfile.mkdtemp(prefix='bench_http_')
+
+    try:
+        plain = BaseScraper(pool_size=args.concurrency)
+        sequential = timed('sequential, no cache', server,
+                           lambda: [plain.make_request(url, delay=0.01).content for url in urls])
+
+        cached = BaseScraper(pool_size=args.concurrency, cache=HttpCache(cache_dir))
+        cold = timed('async, cold cache', server,
+                     lambda: [page.content for page in cached.fetch_all(urls, args.concurrency, delay=0.01)])
+        warm = timed('async, warm cache', server,
+                     lambda: [page.content for page in cached.fetch_all(urls, args.concurrency, delay=0.01)])
+        warm_sync = timed('sequential, warm cache', server,
+                          lambda: [cached.make_request(url, delay=0.01).content for url in urls])
+
+        assert server.counts['304'] == args.pages, "Warm fetches should all be revalidated with 304"
+        assert sequential == cold == warm == warm_sync, "Every strategy must return the same bodies"
+        print("parity: OK")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
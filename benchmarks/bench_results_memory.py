@@ -0,0 +1,106 @@
+# bench_results_memory.py
+"""
+Compare the memory used by a list of post dicts and by the columnar ResultSet.
+
+Run from the repository root:
+
+    python benchmarks/bench_results_memory.py [--posts 50000] [--content 800]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers.results import ResultSet
+
+SUBREDDITS = ['emailmarketing', 'marketing', 'smallbusiness', 'entrepreneur', 'SEO', 'startups']
+KEYWORDS = ['email marketing', 'newsletter', 'open rate', 'deliverability', 'cold email']
+
+
+def make_posts(count, content_length, seed=7):
+    """Generate posts shaped like RedditScraper output, as if decoded from separate API responses."""
+    rng = random.Random(seed)
+    words = ['email', 'campaign', 'list', 'open', 'rate', 'great', 'subscribers', 'help', 'tool']
+    posts = []
+    for i in range(count):
+        body_words = rng.randint(content_length // 12, content_length // 4)
+        posts.append({
+            'id': f"t{i:07x}",
+            'title': ' '.join(rng.choice(words) for _ in range(rng.randint(4, 14))),
+            'content': ' '.join(rng.choice(words) for _ in range(body_words)),
+            'url': f"https://www.reddit.com/r/{rng.choice(SUBREDDITS)}/comments/{i:07x}/post_title/",
+            # Fresh string objects, as PRAW creates them per response
+            'subreddit': ''.join(list(rng.choice(SUBREDDITS))),
+            'upvotes': rng.randint(0, 5000),
+            'comments': rng.randint(0, 800),
+            'date': 1.7e9 + rng.random() * 1e7,
+            'keyword': ''.join(list(rng.choice(KEYWORDS))),
+            'sentiment': rng.uniform(-1, 1)
+        })
+    return posts
+
+
+def measure(build):
+    """Return (result, bytes allocated by build, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--content', type=int, default=800, help='Average content length in characters')
+    parser.add_argument('--truncate', type=int, default=300, help='max_content for the truncated variant')
+    args = parser.parse_args()
+
+    print(f"{args.posts} posts, ~{args.content} characters of content each\n")
+    print(f"{'representation':<28}{'memory':>12}{'per post':>12}{'build':>10}")
+
+    rows = [
+        ('list of dicts', lambda: make_posts(args.posts, args.content)),
+        ('ResultSet', lambda: ResultSet(make_posts(args.posts, args.content))),
+        (f'ResultSet (content {args.truncate})',
+         lambda: ResultSet(make_posts(args.posts, args.content), max_content=args.truncate)),
+    ]
+
+    results = {}
+    for name, build in rows:
+        result, size, elapsed = measure(build)
+        results[name] = result
+        print(f"{name:<28}{size / 2 ** 20:>10.1f}MB{size / args.posts:>10.0f} B{elapsed:>9.2f}s")
+        del result
+
+    posts = results['list of dicts']
+    result_set = results['ResultSet']
+
+    start = time.perf_counter()
+    sorted(posts, key=lambda post: post['upvotes'], reverse=True)
+    dict_sort = time.perf_counter() - start
+    start = time.perf_counter()
+    result_set.order_by('upvotes', descending=True)
+    column_sort = time.perf_counter() - start
+
+    start = time.perf_counter()
+    [post for post in posts if post['sentiment'] > 0.2]
+    dict_filter = time.perf_counter() - start
+    start = time.perf_counter()
+    result_set.filter_rows(min_sentiment=0.2)
+    column_filter = time.perf_counter() - start
+
+    print(f"\nsort by upvotes:   dicts {dict_sort * 1000:7.1f} ms   ResultSet {column_sort * 1000:7.1f} ms")
+    print(f"sentiment filter:  dicts {dict_filter * 1000:7.1f} ms   ResultSet {column_filter * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
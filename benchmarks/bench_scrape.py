@@ -0,0 +1,295 @@
+# bench_scrape.py
+"""
+Offline benchmark of RedditScraper and the /scrape endpoint.
+
+Listings are replayed from recorded fixtures (--fixtures, see
+fake_reddit.py) or a generated corpus through FakeReddit, which simulates
+per-request latency and draws every request from a RateLimiter with the
+given budget. For each workload the benchmark reports posts/sec, API
+requests, peak Python memory (tracemalloc) and CPU time per stage, then
+times POST /scrape through the Flask test client for p50/p95 latency.
+
+Results are written as JSON (--output) so runs can be compared across
+commits with --compare.
+
+Run from the repository root:
+
+    python benchmarks/bench_scrape.py [--latency 0.02] [--rpm 60000] [--output bench.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_reddit import VOCABULARY, Corpus, FakeReddit, FakeSubreddit, generate_corpus, load_fixtures
+
+from Scrapers import reddit_scraper as reddit_scraper_module
+from Scrapers import results as results_module
+from Scrapers import sentiment
+from Scrapers.rate_limiter import RateLimiter
+from Scrapers.reddit_scraper import RedditScraper
+
+Workload = namedtuple('Workload', ['name', 'keywords', 'subreddits', 'post_limit', 'sort'])
+
+SUBREDDITS = ['emailmarketing', 'marketing', 'SEO', 'sales', 'Entrepreneur', 'smallbusiness', 'startups',
+              'SaaS', 'digital_marketing', 'PPC', 'socialmedia', 'ecommerce', 'shopify', 'copywriting',
+              'growthhacking', 'content_marketing', 'analytics', 'webdev', 'freelance', 'advertising']
+
+WORKLOADS = [
+    Workload('single', 1, 1, 100, 'relevance'),
+    Workload('typical', 5, 5, 100, 'relevance'),
+    Workload('wide', 50, 20, 25, 'relevance'),
+    Workload('deep', 3, 2, 1000, 'new'),
+    Workload('listing', 0, 20, 1000, 'hot'),
+]
+
+
+class StageTimer:
+    """Accumulates per-thread CPU time of wrapped functions."""
+
+    def __init__(self):
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.patched = []
+
+    def wrap(self, owner, name, stage):
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - start
+                with self.lock:
+                    self.totals[stage] = self.totals.get(stage, 0.0) + elapsed
+
+        setattr(owner, name, timed)
+        self.patched.append((owner, name, original))
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+    def reset(self):
+        with self.lock:
+            self.totals = {}
+
+    def restore(self):
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+
+
+def install_stage_timers():
+    """Time extraction, sentiment, result merging and the fake client's own work."""
+    timer = StageTimer()
+    timer.wrap(sentiment, 'score', 'sentiment')
+    timer.wrap(RedditScraper, '_extract_post_data', 'extract')
+    timer.wrap(results_module.ResultSet, 'add', 'merge')
+    timer.wrap(reddit_scraper_module.KeywordMatcher, 'match_post', 'attribute')
+    # Filtering and sorting a listing is the fake client's own cost, not the scraper's
+    for name in ('search', 'hot', 'new', 'top'):
+        timer.wrap(FakeSubreddit, name, 'client')
+    return timer
+
+
+def make_scraper(corpus, latency, rpm, max_workers, rate_db):
+    limiter = RateLimiter(f'bench-{time.monotonic_ns()}', path=rate_db, capacity=max(rpm / 60, 1),
+                          refill_rate=rpm / 60)
+    return RedditScraper('bench', 'bench', 'bench', max_workers=max_workers, rate_limiter=limiter,
+                         client_factory=FakeReddit.factory(corpus, latency))
+
+
+def run_workload(workload, corpus, args, timer, rate_db):
+    keywords = ','.join(VOCABULARY[:workload.keywords])
+    subreddits = ','.join(SUBREDDITS[:workload.subreddits])
+    results = {}
+
+    for collapse in (False, True):
+        scraper = make_scraper(corpus, args.latency, args.rpm, args.workers, rate_db)
+        timer.reset()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        posts = scraper.scrape_reddit(keywords=keywords, subreddits=subreddits, post_limit=workload.post_limit,
+                                      sort=workload.sort, collapse=collapse)
+        wall = time.perf_counter() - start
+
+        serialize_start = time.thread_time()
+        payload = json.dumps({'results': posts.to_dicts()})
+        timer.add('serialize', time.thread_time() - serialize_start)
+        cpu = time.process_time() - cpu_start
+
+        stages = dict(timer.totals)
+        # Extraction includes sentiment scoring
+        stages['extract'] = stages.get('extract', 0.0) - stages.get('sentiment', 0.0)
+        report = scraper.plan_report.to_dict()
+        scraper.close()
+
+        # Second pass for memory, so tracing does not skew the timings
+        scraper = make_scraper(corpus, 0, args.rpm * 100, args.workers, rate_db)
+        tracemalloc.start()
+        scraper.scrape_reddit(keywords=keywords, subreddits=subreddits, post_limit=workload.post_limit,
+                              sort=workload.sort, collapse=collapse)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        scraper.close()
+
+        results['collapsed' if collapse else 'unpacked'] = {
+            'posts': len(posts),
+            'api_requests': report['api_requests'],
+            'queries': report['executed_queries'],
+            'wall_seconds': round(wall, 4),
+            'posts_per_sec': round(len(posts) / wall, 1) if wall else None,
+            'cpu_seconds': round(cpu, 4),
+            'stage_cpu_seconds': {stage: round(seconds, 4) for stage, seconds in sorted(stages.items())},
+            'peak_memory_kib': round(peak / 1024),
+            'response_kib': round(len(payload) / 1024)
+        }
+    return results
+
+
+def bench_endpoint(corpus, args, rate_db):
+    """Time POST /scrape with wait=true through the Flask test client."""
+    os.environ.setdefault('REDDIT_CLIENT_ID', 'bench')
+    os.environ.setdefault('REDDIT_CLIENT_SECRET', 'bench')
+    os.environ.setdefault('REDDIT_USER_AGENT', 'bench')
+    import app as app_module
+
+    scraper = app_module.reddit_scraper
+    scraper.client_factory = FakeReddit.factory(corpus, args.latency)
+    scraper.rate_limiter = RateLimiter(f'bench-app-{time.monotonic_ns()}', path=rate_db,
+                                       capacity=max(args.rpm / 60, 1), refill_rate=args.rpm / 60)
+    scraper._local = threading.local()
+    client = app_module.app.test_client()
+
+    body = {
+        'keywords': ','.join(VOCABULARY[:5]),
+        'subreddits': ','.join(SUBREDDITS[:5]),
+        'post_limit': 100,
+        'cache': False,
+        'wait': True
+    }
+    latencies = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.post('/scrape', json=body)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+        'posts': len(response.get_json()['results'])
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, path):
+    """Print the change of the headline numbers against an earlier run."""
+    with open(path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous.get('commit')} ({path}):")
+    for name, modes in current['workloads'].items():
+        for mode, result in modes.items():
+            before = previous.get('workloads', {}).get(name, {}).get(mode)
+            if not before:
+                continue
+            for metric in ('posts_per_sec', 'cpu_seconds', 'peak_memory_kib'):
+                if before.get(metric):
+                    change = (result[metric] - before[metric]) / before[metric] * 100
+                    print(f"  {name:<8} {mode:<9} {metric:<16} {before[metric]:>10} -> {result[metric]:>10} "
+                          f"({change:+.1f}%)")
+    before = previous.get('scrape_endpoint')
+    if before:
+        for metric in ('p50_ms', 'p95_ms'):
+            print(f"  /scrape  {metric:<16} {before[metric]:>10} -> {current['scrape_endpoint'][metric]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fixtures', help='Recorded fixture file (.json or .json.gz); a corpus is generated without it')
+    parser.add_argument('--posts-per-subreddit', type=int, default=3000, help='Size of the generated corpus')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated seconds per API request')
+    parser.add_argument('--rpm', type=float, default=60000, help='Simulated API budget in requests per minute')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent queries per scrape')
+    parser.add_argument('--workloads', default=','.join(w.name for w in WORKLOADS))
+    parser.add_argument('--requests', type=int, default=20, help='POST /scrape requests to time')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    records = load_fixtures(args.fixtures) if args.fixtures else generate_corpus(SUBREDDITS, args.posts_per_subreddit)
+    corpus = Corpus(records)
+    print(f"Corpus: {len(records)} submissions, latency {args.latency * 1000:.0f} ms, budget {args.rpm:.0f} rpm")
+
+    rate_db = os.path.join(tempfile.mkdtemp(prefix='bench_scrape_'), 'rate_limit.sqlite3')
+    timer = install_stage_timers()
+    selected = set(args.workloads.split(','))
+
+    output = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'settings': {
+            'corpus': len(records),
+            'fixtures': args.fixtures,
+            'latency': args.latency,
+            'rpm': args.rpm,
+            'workers': args.workers
+        },
+        'workloads': {}
+    }
+
+    try:
+        for workload in WORKLOADS:
+            if workload.name not in selected:
+                continue
+            results = run_workload(workload, corpus, args, timer, rate_db)
+            output['workloads'][workload.name] = results
+            for mode, result in results.items():
+                stages = ' '.join(f"{stage}={seconds:.2f}" for stage, seconds in result['stage_cpu_seconds'].items())
+                print(f"{workload.name:<8} {mode:<9} {result['posts']:6} posts {result['api_requests']:5} req "
+                      f"{result['wall_seconds']:7.2f}s {result['posts_per_sec']:9.0f} posts/s "
+                      f"{result['peak_memory_kib']:7} KiB  cpu {result['cpu_seconds']:.2f}s [{stages}]")
+
+        # Unpacked and packed plans must find the same submissions for single-keyword queries
+        if 'single' in output['workloads']:
+            single = output['workloads']['single']
+            assert single['unpacked']['posts'] == single['collapsed']['posts'], "Packed plan lost posts"
+
+        if args.requests:
+            output['scrape_endpoint'] = bench_endpoint(corpus, args, rate_db)
+            endpoint = output['scrape_endpoint']
+            print(f"/scrape  {endpoint['requests']} requests  p50 {endpoint['p50_ms']} ms  p95 {endpoint['p95_ms']} ms")
+    finally:
+        timer.restore()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        compare(output, args.compare)
+
+
+if __name__ == '__main__':
+    main()
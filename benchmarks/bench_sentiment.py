@@ -0,0 +1,87 @@
+# bench_sentiment.py
+"""
+Benchmark the shared sentiment engine against the original implementation.
+
+Run from the repository root:
+
+    python benchmarks/bench_sentiment.py [--posts 5000] [--words 400]
+
+Parity with the original implementation is covered by tests/test_sentiment.py,
+which imports legacy_score and make_corpus from here.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers import sentiment
+from Scrapers.lazy import optional_import
+
+
+def legacy_score(text):
+    """The rule-based analysis as it was implemented before the shared module."""
+    if not text:
+        return 0.0
+
+    positive_words = list(sentiment.POSITIVE_WORDS)
+    negative_words = list(sentiment.NEGATIVE_WORDS)
+
+    words = text.lower().split()
+    positive_count = sum(1 for word in words if word in positive_words)
+    negative_count = sum(1 for word in words if word in negative_words)
+    total_words = len([word for word in words if len(word) > 2])
+
+    if total_words == 0:
+        return 0.0
+
+    sentiment_score = (positive_count - negative_count) / (total_words ** 0.5)
+    return max(min(sentiment_score, 1.0), -1.0)
+
+
+def make_corpus(posts=200, words=60, punctuation=False, seed=42):
+    """Build random post texts mixing filler words with lexicon words."""
+    rng = random.Random(seed)
+    filler = ['email', 'marketing', 'campaign', 'the', 'a', 'to', 'we', 'open', 'rate', 'list',
+              'subscribers', 'newsletter', 'of', 'is', 'it', 'our', 'click', 'through']
+    lexicon = sorted(sentiment.POSITIVE_WORDS | sentiment.NEGATIVE_WORDS)
+    marks = ['!', '.', ',', '?', ''] if punctuation else ['']
+
+    corpus = []
+    for _ in range(posts):
+        tokens = []
+        for _ in range(rng.randint(words // 2, words)):
+            word = rng.choice(lexicon) if rng.random() < 0.08 else rng.choice(filler)
+            tokens.append(word.capitalize() if rng.random() < 0.1 else word)
+            tokens[-1] += rng.choice(marks)
+        corpus.append(' '.join(tokens))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--words', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.posts, args.words, punctuation=True)
+
+    def best(stmt):
+        return min(timeit.repeat(stmt, number=1, repeat=args.repeat))
+
+    legacy = best(lambda: [legacy_score(text) for text in corpus])
+    single = best(lambda: [sentiment.score(text) for text in corpus])
+    batch = best(lambda: sentiment.score_batch(corpus))
+
+    print(f"{args.posts} posts, up to {args.words} words each "
+          f"(NumPy {'enabled' if optional_import('numpy') is not None else 'not installed'})")
+    print(f"  legacy       {legacy * 1000:9.1f} ms")
+    print(f"  score()      {single * 1000:9.1f} ms  ({legacy / single:5.1f}x)")
+    print(f"  score_batch  {batch * 1000:9.1f} ms  ({legacy / batch:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# bench_serialize.py
+"""
+Benchmark JSON serialization and response compression of scrape results.
+
+Payloads shaped like a waited /scrape response are encoded by Flask's
+previous default (the standard library with sorted keys and escaped
+non-ASCII), by the compact standard library fallback and by orjson when it
+is installed. Each payload is sent with full content, content truncated
+to 200 characters, and content omitted. Bytes on the wire are reported
+raw and compressed with gzip and, when installed, brotli.
+
+Run from the repository root:
+
+    python benchmarks/bench_serialize.py [--posts 1000 10000] [--repeat 5]
+
+Also checks that every serializer decodes back to the same payload and
+that every compressed body decompresses to the raw one.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers.lazy import optional_import
+from Scrapers.serialization import available_encodings, compress, get_serializer
+
+SYLLABLES = ['ma', 'ket', 'ing', 'news', 'let', 'ter', 'o', 'pen', 'rate', 'sub', 'scri', 'ber', 'de', 'li', 'ver',
+             'a', 'bi', 'li', 'ty', 'click', 'through', 'cam', 'paign', 'ca', 'fé', 'na', 'ïve', 'tion', 'al', 'ly']
+
+# Compressions measured: (coding, level); brotli is skipped when it is not installed
+COMPRESSIONS = [('gzip', 1), ('gzip', 6), ('br', 4)]
+
+
+def make_vocabulary(rng, size=3000):
+    """Build pseudo-words whose frequencies follow Zipf's law, like words in real posts."""
+    words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(size)]
+    cumulative, total = [], 0.0
+    for rank in range(size):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    return words, cumulative
+
+
+def make_posts(count, seed=42):
+    """Build posts with selftexts of realistic, skewed lengths."""
+    rng = random.Random(seed)
+    words, cumulative = make_vocabulary(rng)
+    posts = []
+    for i in range(count):
+        length = int(rng.lognormvariate(4.5, 1.0))
+        posts.append({
+            'id': f'p{i:06d}',
+            'title': ' '.join(rng.choices(words, cum_weights=cumulative, k=rng.randint(4, 14))),
+            'content': ' '.join(rng.choices(words, cum_weights=cumulative, k=length)),
+            'url': f'https://www.reddit.com/r/emailmarketing/comments/p{i:06d}/',
+            'subreddit': 'emailmarketing',
+            'upvotes': rng.randint(0, 500),
+            'comments': rng.randint(0, 80),
+            'date': 1.7e9 - i * 60.0,
+            'keyword': 'newsletter',
+            'sentiment': round(rng.uniform(-1, 1), 4),
+            'matched_keywords': ['newsletter'],
+            'matched_subreddits': ['emailmarketing']
+        })
+    return posts
+
+
+def with_content(posts, mode):
+    if mode == 'full':
+        return posts
+    if mode == 'omit':
+        return [{key: value for key, value in post.items() if key != 'content'} for post in posts]
+    return [dict(post, content=post['content'][:mode]) for post in posts]
+
+
+def serializers():
+    found = {
+        'flask-default': lambda obj: json.dumps(obj, ensure_ascii=True, sort_keys=True,
+                                                separators=(',', ':')).encode('utf-8'),
+        'json': get_serializer('json')
+    }
+    if optional_import('orjson') is not None:
+        found['orjson'] = get_serializer('orjson')
+    return found
+
+
+def decompress(data, encoding):
+    if encoding == 'br':
+        return (optional_import('brotli') or optional_import('brotlicffi')).decompress(data)
+    return zlib.decompress(data, 31)
+
+
+def best_of(repeat, function, *args):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, nargs='+', default=[1000, 10000], help='Payload sizes in posts')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the fastest is reported')
+    args = parser.parse_args()
+
+    compressions = [(encoding, level) for encoding, level in COMPRESSIONS if encoding in available_encodings()]
+    print(f"Compressed sizes and times of the compact encoding: "
+          f"{', '.join(f'{encoding}-{level}' for encoding, level in compressions)}")
+    for count in args.posts:
+        posts = make_posts(count)
+        print(f"\n{count} posts")
+        print(f"  {'content':<8} {'serializer':<14} {'encode':>9} {'raw':>10} "
+              + ' '.join(f"{f'{encoding}-{level}':>17}" for encoding, level in compressions))
+
+        for mode in ('full', 200, 'omit'):
+            payload = {'job_id': 'bench', 'results': with_content(posts, mode), 'duplicates': 0}
+            raw = None
+            for name, dumps in serializers().items():
+                seconds, body = best_of(args.repeat, dumps, payload)
+                assert json.loads(body) == payload, f"{name} changed the payload"
+                line = f"  {str(mode):<8} {name:<14} {seconds * 1000:>7.1f}ms {len(body) / 1024:>8.0f}KB"
+
+                # Compression is reported once per content mode, on the compact encoding
+                if name == 'json':
+                    raw = body
+                    for encoding, level in compressions:
+                        compress_seconds, compressed = best_of(args.repeat, compress, raw, encoding, level)
+                        assert decompress(compressed, encoding) == raw, f"{encoding} round trip failed"
+                        line += f" {len(compressed) / 1024:>6.0f}KB {compress_seconds * 1000:>6.1f}ms"
+                print(line)
+            assert raw is not None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# bench_sheets.py
+"""
+Compare the old fixed-sleep Google Sheets upload with SheetWriter, offline.
+
+Both write to a FakeSheetBackend that simulates request latency and the
+Sheets quota of 60 write requests per minute. Wall-clock times are scaled
+by --scale so the run takes seconds instead of minutes (1.0 is real time).
+
+Run from the repository root:
+
+    python benchmarks/bench_sheets.py [--rows 5000] [--latency 0.3] [--scale 0.05]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers.sheets import FakeSheetBackend, SheetRateLimited, SheetWriter, post_to_row
+
+
+def make_posts(count, seed=7):
+    """Generate posts shaped like RedditScraper output."""
+    rng = random.Random(seed)
+    return [{
+        'id': f"t{i:07x}",
+        'title': f"Post {i}",
+        'content': 'email ' * rng.randint(5, 80),
+        'url': f"https://www.reddit.com/r/emailmarketing/comments/{i:07x}/",
+        'subreddit': 'emailmarketing',
+        'upvotes': rng.randint(0, 5000),
+        'comments': rng.randint(0, 800),
+        'date': 1.7e9 + rng.random() * 1e7,
+        'keyword': 'email marketing',
+        'sentiment': rng.uniform(-1, 1)
+    } for i in range(count)]
+
+
+def make_backend(args):
+    return FakeSheetBackend(latency=args.latency * args.scale, requests_per_window=60, window=60 * args.scale)
+
+
+def legacy_upload(posts, backend, scale):
+    """The old main.py loop: 100-row batches with a fixed one-second sleep, no retries."""
+    start = time.perf_counter()
+    try:
+        for i in range(0, len(posts), 100):
+            backend.append_rows([post_to_row(post) for post in posts[i:i + 100]])
+            time.sleep(1 * scale)
+    except SheetRateLimited:
+        return time.perf_counter() - start, 'rate limited'
+    return time.perf_counter() - start, 'ok'
+
+
+def writer_upload(posts, backend, scale, batch_size):
+    start = time.perf_counter()
+    with SheetWriter(backend, batch_size=batch_size, requests_per_minute=60 / scale, base_delay=scale) as writer:
+        for post in posts:
+            writer.write([post])
+    return time.perf_counter() - start, writer.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.3, help='Seconds per API request before scaling')
+    parser.add_argument('--scale', type=float, default=0.05, help='Time scale applied to sleeps and the quota')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    posts = make_posts(args.rows)
+
+    legacy_backend = make_backend(args)
+    legacy_seconds, legacy_status = legacy_upload(posts, legacy_backend, args.scale)
+    print(f"legacy:  {legacy_seconds / args.scale:8.1f}s (scaled)  {legacy_backend.requests:4d} requests  "
+          f"{len(legacy_backend.rows):6d} rows  {legacy_status}")
+
+    backend = make_backend(args)
+    seconds, stats = writer_upload(posts, backend, args.scale, args.batch_size)
+    print(f"writer:  {seconds / args.scale:8.1f}s (scaled)  {backend.requests:4d} requests  "
+          f"{len(backend.rows) - 1:6d} rows  {stats['retries']} retries, {backend.rejected} rejected")
+
+    # Parity: every post is in the sheet once, in order, under the header
+    expected = [post_to_row(post) for post in posts]
+    assert backend.rows[1:] == expected, 'SheetWriter rows differ from the input posts'
+
+    # Re-running against the same sheet writes nothing new
+    seconds, stats = writer_upload(posts, backend, args.scale, args.batch_size)
+    assert stats['written'] == 0 and stats['skipped'] == len(posts), stats
+    print(f"re-run:  {seconds / args.scale:8.1f}s (scaled)  {stats['skipped']} rows skipped as already present")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# bench_startup.py
+"""
+Cold-start benchmark of the app: import time and the first / and /scrape requests.
+
+Every sample runs in a fresh interpreter, as on a serverless cold start or
+in a newly forked worker, once with lazy initialization (SCRAPER_LAZY_INIT=1)
+and once eagerly. The first /scrape builds a real PRAW client, so importing
+praw and constructing the client are paid as in production, but listings
+are served by FakeReddit without network access.
+
+--repo measures another checkout the same way, e.g. a worktree of an older
+commit made with `git worktree add ../before HEAD~1`, for a before/after
+comparison. --imports prints the slowest modules of `import app` as
+reported by python -X importtime.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--runs 7] [--repo ../before] [--imports 15] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in the fresh interpreter; prints the timings of one cold start as JSON
+CHILD = r'''
+import sys
+import time
+
+start = time.perf_counter()
+repo, bench_dir = sys.argv[1:3]
+sys.path.insert(0, repo)
+
+import app as app_module
+imported = time.perf_counter()
+
+client = app_module.app.test_client()
+assert client.get('/').status_code == 200
+indexed = time.perf_counter()
+
+import json
+import threading
+sys.path.insert(0, bench_dir)
+from fake_reddit import Corpus, FakeReddit, generate_corpus
+
+corpus = Corpus(generate_corpus(['seo'], 200))
+scraper = app_module.reddit_scraper
+
+
+def factory(requestor_kwargs):
+    # Pay for importing praw and building a client, then serve listings offline
+    build = getattr(scraper, '_praw_client', None)
+    if build is not None:
+        build(requestor_kwargs)
+    else:
+        import praw
+        praw.Reddit(client_id=scraper.client_id, client_secret=scraper.client_secret,
+                    user_agent=scraper.user_agent)
+    return FakeReddit(corpus, **requestor_kwargs)
+
+
+scraper.client_factory = factory
+scraper._local = threading.local()
+
+scrape_start = time.perf_counter()
+response = client.post('/scrape', json={'keywords': 'seo', 'subreddits': 'seo', 'post_limit': 50,
+                                        'cache': False, 'wait': True})
+scraped = time.perf_counter()
+assert response.status_code == 200, response.get_data(as_text=True)
+
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_index_ms': (indexed - imported) * 1000,
+    'first_scrape_ms': (scraped - scrape_start) * 1000,
+    'posts': len(response.get_json()['results'])
+}))
+'''
+
+
+def child_env(lazy):
+    env = dict(os.environ)
+    env.setdefault('REDDIT_CLIENT_ID', 'bench')
+    env.setdefault('REDDIT_CLIENT_SECRET', 'bench')
+    env.setdefault('REDDIT_USER_AGENT', 'bench startup')
+    env['SCRAPER_LAZY_INIT'] = '1' if lazy else '0'
+    env.pop('POST_STORE_PATH', None)
+    return env
+
+
+def cold_start(repo, lazy):
+    """Time one cold start in a fresh interpreter."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD, repo, BENCH_DIR], cwd=repo, env=child_env(lazy),
+                            capture_output=True, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start failed in {repo}:\n{result.stderr}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_ms'] = wall
+    return timings
+
+
+def measure(repo, lazy, runs):
+    samples = [cold_start(repo, lazy) for _ in range(runs)]
+    summary = {metric: round(statistics.median(sample[metric] for sample in samples), 1)
+               for metric in ('import_ms', 'first_index_ms', 'first_scrape_ms', 'process_ms')}
+    summary['posts'] = samples[0]['posts']
+    # Every cold start must return the same results
+    assert all(sample['posts'] == summary['posts'] for sample in samples), "Cold starts returned different results"
+    return summary
+
+
+def import_report(repo, top):
+    """Return the total import time of app and its slowest modules by self time."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=repo,
+                            env=child_env(True), capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((int(self_us), int(cumulative_us), name.strip()))
+    total = next((cumulative for _, cumulative, name in modules if name == 'app'), None)
+    return total, sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=7, help='Cold starts per configuration')
+    parser.add_argument('--repo', help='Another checkout to measure for comparison')
+    parser.add_argument('--imports', type=int, default=0, help='Print the N slowest modules of import app')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    targets = [('current', REPO_ROOT)]
+    if args.repo:
+        targets.insert(0, ('repo', os.path.abspath(args.repo)))
+
+    output = {'python': sys.version.split()[0], 'runs': args.runs, 'results': {}}
+    print(f"{'checkout':<8} {'mode':<5} {'import':>9} {'first /':>9} {'first /scrape':>14} {'process':>9}")
+    for label, repo in targets:
+        for lazy in (False, True):
+            mode = 'lazy' if lazy else 'eager'
+            result = measure(repo, lazy, args.runs)
+            output['results'][f"{label}-{mode}"] = result
+            print(f"{label:<8} {mode:<5} {result['import_ms']:>7.1f}ms {result['first_index_ms']:>7.1f}ms "
+                  f"{result['first_scrape_ms']:>12.1f}ms {result['process_ms']:>7.1f}ms")
+
+    posts = {result['posts'] for result in output['results'].values()}
+    assert len(posts) == 1, f"Configurations returned different results: {posts}"
+
+    if args.imports:
+        for label, repo in targets:
+            total, modules = import_report(repo, args.imports)
+            output.setdefault('imports', {})[label] = {'total_us': total, 'slowest': modules}
+            print(f"\nimport app in {label}: {total / 1000:.1f}ms; slowest modules by self time:")
+            for self_us, cumulative_us, name in modules:
+                print(f"  {self_us / 1000:8.1f}ms self {cumulative_us / 1000:8.1f}ms cumulative  {name}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+# fake_reddit.py
+"""
+Offline stand-in for praw.Reddit that replays recorded listing fixtures.
+
+A fixture file is a JSON list (optionally gzipped) of submissions with
+the fields RedditScraper reads: id, title, selftext, is_self, url,
+permalink, subreddit, score, num_comments and created_utc. Record one
+from the live API with
+
+    python benchmarks/fake_reddit.py record fixtures.json.gz --subreddits a,b --limit 1000
+
+(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET and REDDIT_USER_AGENT must be
+set), or use generate_corpus() for a deterministic synthetic corpus.
+
+FakeReddit pages through listings 100 submissions per simulated API
+request. Every page goes through the same rate limiter and request
+counter as a real client, then sleeps for the simulated latency.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Scrapers import metrics
+
+FIELDS = ('id', 'title', 'selftext', 'is_self', 'url', 'permalink', 'subreddit', 'score', 'num_comments',
+          'created_utc')
+
+PAGE_SIZE = 100
+
+VOCABULARY = [
+    'email marketing', 'newsletter', 'seo', 'cold outreach', 'landing page', 'lead generation', 'crm',
+    'copywriting', 'open rate', 'deliverability', 'saas', 'conversion', 'ab testing', 'drip campaign',
+    'mailchimp', 'klaviyo', 'funnel', 'churn', 'onboarding', 'retention', 'affiliate', 'content marketing',
+    'growth hacking', 'paid ads', 'google ads', 'facebook ads', 'analytics', 'segmentation', 'automation',
+    'subject line', 'unsubscribe', 'spam folder', 'domain warmup', 'cold email', 'linkedin', 'webinar',
+    'ebook', 'lead magnet', 'pricing page', 'case study', 'testimonial', 'referral', 'b2b', 'ecommerce',
+    'shopify', 'wordpress', 'hubspot', 'salesforce', 'zapier', 'personalization'
+]
+
+FILLER = ('we', 'tried', 'the', 'new', 'tool', 'and', 'it', 'was', 'great', 'terrible', 'for', 'our', 'team',
+          'results', 'improved', 'dropped', 'after', 'a', 'week', 'of', 'testing', 'love', 'hate', 'this',
+          'easy', 'broken', 'recommend', 'avoid', 'helpful', 'waste')
+
+
+def generate_corpus(subreddits, posts_per_subreddit, words=60, seed=1):
+    """
+    Generate a deterministic corpus of submissions.
+
+    Keywords from VOCABULARY are drawn with a Zipf-like skew, so a few
+    keywords match many posts and most match a few, as in real searches.
+
+    Args:
+        subreddits (list): Subreddit names
+        posts_per_subreddit (int): Submissions per subreddit
+        words (int): Approximate words per body
+        seed (int): Random seed
+
+    Returns:
+        list: Submission dicts in fixture format
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+    corpus = []
+    for subreddit in subreddits:
+        for i in range(posts_per_subreddit):
+            post_id = f"{subreddit[:3].lower()}{i:06x}"
+            keywords = rng.choices(VOCABULARY, weights, k=3)
+            body = [rng.choice(FILLER) for _ in range(rng.randint(words // 2, words))]
+            for keyword in keywords:
+                body.insert(rng.randrange(len(body) + 1), keyword)
+            is_self = rng.random() < 0.85
+            corpus.append({
+                'id': post_id,
+                'title': f"{keywords[0].capitalize()} question {i}",
+                'selftext': ' '.join(body) if is_self else '',
+                'is_self': is_self,
+                'url': f"https://example.com/{post_id}",
+                'permalink': f"/r/{subreddit}/comments/{post_id}/",
+                'subreddit': subreddit,
+                'score': int(rng.paretovariate(1.2)),
+                'num_comments': rng.randint(0, 300),
+                'created_utc': 1.7e9 - i * 600.0 - rng.random() * 600
+            })
+    return corpus
+
+
+def load_fixtures(path):
+    """Load a fixture file, gzipped when its name ends with .gz."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_fixtures(corpus, path):
+    """Save a corpus as a fixture file, gzipped when its name ends with .gz."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        json.dump(corpus, f)
+
+
+def _submission(record):
+    submission = SimpleNamespace(**record)
+    submission.subreddit = SimpleNamespace(display_name=record['subreddit'])
+    return submission
+
+
+class Corpus:
+    """Submissions indexed by subreddit, shared by every FakeReddit."""
+
+    def __init__(self, records):
+        self.records = records
+        self.by_subreddit = {}
+        self.by_id = {}
+        self._term_matches = {}
+        self._lock = threading.Lock()
+        for record in records:
+            self.by_subreddit.setdefault(record['subreddit'].lower(), []).append(record)
+            self.by_id[record['id']] = record
+
+    def listing(self, names):
+        """Return the records of a multireddit ('a+b', or 'all')."""
+        if names.lower() == 'all':
+            return self.records
+        records = []
+        for name in names.lower().split('+'):
+            records.extend(self.by_subreddit.get(name, ()))
+        return records
+
+    def search(self, names, terms):
+        """Return the records of a multireddit whose title or body contains any of the terms."""
+        wanted = None if names.lower() == 'all' else names.lower().split('+')
+        matches = {}
+        for term in terms:
+            for record in self._matching(term, wanted):
+                matches[record['id']] = record
+        return list(matches.values())
+
+    def _matching(self, term, subreddits):
+        # The corpus is scanned once per term, so the client's own cost stays out of the measurements
+        with self._lock:
+            found = self._term_matches.get(term)
+            if found is None:
+                found = {}
+                for record in self.records:
+                    if term in record['title'].lower() or term in record['selftext'].lower():
+                        found.setdefault(record['subreddit'].lower(), []).append(record)
+                self._term_matches[term] = found
+        if subreddits is None:
+            return [record for records in found.values() for record in records]
+        return [record for subreddit in subreddits for record in found.get(subreddit, ())]
+
+
+class FakeSubreddit:
+
+    def __init__(self, reddit, names):
+        self.reddit = reddit
+        self.names = names
+
+    def search(self, query, sort='relevance', time_filter='all', limit=100, **kwargs):
+        terms = [term.strip().strip('"').lower() for term in query.split(' OR ')]
+        records = self.reddit.corpus.search(self.names, terms)
+        return self.reddit.page(self._sorted(records, sort), limit)
+
+    def hot(self, limit=100, **kwargs):
+        return self.reddit.page(self._sorted(self.reddit.corpus.listing(self.names), 'hot'), limit)
+
+    def new(self, limit=100, **kwargs):
+        return self.reddit.page(self._sorted(self.reddit.corpus.listing(self.names), 'new'), limit)
+
+    def top(self, time_filter='all', limit=100, **kwargs):
+        return self.reddit.page(self._sorted(self.reddit.corpus.listing(self.names), 'top'), limit)
+
+    @staticmethod
+    def _sorted(records, sort):
+        if sort == 'new':
+            return sorted(records, key=lambda record: -record['created_utc'])
+        if sort in ('top', 'hot', 'relevance'):
+            return sorted(records, key=lambda record: -record['score'])
+        return sorted(records, key=lambda record: -record['num_comments'])
+
+
+class FakeReddit:
+    """A praw.Reddit stand-in serving a Corpus with simulated latency."""
+
+    def __init__(self, corpus, latency=0.0, rate_limiter=None, priority=None, on_request=None):
+        """
+        Initialize the client.
+
+        Args:
+            corpus (Corpus): Submissions to serve
+            latency (float): Seconds every simulated API request takes
+            rate_limiter (RateLimiter): Budget every request is paced through
+            priority (str): Priority of the requests
+            on_request (callable): Called before every request
+        """
+        self.corpus = corpus
+        self.latency = latency
+        self.rate_limiter = rate_limiter
+        self.priority = priority
+        self.on_request = on_request
+        self.requests = 0
+
+    @classmethod
+    def factory(cls, corpus, latency=0.0):
+        """Return a RedditScraper client_factory building FakeReddit clients."""
+        return lambda requestor_kwargs: cls(corpus, latency, **requestor_kwargs)
+
+    def request(self):
+        """Simulate one API request, recording the same metrics as RateLimitedRequestor."""
+        self.requests += 1
+        if self.on_request is not None:
+            self.on_request()
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(self.priority)
+            metrics.API_WAIT_SECONDS.observe(waited)
+            metrics.record_stage('api_wait', waited)
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        elapsed = time.perf_counter() - start
+        metrics.API_REQUEST_SECONDS.observe(elapsed)
+        metrics.record_stage('api_request', elapsed)
+        metrics.API_REQUESTS.inc(status='200')
+
+    def page(self, records, limit):
+        """Yield up to limit submissions, one request per page."""
+        limit = len(records) if limit is None else min(limit, len(records))
+        for start in range(0, max(limit, 1), PAGE_SIZE):
+            self.request()
+            for record in records[start:min(start + PAGE_SIZE, limit)]:
+                yield _submission(record)
+
+    def subreddit(self, names):
+        return FakeSubreddit(self, names)
+
+    def info(self, fullnames=None):
+        self.request()
+        for fullname in fullnames or ():
+            record = self.corpus.by_id.get(fullname.split('_', 1)[-1])
+            if record is not None:
+                yield _submission(record)
+
+
+def record(path, subreddits, limit, sort='new'):
+    """Record listings of the live API into a fixture file."""
+    import praw
+
+    reddit = praw.Reddit(
+        client_id=os.environ['REDDIT_CLIENT_ID'],
+        client_secret=os.environ['REDDIT_CLIENT_SECRET'],
+        user_agent=os.environ['REDDIT_USER_AGENT']
+    )
+    corpus = []
+    for subreddit in subreddits:
+        for submission in getattr(reddit.subreddit(subreddit), sort)(limit=limit):
+            entry = {field: getattr(submission, field) for field in FIELDS if field != 'subreddit'}
+            entry['subreddit'] = submission.subreddit.display_name
+            corpus.append(entry)
+    save_fixtures(corpus, path)
+    print(f"Recorded {len(corpus)} submissions to {path}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Record or generate Reddit listing fixtures.')
+    parser.add_argument('action', choices=['record', 'generate'])
+    parser.add_argument('path', help='Fixture file to write (.json or .json.gz)')
+    parser.add_argument('--subreddits', default='emailmarketing,marketing,SEO,sales,Entrepreneur')
+    parser.add_argument('--limit', type=int, default=1000, help='Submissions per subreddit')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.subreddits.split(',') if name.strip()]
+    if args.action == 'record':
+        record(args.path, names, args.limit)
+    else:
+        save_fixtures(generate_corpus(names, args.limit), args.path)
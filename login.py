@@ -48,35 +48,41 @@ Now your service account has access to the spreadsheet.
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from gspread.exceptions import SpreadsheetNotFound
+import functools
 import json
 import os
 
-def get_or_create_spreadsheet(spreadsheet_name):
-    # Define the scope for Google Sheets and Drive APIs
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    
+# Define the scope for Google Sheets and Drive APIs
+SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive"
+]
+
+@functools.lru_cache(maxsize=None)
+def get_client(credentials_path="credentials.json"):
+    # Authorize once per process; gspread refreshes the token itself when it expires
+    creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_path, SCOPE)
+    return gspread.authorize(creds)
+
+def get_or_create_spreadsheet(spreadsheet_name, credentials_path="credentials.json"):
     # Check if credentials.json exists
-    if not os.path.exists("credentials.json"):
-        print("Error: credentials.json file not found in the current directory.")
+    if not os.path.exists(credentials_path):
+        print(f"Error: {credentials_path} file not found in the current directory.")
         return None
     
     # Print email from credentials for debugging
     try:
-        with open("credentials.json", "r") as f:
+        with open(credentials_path, "r") as f:
             creds_data = json.load(f)
             service_account_email = creds_data.get("client_email")
             print(f"Using service account: {service_account_email}")
             print("Make sure this email has access to your Google Sheet!")
     except Exception as e:
-        print(f"Error reading credentials.json: {e}")
+        print(f"Error reading {credentials_path}: {e}")
     
     try:
-        # Load credentials from the credentials.json file
-        creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-        client = gspread.authorize(creds)
+        # Load credentials from the credentials file
+        client = get_client(credentials_path)
         
         try:
             # Try to open the spreadsheet
@@ -109,11 +115,12 @@ def get_or_create_spreadsheet(spreadsheet_name):
         return None
 
 # Usage
-sheet = get_or_create_spreadsheet("Lemon Leads")
-if sheet:
-    print("Accessing sheet:", sheet.title)
-    # Test by adding a row
-    sheet.append_row(["Test", "This is a test row", "https://example.com", "test source", "2025-03-04", "test keyword"])
-    print("Test row added successfully")
-else:
-    print("Failed to access sheet. Please check the credentials and permissions.")
+if __name__ == "__main__":
+    sheet = get_or_create_spreadsheet("Lemon Leads")
+    if sheet:
+        print("Accessing sheet:", sheet.title)
+        # Test by adding a row
+        sheet.append_row(["Test", "This is a test row", "https://example.com", "test source", "2025-03-04", "test keyword"])
+        print("Test row added successfully")
+    else:
+        print("Failed to access sheet. Please check the credentials and permissions.")
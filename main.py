@@ -1,56 +1,168 @@
 # main.py
-import asyncio
+import argparse
 import yaml
+from dotenv import load_dotenv
 from Scrapers.reddit_scraper import RedditScraper
-from Scrapers.twitter_scraper import TwitterScraper
-import datetime
+from Scrapers.batch_runner import BatchRunner, load_credentials
+from Scrapers.post_store import PostStore
+from Scrapers.query_planner import PlanReport
+from Scrapers.rate_limiter import PRIORITY_BATCH
+from Scrapers.sheets import GspreadBackend, SheetWriter
 import time
 
-async def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Reddit for the keywords in config.yaml")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Refresh upvotes and comment counts of stored posts instead of scraping"
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=None,
+        help="With --refresh, only refresh posts created in the last N days"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep watching the target subreddits for new posts that mention a keyword"
+    )
+    return parser.parse_args()
+
+def refresh(reddit_scraper, store, max_age=None):
+    """Refresh the metrics of stored posts with batched id lookups."""
+    since = time.time() - max_age * 86400 if max_age is not None else None
+    post_ids = store.ids(since=since)
+    print(f"Refreshing metrics for {len(post_ids)} stored posts...")
+
+    metrics = reddit_scraper.refresh_metrics(post_ids)
+    print(f"Updated {len(metrics)} posts ({len(post_ids) - len(metrics)} deleted or unavailable)")
+
+def watch(reddit_scraper, config, sheet_writer=None):
+    """Stream new submissions and save the ones matching a keyword until interrupted."""
+    count = 0
+    try:
+        for post in reddit_scraper.watch(
+            keywords=",".join(config["search_keywords"]),
+            subreddits=",".join(config.get("target_subreddits") or []),
+            poll_interval=config.get("watch_poll_interval", 2),
+            skip_existing=False
+        ):
+            count += 1
+            print(f"[{post['subreddit']}] {post['title']} ({', '.join(post['matched_keywords'])})")
+            if sheet_writer is not None:
+                sheet_writer.write([post])
+    except KeyboardInterrupt:
+        pass
+    print(f"Saved {count} matching posts while watching")
+
+def run_batch(config, credentials, sheet_writer=None):
+    """Shard the scrape across a pool of API credentials, one process per client."""
+    runner = BatchRunner(credentials, store_path=config.get("post_store_path"))
+    results = runner.run(
+        keywords=config["search_keywords"],
+        subreddits=config.get("target_subreddits") or [],
+        post_limit=config.get("post_limit", 100),
+        incremental=True,
+        collapse=config.get("collapse_queries", False)
+    )
+    if sheet_writer is not None:
+        sheet_writer.write(results)
+
+    stats = runner.stats
+    print(f"Found {stats['unique_posts']} new posts with {len(credentials)} clients "
+          f"({stats['duplicates']} duplicates merged)")
+    for client_id, client_stats in stats['clients'].items():
+        print(f"  {client_id}: {client_stats}")
+
+def open_sheet_writer(config):
+    """Return a SheetWriter for the configured spreadsheet, or None if it cannot be opened."""
+    spreadsheet_name = config.get("spreadsheet_name")
+    if not spreadsheet_name:
+        return None
+
+    # Imported here so scraping works without the Google client libraries
+    from login import get_or_create_spreadsheet
+
+    sheet = get_or_create_spreadsheet(spreadsheet_name)
+    if sheet is None:
+        print("Google Sheet unavailable, posts are only saved to the post store")
+        return None
+
+    # Newest posts go right under the header row
+    return SheetWriter(GspreadBackend(sheet, insert_at=2), batch_size=config.get("sheet_batch_size", 500))
+
+def main():
+    args = parse_args()
+    load_dotenv()
+
     with open("config.yaml") as f:
         config = yaml.safe_load(f)
-    
-    reddit_scraper = RedditScraper()
-    all_results = []
-    
+
+    # Posts already seen in earlier runs are kept here, so each run only fetches the delta
+    store = PostStore(config.get("post_store_path"))
+
+    # Several credential sets multiply the API budget; each gets its own worker process
+    credentials = load_credentials(config.get("credentials_pool"))
+    if len(credentials) > 1 and not args.refresh and not args.watch:
+        sheet_writer = open_sheet_writer(config)
+        try:
+            run_batch(config, credentials, sheet_writer)
+        finally:
+            if sheet_writer is not None:
+                sheet_writer.close()
+        return
+
+    reddit_scraper = RedditScraper(
+        client_id=credentials[0]['client_id'],
+        client_secret=credentials[0]['client_secret'],
+        user_agent=credentials[0]['user_agent'],
+        priority=PRIORITY_BATCH,
+        store=store
+    )
+
     try:
-        # Initialize the Reddit client
-        await reddit_scraper.initialize()
-        
-        for keyword in config["search_keywords"]:
-            results = await reddit_scraper.scrape(keyword)
-            all_results.extend(results)
-            
-        # Process Twitter data if needed
-        # twitter_scraper = TwitterScraper()
-        # for keyword in config["search_keywords"]:
-        #     twitter_results = twitter_scraper.scrape(keyword, config["twitter_search_params"])
-        #     all_results.extend(twitter_results)
-        
-        # Save all results to the Google Sheet
-        if all_results:
-            print(f"Preparing to update sheet with {len(all_results)} rows...")
-            
-            # Get spreadsheet URL before any operations
-            spreadsheet_url = reddit_scraper.get_spreadsheet_url()
-            
-            # Insert data at the top (after header if exists)
-            insertion_row = 2  # Assuming row 1 is header
-            
-            # Insert in batches to avoid API limits
-            batch_size = 100
-            for i in range(0, len(all_results), batch_size):
-                batch = all_results[i:i + batch_size]
-                reddit_scraper.insert_rows(batch, insertion_row)
-                print(f"Inserted batch of {len(batch)} rows")
-                time.sleep(1)  # Small delay to avoid rate limiting
-            
-            print(f"Successfully saved {len(all_results)} new results to Google Sheet")
-            print(f"Spreadsheet URL: {spreadsheet_url}")
-    
+        if args.refresh:
+            refresh(reddit_scraper, store, args.max_age)
+            return
+
+        # Posts are written to the Google Sheet while the scrape is still running
+        sheet_writer = open_sheet_writer(config)
+        plan = PlanReport()
+        count = 0
+        try:
+            if args.watch:
+                watch(reddit_scraper, config, sheet_writer)
+                return
+
+            for post in reddit_scraper.iter_posts(
+                keywords=",".join(config["search_keywords"]),
+                subreddits=",".join(config.get("target_subreddits") or []),
+                post_limit=config.get("post_limit", 100),
+                incremental=True,
+                collapse=config.get("collapse_queries", False),
+                report=plan
+            ):
+                count += 1
+                if sheet_writer is not None:
+                    sheet_writer.write([post])
+        finally:
+            if sheet_writer is not None:
+                sheet_writer.close()
+        print(f"Found {count} new posts ({store.count()} stored in total)")
+        print(f"Ran {plan.executed_queries} queries with {plan.api_requests} API requests "
+              f"({plan.unpacked_queries} queries without packing)")
+
+        if sheet_writer is not None:
+            stats = sheet_writer.stats()
+            print(f"Saved {stats['written']} new rows to Google Sheet in {stats['requests']} requests "
+                  f"({stats['skipped']} already present, {stats['failed']} failed)")
+            print(f"Spreadsheet URL: {sheet_writer.backend.worksheet.spreadsheet.url}")
+
     finally:
-        # Ensure the Reddit client is properly closed
-        await reddit_scraper.close()
+        # Ensure the worker pool is properly shut down
+        reddit_scraper.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
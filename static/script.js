@@ -12,19 +12,49 @@ document.addEventListener('DOMContentLoaded', function() {
     const resultsCard = document.getElementById('resultsCard');
     const resultCount = document.getElementById('resultCount');
     const resultsBody = document.getElementById('resultsBody');
+    const resultsTableContainer = document.getElementById('resultsTableContainer');
+    const resultsHeaders = document.querySelectorAll('#resultsTable th[data-sort]');
     const searchResults = document.getElementById('searchResults');
+    const sentimentFilter = document.getElementById('sentimentFilter');
     const exportCSVButton = document.getElementById('exportCSV');
     const tabButtons = document.querySelectorAll('.tab-btn');
     const tabContents = document.querySelectorAll('.tab-content');
     const insightsContainer = document.getElementById('insightsContainer');
     
-    // Store the fetched data
+    // Rows have a fixed height, so the visible window follows from the scroll position
+    const PAGE_SIZE = 200;
+    const OVERSCAN = 10;
+    const CONTENT_PREVIEW = 150;
+    
+    // Light copies of the streamed posts for the insight panels, and the id of the scrape job
     let scrapedData = [];
+    let currentJobId = null;
+    
+    // The table only holds the pages loaded from the server so far
+    const table = {
+        rows: [],
+        total: 0,
+        nextCursor: null,
+        complete: false,
+        loading: false,
+        generation: 0,
+        sort: 'date',
+        order: 'desc'
+    };
+    let rowHeight = 48;
+    let renderScheduled = false;
+    let filterTimer = null;
+    let refreshTimer = null;
     
     // Event listeners
     scrapeButton.addEventListener('click', startScraping);
     searchResults.addEventListener('input', filterResults);
+    sentimentFilter.addEventListener('change', () => reloadResults());
     exportCSVButton.addEventListener('click', exportToCSV);
+    resultsTableContainer.addEventListener('scroll', scheduleRender);
+    resultsHeaders.forEach(header => {
+        header.addEventListener('click', () => sortResults(header.getAttribute('data-sort')));
+    });
     
     // Tab navigation
     tabButtons.forEach(button => {
@@ -67,9 +97,16 @@ document.addEventListener('DOMContentLoaded', function() {
             subreddits: subreddits,
             post_limit: postLimit,
             time_filter: timeFilter,
-            sort_by: sortBy
+            sort_by: sortBy,
+            stream: true,
+            // Streamed posts only feed the insights; the table loads its pages with truncated content
+            content: 'omit'
         };
         
+        scrapedData = [];
+        currentJobId = null;
+        resetTable();
+        
         // Send request to the server
         fetch('/scrape', {
             method: 'POST',
@@ -82,11 +119,12 @@ document.addEventListener('DOMContentLoaded', function() {
             if (!response.ok) {
                 throw new Error('Network response was not ok');
             }
-            return response.json();
+            return readStream(response, handleStreamEvent);
         })
-        .then(data => {
-            scrapedData = data.results;
-            displayResults(scrapedData);
+        .then(() => {
+            clearTimeout(refreshTimer);
+            refreshTimer = null;
+            refreshResults();
             generateInsights(scrapedData);
             displayEngagementAnalysis(scrapedData);
             displaySentimentAnalysis(scrapedData);
@@ -105,46 +143,243 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // Display results in the table
-    function displayResults(results) {
-        resultsBody.innerHTML = '';
+    // Read a newline-delimited JSON response, calling onEvent for every line as it arrives
+    async function readStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            
+            const posts = [];
+            lines.forEach(line => {
+                if (!line.trim()) return;
+                const event = JSON.parse(line);
+                if (event.type === 'post') {
+                    posts.push(event.post);
+                } else {
+                    onEvent(event);
+                }
+            });
+            
+            // Render everything that arrived in this chunk at once
+            if (posts.length > 0) {
+                onEvent({ type: 'posts', posts: posts });
+            }
+        }
         
-        if (results.length === 0) {
-            resultCount.textContent = 'No results found';
-            return;
+        if (buffered.trim()) {
+            onEvent(JSON.parse(buffered));
         }
+    }
+    
+    // Handle a single event from the /scrape stream
+    function handleStreamEvent(event) {
+        if (event.type === 'job') {
+            currentJobId = event.job_id;
+        } else if (event.type === 'posts') {
+            // The table pages through the job on the server, so only what the insights need is kept
+            event.posts.forEach(post => scrapedData.push({
+                subreddit: post.subreddit,
+                upvotes: post.upvotes,
+                comments: post.comments,
+                sentiment: post.sentiment
+            }));
+            statusMessage.textContent = `Scraping in progress... ${scrapedData.length} posts so far`;
+            resultsCard.classList.remove('hidden');
+            scheduleRefresh();
+        } else if (event.type === 'error') {
+            throw new Error(event.error);
+        }
+    }
+    
+    // Refresh the table at most once a second while posts keep arriving
+    function scheduleRefresh() {
+        if (refreshTimer) return;
+        refreshTimer = setTimeout(() => {
+            refreshTimer = null;
+            refreshResults();
+        }, 1000);
+    }
+    
+    // Forget the loaded pages and clear the table
+    function resetTable() {
+        table.generation++;
+        table.rows = [];
+        table.total = 0;
+        table.nextCursor = null;
+        table.complete = false;
+        table.loading = false;
+        resultsBody.innerHTML = '';
+        resultCount.textContent = 'No results found';
+    }
+    
+    // Reload the table from the first page after the sort or filters changed
+    function reloadResults() {
+        resultsTableContainer.scrollTop = 0;
+        refreshResults();
+    }
+    
+    // Reload the pages covering the current scroll position
+    function refreshResults() {
+        if (!currentJobId) return;
+        resetTable();
+        loadNextPage();
+    }
+    
+    // Query string of the next page for the current sort and filters
+    function pageQuery() {
+        const params = new URLSearchParams({
+            limit: PAGE_SIZE,
+            sort: table.sort,
+            order: table.order,
+            content_limit: CONTENT_PREVIEW + 1
+        });
+        if (table.nextCursor) params.set('cursor', table.nextCursor);
         
-        resultCount.textContent = `${results.length} results found`;
+        const query = searchResults.value.trim();
+        if (query) params.set('q', query);
         
-        results.forEach(item => {
-            const row = document.createElement('tr');
-            
-            // Truncate content for display
-            const truncatedContent = item.content && item.content.length > 150 
-                ? item.content.substring(0, 150) + '...' 
-                : item.content || 'No content';
-                
-            // Determine sentiment class
-            let sentimentClass = 'sentiment-neutral';
-            if (item.sentiment > 0.2) sentimentClass = 'sentiment-positive';
-            if (item.sentiment < -0.2) sentimentClass = 'sentiment-negative';
+        const sentiment = sentimentFilter.value;
+        if (sentiment === 'positive') params.set('min_sentiment', 0.2);
+        if (sentiment === 'negative') params.set('max_sentiment', -0.2);
+        if (sentiment === 'neutral') {
+            params.set('min_sentiment', -0.2);
+            params.set('max_sentiment', 0.2);
+        }
+        return params;
+    }
+    
+    // Fetch the page after the loaded rows
+    function loadNextPage() {
+        if (table.loading || table.complete || !currentJobId) return;
+        
+        table.loading = true;
+        const generation = table.generation;
+        
+        fetch(`/jobs/${encodeURIComponent(currentJobId)}/results?${pageQuery()}`)
+        .then(response => response.json().then(body => {
+            if (!response.ok) throw new Error(body.error || 'Could not load results');
+            return body;
+        }))
+        .then(page => {
+            // The sort or filters changed while this page was loading
+            if (generation !== table.generation) return;
             
-            row.innerHTML = `
-                <td><a href="${item.url}" target="_blank">${item.title}</a></td>
-                <td>${truncatedContent}</td>
-                <td>${item.subreddit}</td>
-                <td><a href="${item.url}" target="_blank">Link</a></td>
-                <td>${item.upvotes}</td>
-                <td>${item.comments}</td>
-                <td>${new Date(item.date * 1000).toLocaleDateString()}</td>
-                <td>${item.keyword}</td>
-                <td class="${sentimentClass}">${formatSentiment(item.sentiment)}</td>
-            `;
+            table.rows.push(...page.results);
+            table.nextCursor = page.next_cursor;
+            table.complete = !page.next_cursor;
+            if (page.total !== null && page.total !== undefined) table.total = page.total;
+            table.total = Math.max(table.total, table.rows.length);
+            table.loading = false;
             
-            resultsBody.appendChild(row);
+            resultCount.textContent = table.total > 0 ? `${table.total} results found` : 'No results found';
+            renderVisibleRows();
+        })
+        .catch(error => {
+            if (generation !== table.generation) return;
+            table.loading = false;
+            console.error('Error:', error);
+            statusMessage.textContent = 'Error: ' + error.message;
         });
     }
     
+    // Render on the next frame, once per frame however many scroll events arrive
+    function scheduleRender() {
+        if (renderScheduled) return;
+        renderScheduled = true;
+        requestAnimationFrame(() => {
+            renderScheduled = false;
+            renderVisibleRows();
+        });
+    }
+    
+    // Render only the rows in view, with spacers standing in for the rest
+    function renderVisibleRows() {
+        const visible = Math.ceil(resultsTableContainer.clientHeight / rowHeight);
+        const first = Math.max(0, Math.floor(resultsTableContainer.scrollTop / rowHeight) - OVERSCAN);
+        const last = Math.min(table.total, first + visible + 2 * OVERSCAN);
+        const rendered = Math.min(last, table.rows.length);
+        
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(spacerRow(first * rowHeight));
+        for (let i = first; i < rendered; i++) {
+            fragment.appendChild(resultRow(table.rows[i]));
+        }
+        fragment.appendChild(spacerRow((table.total - Math.max(rendered, first)) * rowHeight));
+        
+        resultsBody.innerHTML = '';
+        resultsBody.appendChild(fragment);
+        
+        // Use the height rows actually render at, borders included
+        const sample = resultsBody.querySelector('tr:not(.spacer-row)');
+        if (sample && sample.offsetHeight) rowHeight = sample.offsetHeight;
+        
+        // Keep loading pages until the rows in view are there
+        if (last > table.rows.length) {
+            loadNextPage();
+        }
+    }
+    
+    // Empty row holding the height of rows that are not rendered
+    function spacerRow(height) {
+        const row = document.createElement('tr');
+        row.className = 'spacer-row';
+        row.innerHTML = `<td colspan="9" style="height: ${Math.max(0, height)}px"></td>`;
+        return row;
+    }
+    
+    // Build the table row of one post
+    function resultRow(item) {
+        const row = document.createElement('tr');
+        
+        // Truncate content for display
+        const truncatedContent = item.content && item.content.length > CONTENT_PREVIEW
+            ? item.content.substring(0, CONTENT_PREVIEW) + '...'
+            : item.content || 'No content';
+            
+        // Determine sentiment class
+        let sentimentClass = 'sentiment-neutral';
+        if (item.sentiment > 0.2) sentimentClass = 'sentiment-positive';
+        if (item.sentiment < -0.2) sentimentClass = 'sentiment-negative';
+        
+        row.innerHTML = `
+            <td><a href="${escapeHtml(item.url)}" target="_blank">${escapeHtml(item.title)}</a></td>
+            <td>${escapeHtml(truncatedContent)}</td>
+            <td>${escapeHtml(item.subreddit)}</td>
+            <td><a href="${escapeHtml(item.url)}" target="_blank">Link</a></td>
+            <td>${item.upvotes}</td>
+            <td>${item.comments}</td>
+            <td>${new Date(item.date * 1000).toLocaleDateString()}</td>
+            <td>${escapeHtml(formatKeywords(item))}</td>
+            <td class="${sentimentClass}">${formatSentiment(item.sentiment)}</td>
+        `;
+        return row;
+    }
+    
+    // Escape text for use in HTML
+    function escapeHtml(text) {
+        return String(text ?? '')
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;');
+    }
+    
+    // Format every keyword a post matched for display
+    function formatKeywords(item) {
+        if (item.matched_keywords && item.matched_keywords.length > 0) {
+            return item.matched_keywords.join(', ');
+        }
+        return item.keyword;
+    }
+    
     // Format sentiment score for display
     function formatSentiment(score) {
         if (score > 0.2) return 'Positive';
@@ -152,25 +387,27 @@ document.addEventListener('DOMContentLoaded', function() {
         return 'Neutral';
     }
     
-    // Filter results based on search query
+    // Filter results on the server once typing pauses
     function filterResults() {
-        const query = searchResults.value.toLowerCase();
-        
-        if (!query) {
-            displayResults(scrapedData);
-            return;
+        clearTimeout(filterTimer);
+        filterTimer = setTimeout(reloadResults, 300);
+    }
+    
+    // Sort on a column, toggling the direction when it is already sorted on
+    function sortResults(column) {
+        if (table.sort === column) {
+            table.order = table.order === 'desc' ? 'asc' : 'desc';
+        } else {
+            table.sort = column;
+            table.order = 'desc';
         }
-        
-        const filtered = scrapedData.filter(item => {
-            return (
-                item.title.toLowerCase().includes(query) ||
-                (item.content && item.content.toLowerCase().includes(query)) ||
-                item.subreddit.toLowerCase().includes(query) ||
-                item.keyword.toLowerCase().includes(query)
-            );
+        resultsHeaders.forEach(header => {
+            header.classList.remove('sorted-asc', 'sorted-desc');
+            if (header.getAttribute('data-sort') === table.sort) {
+                header.classList.add(`sorted-${table.order}`);
+            }
         });
-        
-        displayResults(filtered);
+        reloadResults();
     }
     
     // Generate marketing insights
@@ -420,51 +657,15 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Export to CSV function
     function exportToCSV() {
-        if (scrapedData.length === 0) {
+        if (scrapedData.length === 0 || !currentJobId) {
             alert('No data to export');
             return;
         }
         
-        // Prepare CSV headers
-        const headers = [
-            'Title',
-            'Content',
-            'Subreddit',
-            'URL',
-            'Upvotes',
-            'Comments',
-            'Date',
-            'Keyword',
-            'Sentiment'
-        ];
-        
-        // Prepare CSV rows
-        const rows = scrapedData.map(item => {
-            return [
-                `"${item.title.replace(/"/g, '""')}"`,
-                `"${(item.content || '').replace(/"/g, '""')}"`,
-                item.subreddit,
-                item.url,
-                item.upvotes,
-                item.comments,
-                new Date(item.date * 1000).toLocaleDateString(),
-                item.keyword,
-                item.sentiment
-            ];
-        });
-        
-        // Combine headers and rows
-        const csvContent = [
-            headers.join(','),
-            ...rows.map(row => row.join(','))
-        ].join('\n');
-        
-        // Create a blob and download link
-        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-        const url = URL.createObjectURL(blob);
+        // The server streams the file, so the browser never holds the whole CSV in memory
         const link = document.createElement('a');
         
-        link.setAttribute('href', url);
+        link.setAttribute('href', `/export?format=csv&job_id=${encodeURIComponent(currentJobId)}`);
         link.setAttribute('download', `reddit_data_${new Date().toISOString().split('T')[0]}.csv`);
         link.style.display = 'none';
         
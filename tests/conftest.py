@@ -0,0 +1,39 @@
+# conftest.py
+import os
+import sys
+import time
+
+import pytest
+
+# The offline Reddit stand-in lives with the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from fake_reddit import Corpus, FakeReddit, generate_corpus  # noqa: E402
+
+from Scrapers.rate_limiter import RateLimiter  # noqa: E402
+from Scrapers.reddit_scraper import RedditScraper  # noqa: E402
+
+SUBREDDITS = ['emailmarketing', 'marketing', 'seo']
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    return Corpus(generate_corpus(SUBREDDITS, 300))
+
+
+@pytest.fixture
+def make_scraper(corpus, tmp_path):
+    """Build RedditScrapers serving the fake corpus, without a shared rate limit."""
+    scrapers = []
+
+    def make(**kwargs):
+        limiter = RateLimiter(f'test-{time.monotonic_ns()}', path=str(tmp_path / 'rate_limit.sqlite3'),
+                              capacity=1e6, refill_rate=1e6)
+        scraper = RedditScraper('test', 'test', 'test', max_workers=4, rate_limiter=limiter,
+                                client_factory=FakeReddit.factory(corpus), **kwargs)
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.close()
@@ -0,0 +1,49 @@
+# test_analytics.py
+import time
+
+import pytest
+
+from Scrapers.analytics import TrendIndex
+
+
+def make_posts(count, hours_apart=6):
+    now = time.time()
+    return [{
+        'id': f'p{i}',
+        'title': f'Post {i}',
+        'subreddit': 'emailmarketing',
+        'keyword': 'newsletter',
+        'date': now - i * hours_apart * 3600,
+        'sentiment': 0.5,
+        'upvotes': i,
+        'comments': 1
+    } for i in range(count)]
+
+
+@pytest.mark.parametrize('load', ['add_posts', 'backfill'])
+def test_posts_older_than_the_retention_are_not_counted(load):
+    index = TrendIndex(retention=5 * 86400)
+    getattr(index, load)(make_posts(100))
+    # 20 posts 6 hours apart, plus the one in the bucket the cutoff falls in
+    assert len(index) == 21
+    assert sum(bucket['posts'] for bucket in index.trend(interval='hour')) == 21
+
+
+@pytest.mark.parametrize('load', ['add_posts', 'backfill'])
+def test_aged_out_posts_and_buckets_are_dropped(load):
+    index = TrendIndex(retention=5 * 86400)
+    getattr(index, load)(make_posts(100))
+
+    index.retention = 2 * 86400
+    assert index.add_posts([]) == 0
+    assert len(index) == 9
+    assert sum(len(buckets) for buckets in index._series.values()) == 2 * 9
+    assert sum(bucket['posts'] for bucket in index.trend(interval='hour')) == 9
+    assert not index.update_metrics('p19', 1, 1)
+    assert index.update_metrics('p1', 5, 1)
+
+
+def test_without_retention_everything_is_kept():
+    index = TrendIndex()
+    index.add_posts(make_posts(100, hours_apart=24 * 30))
+    assert len(index) == 100
@@ -0,0 +1,114 @@
+# test_app.py
+import pytest
+
+import app as app_module
+from Scrapers.jobs import JobManager
+from Scrapers.post_store import PostStore
+
+SCRAPE = {'keywords': 'newsletter', 'subreddits': 'emailmarketing', 'post_limit': 1000, 'time_filter': 'all',
+          'sort_by': 'new', 'wait': True}
+
+
+@pytest.fixture
+def credential_checks(monkeypatch):
+    """Record live credential checks; they fail while Reddit is 'unreachable'."""
+    checks = {'reachable': True, 'live': []}
+
+    def validate_credentials(self, live=False):
+        if live:
+            checks['live'].append(True)
+            if not checks['reachable']:
+                raise ValueError('Could not reach Reddit to check the credentials')
+
+    monkeypatch.setattr(type(app_module.reddit_scraper), 'validate_credentials', validate_credentials)
+    monkeypatch.setattr(app_module, 'SCRAPER_VALIDATE_CREDENTIALS', True)
+    return checks
+
+
+@pytest.fixture
+def make_client(make_scraper, tmp_path, monkeypatch):
+    """Build Flask test clients whose jobs run on a scraper of the fake corpus."""
+    managers = []
+
+    def make(store=True):
+        scraper = make_scraper(store=PostStore(str(tmp_path / 'posts.sqlite3')) if store else None)
+        manager = JobManager(scraper)
+        managers.append(manager)
+        monkeypatch.setattr(app_module, 'reddit_scraper', scraper)
+        monkeypatch.setattr(app_module, 'job_manager', manager)
+        return app_module.app.test_client()
+
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+
+def test_local_first_is_answered_without_reddit_when_the_store_covers_it(make_client, credential_checks):
+    client = make_client()
+    fetched = client.post('/scrape', json=SCRAPE)
+    assert fetched.status_code == 200 and fetched.get_json()['results']
+
+    credential_checks['reachable'] = False
+    credential_checks['live'].clear()
+    local = client.post('/scrape', json=dict(SCRAPE, local_first=True))
+
+    assert local.status_code == 200
+    assert len(local.get_json()['results']) == len(fetched.get_json()['results'])
+    assert credential_checks['live'] == []
+
+
+def test_local_first_checks_credentials_when_it_needs_the_api(make_client, credential_checks):
+    client = make_client()
+    credential_checks['reachable'] = False
+
+    response = client.post('/scrape', json=dict(SCRAPE, local_first=True))
+
+    assert response.status_code == 503
+    assert credential_checks['live'] == [True]
+
+
+@pytest.mark.parametrize('params', [{}, {'store': True, 'incremental': True}])
+def test_invalid_local_first_arguments_are_rejected_before_the_credential_check(make_client, credential_checks,
+                                                                                 params):
+    client = make_client(store=params.pop('store', False))
+    credential_checks['reachable'] = False
+
+    response = client.post('/scrape', json=dict(SCRAPE, local_first=True, **params))
+
+    assert response.status_code == 400
+    assert credential_checks['live'] == []
+
+
+def test_job_results_page_with_cursors(make_client, credential_checks):
+    client = make_client(store=False)
+    job_id = client.post('/scrape', json=dict(SCRAPE, subreddits='seo,marketing')).get_json()['job_id']
+    url = f'/jobs/{job_id}/results'
+
+    everything = client.get(url).get_json()['results']
+    served, query = [], {'limit': 7, 'subreddit': 'seo'}
+    while True:
+        page = client.get(url, query_string=query)
+        assert page.status_code == 200
+        served.extend(post['id'] for post in page.get_json()['results'])
+        if page.get_json()['next_cursor'] is None:
+            break
+        query['cursor'] = page.get_json()['next_cursor']
+
+    expected = sorted((post for post in everything if post['subreddit'] == 'seo'), key=lambda post: post['date'],
+                      reverse=True)
+    assert served == [post['id'] for post in expected]
+
+
+@pytest.mark.parametrize('query', [
+    {'cursor': 'not-a-cursor'},
+    {'cursor': 'WyJ0aXRsZSIsdHJ1ZSwxLDBd'},
+    {'limit': 5, 'sort': 'upvotes', 'cursor': 'WyJkYXRlIix0cnVlLDEsMF0'},
+])
+def test_invalid_cursors_are_client_errors(make_client, credential_checks, query):
+    client = make_client(store=False)
+    job_id = client.post('/scrape', json=SCRAPE).get_json()['job_id']
+
+    response = client.get(f'/jobs/{job_id}/results', query_string=query)
+
+    assert response.status_code == 400
+    assert 'cursor' in response.get_json()['error'].lower()
@@ -0,0 +1,113 @@
+# test_base_scraper.py
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from Scrapers.base_scraper import BaseScraper
+from Scrapers.http_cache import HttpCache
+
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves /etag (revalidated with If-None-Match), /flaky (503 twice, then 200) and /missing (404)."""
+
+    def do_GET(self):
+        hits = self.server.hits
+        hits[self.path] += 1
+        if self.path == '/etag':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.reply(304)
+            else:
+                self.reply(200, b'<p>cached page</p>', {'ETag': ETAG})
+        elif self.path == '/flaky':
+            if hits[self.path] <= 2:
+                self.reply(503, b'unavailable')
+            else:
+                self.reply(200, b'<p>recovered</p>')
+        else:
+            self.reply(404, b'not found')
+
+    def reply(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.hits = Counter()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    scraper = BaseScraper(cache=HttpCache(str(tmp_path)), max_delay=0.05)
+    yield scraper
+    scraper.session.close()
+
+
+def url(server, path):
+    return f'http://127.0.0.1:{server.server_address[1]}{path}'
+
+
+def test_etag_revalidation_is_served_from_cache(server, scraper):
+    first = scraper.make_request(url(server, '/etag'), delay=0.01)
+    second = scraper.make_request(url(server, '/etag'), delay=0.01)
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.status_code == 200
+    assert second.content == first.content == b'<p>cached page</p>'
+    assert server.hits['/etag'] == 2
+
+
+def test_503_is_retried_until_success(server, scraper):
+    response = scraper.make_request(url(server, '/flaky'), retries=3, delay=0.01)
+
+    assert response.status_code == 200
+    assert response.content == b'<p>recovered</p>'
+    assert server.hits['/flaky'] == 3
+
+
+def test_404_is_not_retried(server, scraper):
+    with pytest.raises(requests.exceptions.HTTPError):
+        scraper.make_request(url(server, '/missing'), retries=3, delay=0.01)
+
+    assert server.hits['/missing'] == 1
+
+
+def test_async_fetch_follows_the_same_rules(server, scraper):
+    aiohttp = pytest.importorskip('aiohttp')
+    urls = [url(server, path) for path in ('/etag', '/flaky', '/missing')]
+
+    first = scraper.fetch_all(urls, retries=3, delay=0.01)
+    second = scraper.fetch_all(urls[:1], delay=0.01)
+
+    cached, recovered, missing = first
+    assert not cached.from_cache and cached.content == b'<p>cached page</p>'
+    assert second[0].from_cache and second[0].status_code == 200
+    assert second[0].content == cached.content
+    assert recovered.status_code == 200 and recovered.text == '<p>recovered</p>'
+    assert isinstance(missing, aiohttp.ClientResponseError) and missing.status == 404
+    assert server.hits == Counter({'/etag': 2, '/flaky': 3, '/missing': 1})
+
+
+def test_html_parser_is_the_default_and_lxml_is_opt_in():
+    assert BaseScraper().parser == 'html.parser'
+    assert BaseScraper(parser='lxml').parser == 'lxml'
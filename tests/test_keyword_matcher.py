@@ -0,0 +1,61 @@
+# test_keyword_matcher.py
+import random
+
+import pytest
+
+from Scrapers.keyword_matcher import KeywordMatcher, normalize
+
+# Keywords that overlap: prefixes, suffixes and phrases containing other keywords
+KEYWORDS = ['email', 'Email Marketing', 'marketing', 'mail', 'e-mail', 'ail', 'SEO', 'seo tools', 'tools',
+            'open rate', 'rate']
+
+
+def substring_matches(keywords, text):
+    """Match each keyword on its own with a substring test on word boundaries."""
+    padded = f" {normalize(text)} "
+    return [keyword for keyword in dict.fromkeys(keywords)
+            if normalize(keyword) and f" {normalize(keyword)} " in padded]
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Keywords at the very start and end of the text
+    ('email', ['email']),
+    ('SEO tools', ['SEO', 'seo tools', 'tools']),
+    ('Tools for SEO', ['SEO', 'tools']),
+    # Case and punctuation around words do not matter
+    ('EMAIL MARKETING!', ['email', 'Email Marketing', 'marketing']),
+    ('(seo), rate.', ['SEO', 'rate']),
+    # Multi-word phrases match across any punctuation and whitespace
+    ('our open\n\trate', ['open rate', 'rate']),
+    ('email-marketing', ['email', 'Email Marketing', 'marketing']),
+    # Punctuation splits words, so "E-mail" also holds the word "mail"
+    ('E-mail', ['mail', 'e-mail']),
+    # Words inside longer words are not matches
+    ('seoul gmail emails failing', []),
+    ('remarketing opens rated', []),
+    ('', []),
+])
+def test_matches(text, expected):
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.find(text) == expected
+    assert matcher.find(text) == substring_matches(KEYWORDS, text)
+
+
+def test_matches_per_keyword_substring_search_on_random_text():
+    rng = random.Random(7)
+    vocabulary = ['email', 'e', 'mail', 'marketing', 'seo', 'tools', 'open', 'rate', 'ail', 'seoul', 'the', 'our']
+    marks = ['', '', ' ', '-', '.', ',', '!', '\n', '(', ')']
+    matcher = KeywordMatcher(KEYWORDS)
+
+    for _ in range(2000):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 8))]
+        words = [word.upper() if rng.random() < 0.2 else word for word in words]
+        text = ''.join(rng.choice(marks) + word for word in words) + rng.choice(marks)
+        assert matcher.find(text) == substring_matches(KEYWORDS, text), text
+
+
+def test_keywords_keep_their_spelling_and_order():
+    matcher = KeywordMatcher(['SEO', 'Newsletter', 'SEO', '', '!!!'])
+    assert len(matcher) == 2
+    assert matcher.match_post('newsletter', 'about seo') == ['SEO', 'Newsletter']
+    assert KeywordMatcher([]).find('anything') == []
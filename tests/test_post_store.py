@@ -0,0 +1,43 @@
+# test_post_store.py
+import pytest
+
+from Scrapers.post_store import PostStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PostStore(str(tmp_path / 'posts.sqlite3'))
+
+
+def test_overlapping_coverage_is_merged(store):
+    store.add_coverage('seo', 'newsletter', 100, 200)
+    store.add_coverage('seo', 'newsletter', 150, 300)
+    assert store.get_coverage('seo', 'newsletter') == (100, 300)
+
+    store.add_coverage('seo', 'newsletter', 50, 100)
+    assert store.get_coverage('seo', 'newsletter') == (50, 300)
+
+
+def test_contained_coverage_changes_nothing(store):
+    store.add_coverage('seo', 'newsletter', 100, 300)
+    store.add_coverage('seo', 'newsletter', 150, 200)
+    assert store.get_coverage('seo', 'newsletter') == (100, 300)
+
+
+def test_disjoint_coverage_keeps_the_newest_range(store):
+    store.add_coverage('seo', 'newsletter', 100, 200)
+    store.add_coverage('seo', 'newsletter', 10, 50)
+    assert store.get_coverage('seo', 'newsletter') == (100, 200)
+
+    store.add_coverage('seo', 'newsletter', 400, 500)
+    assert store.get_coverage('seo', 'newsletter') == (400, 500)
+
+
+def test_coverage_is_kept_per_pair_case_insensitively(store):
+    store.add_coverage('SEO', 'Newsletter', 100, 200)
+    store.add_coverage('seo', '', 0, 50)
+
+    assert store.get_coverage('seo', 'newsletter') == (100, 200)
+    assert store.get_coverage('Seo', '') == (0, 50)
+    assert store.get_coverage('seo', 'other') is None
+    assert store.get_coverage('marketing', 'newsletter') is None
@@ -0,0 +1,91 @@
+# test_reddit_scraper.py
+import time
+
+from Scrapers.post_store import PostStore
+from Scrapers.query_cache import QueryCache
+from Scrapers.query_planner import PlanReport
+
+
+def test_cache_hits_take_the_keyword_spelling_of_the_query(make_scraper):
+    scraper = make_scraper(cache=QueryCache())
+    first = scraper.scrape_reddit(keywords='Newsletter', subreddits='seo', post_limit=20, time_filter='all')
+    assert scraper.cache.misses == 1
+
+    posts = scraper.scrape_reddit(keywords='newsletter', subreddits='seo', post_limit=20, time_filter='all')
+    assert scraper.cache.hits == 1
+    assert len(posts) == len(first) > 0
+    for post in posts:
+        assert post['keyword'] == 'newsletter'
+        assert post['matched_keywords'] == ['newsletter']
+
+
+def test_packed_cache_hits_take_the_spelling_of_the_query(make_scraper):
+    scraper = make_scraper(cache=QueryCache())
+    scraper.scrape_reddit(keywords='Newsletter,SEO', subreddits='SEO,Marketing', post_limit=5, time_filter='all',
+                          collapse=True)
+
+    posts = scraper.scrape_reddit(keywords='newsletter,seo', subreddits='seo,marketing', post_limit=5,
+                                  time_filter='all', collapse=True)
+    assert scraper.cache.hits == 1 and len(posts)
+    for post in posts:
+        assert set(post['matched_keywords']) <= {'newsletter', 'seo'}
+        assert set(post['matched_subreddits']) <= {'seo', 'marketing'}
+
+
+def scrape(scraper, **kwargs):
+    """Run a scrape of newsletter posts in r/seo and return its posts and plan report."""
+    report = PlanReport()
+    params = dict(keywords='newsletter', subreddits='seo', post_limit=1000, time_filter='all', sort='new')
+    posts = list(scraper.iter_posts(report=report, **dict(params, **kwargs)))
+    return posts, report
+
+
+def test_exhausted_query_covers_its_window_and_is_answered_locally(make_scraper, tmp_path):
+    scraper = make_scraper(store=PostStore(str(tmp_path / 'posts.sqlite3')))
+    fetched, _ = scrape(scraper)
+    covered_from, covered_until = scraper.store.get_coverage('seo', 'newsletter')
+    assert covered_from == 0.0 and covered_until >= time.time() - 60
+
+    posts, report = scrape(scraper, local_first=True)
+    assert report.local_queries == 1 and report.api_requests == 0
+    assert [post['id'] for post in posts] == [post['id'] for post in fetched]
+
+
+def test_stale_coverage_fetches_newer_posts_first(make_scraper, tmp_path):
+    scraper = make_scraper(store=PostStore(str(tmp_path / 'posts.sqlite3')))
+    fetched, _ = scrape(scraper)
+    _, covered_until = scraper.store.get_coverage('seo', 'newsletter')
+
+    fresh, report = scrape(scraper, local_first=True, max_age=3600)
+    assert report.local_queries == 1 and report.api_requests == 0
+
+    time.sleep(0.01)
+    stale, report = scrape(scraper, local_first=True, max_age=0)
+    assert report.local_queries == 1 and report.api_requests > 0
+    assert scraper.store.get_coverage('seo', 'newsletter')[1] > covered_until
+    assert len(stale) == len(fresh) == len(fetched)
+
+
+def test_partial_coverage_falls_back_to_the_api(make_scraper, tmp_path):
+    scraper = make_scraper(store=PostStore(str(tmp_path / 'posts.sqlite3')))
+    newest, _ = scrape(scraper, post_limit=20)
+    # A full newest-first page only covers back to its oldest post
+    assert scraper.store.get_coverage('seo', 'newsletter')[0] == min(post['date'] for post in newest)
+
+    posts, report = scrape(scraper, sort='relevance', local_first=True)
+    assert report.local_queries == 0 and report.api_requests > 0
+    assert len(posts) > len(newest)
+
+    # The covered range alone holds the newest posts
+    posts, report = scrape(scraper, post_limit=20, local_first=True)
+    assert report.local_queries == 1 and report.api_requests == 0
+    assert [post['id'] for post in posts] == [post['id'] for post in newest]
+
+
+def test_a_full_page_of_ranked_results_covers_nothing(make_scraper, tmp_path):
+    scraper = make_scraper(store=PostStore(str(tmp_path / 'posts.sqlite3')))
+    scrape(scraper, post_limit=20, sort='relevance')
+    assert scraper.store.get_coverage('seo', 'newsletter') is None
+
+    _, report = scrape(scraper, post_limit=20, sort='relevance', local_first=True)
+    assert report.local_queries == 0
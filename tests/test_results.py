@@ -0,0 +1,108 @@
+# test_results.py
+import base64
+
+import pytest
+
+from Scrapers.results import ResultSet, decode_cursor, encode_cursor
+
+
+def make_post(number, subreddit='seo', date=None):
+    return {
+        'id': f'p{number}',
+        'title': f'Post {number}',
+        'subreddit': subreddit,
+        'date': float(number if date is None else date),
+        'upvotes': number % 7,
+        'sentiment': 0.0
+    }
+
+
+def ids(results, page):
+    return [results.ids[row] for row in page['rows']]
+
+
+def read_all(results, limit, cursor=None, **kwargs):
+    """Page through a result set from a cursor, returning every id served."""
+    served = []
+    while True:
+        page = results.page(limit=limit, cursor=cursor, **kwargs)
+        served.extend(ids(results, page))
+        cursor = page['next_cursor']
+        if cursor is None:
+            return served
+
+
+def test_cursor_round_trip():
+    token = encode_cursor('upvotes', False, 12, 7)
+    assert '=' not in token
+    assert decode_cursor(token) == ('upvotes', False, 12, 7)
+
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_pages_cover_every_row_once_in_sort_order(descending):
+    # Repeated upvote values are ordered by row
+    results = ResultSet([make_post(number) for number in range(50)])
+    served = read_all(results, 7, sort='upvotes', descending=descending)
+
+    expected = sorted(results.ids, key=lambda post_id: (results.get(post_id)['upvotes'], int(post_id[1:])),
+                      reverse=descending)
+    assert served == expected
+
+
+def test_rows_added_between_pages_do_not_shift_the_next_page():
+    results = ResultSet([make_post(number) for number in range(0, 40, 2)])
+    first = results.page(limit=5)
+    assert ids(results, first) == ['p38', 'p36', 'p34', 'p32', 'p30']
+
+    # Newer posts, and ties added after the cursor's row, sort before the cursor and are not served
+    for number in (1, 31, 41, 43):
+        results.add(make_post(number))
+    results.add(make_post(99, date=30))
+
+    served = read_all(results, 5, cursor=first['next_cursor'])
+    assert served == ['p28', 'p26', 'p24', 'p22', 'p20', 'p18', 'p16', 'p14', 'p12', 'p10',
+                      'p8', 'p6', 'p4', 'p2', 'p1', 'p0']
+
+
+def test_filters_apply_across_cursor_pages():
+    results = ResultSet([make_post(number, subreddit='seo' if number % 3 else 'marketing') for number in range(30)])
+
+    served = read_all(results, 4, subreddit='MARKETING', sort='date', descending=False)
+    assert served == [f'p{number}' for number in range(0, 30, 3)]
+
+    first = results.page(limit=4, subreddit='marketing')
+    assert first['total'] == 10
+    later = results.page(limit=4, subreddit='marketing', cursor=first['next_cursor'])
+    assert later['total'] is None
+    assert ids(results, later) == ['p15', 'p12', 'p9', 'p6']
+
+
+def cursor_of(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+@pytest.mark.parametrize('token', [
+    '',
+    'not a cursor',
+    'é',
+    cursor_of('{"sort": "date"}'),
+    cursor_of('["title", true, 1, 0]'),
+    cursor_of('["date", true, "1", 0]'),
+    cursor_of('["date", true, 1, -1]'),
+    cursor_of('["date", true, NaN, 0]'),
+    cursor_of('["date", true, 1e400, 0]'),
+])
+def test_invalid_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+    with pytest.raises(ValueError):
+        ResultSet([make_post(1)]).page(cursor=token)
+
+
+def test_cursor_of_another_sort_is_rejected():
+    results = ResultSet([make_post(number) for number in range(10)])
+    cursor = results.page(limit=3)['next_cursor']
+    with pytest.raises(ValueError):
+        results.page(limit=3, cursor=cursor, sort='upvotes')
+    with pytest.raises(ValueError):
+        results.page(limit=3, cursor=cursor, descending=False)
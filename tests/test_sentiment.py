@@ -0,0 +1,59 @@
+# test_sentiment.py
+import pytest
+
+from bench_sentiment import legacy_score, make_corpus
+
+from Scrapers import sentiment
+
+# Edge cases on top of the random texts: empty, only short words, only lexicon words
+EDGE_CASES = ['', 'a to of', 'great', 'terrible awful']
+
+
+def test_score_matches_legacy_without_punctuation():
+    # Both tokenize identically when there is no punctuation
+    for text in EDGE_CASES + make_corpus():
+        assert sentiment.score(text) == pytest.approx(legacy_score(text), abs=1e-12), text
+
+
+def test_score_batch_matches_score():
+    corpus = EDGE_CASES + make_corpus(punctuation=True)
+    assert sentiment.score_batch(corpus) == pytest.approx([sentiment.score(text) for text in corpus], abs=1e-12)
+    assert sentiment.score_batch([]) == []
+
+
+def test_punctuated_words_are_scored():
+    # Punctuated words used to be missed entirely
+    assert legacy_score("This is great!") == 0.0
+    assert sentiment.score("This is great!") > 0.0
+    assert sentiment.score("(Awful), terrible...") < 0.0
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Trailing and surrounding punctuation is not part of the word
+    ("good!", 1.0),
+    ("Good!!! Great?", 1.0),
+    ('"awful"', -1.0),
+    # Contractions split at the apostrophe; the stem still counts as a word, so they score
+    # like the unpunctuated spelling. Negation is not modelled
+    ("I don't love it", sentiment.score("I dont love it")),
+    ("It isn't helpful.", sentiment.score("It isnt helpful")),
+    ("It's awful.", -1.0),
+    # URLs split into their parts: words in a slug count, and every part counts toward the total
+    ("https://example.com/great-deals", sentiment.score("https example com great deals")),
+    ("See https://example.com/pricing", 0.0),
+])
+def test_punctuated_text(text, expected):
+    assert sentiment.score(text) == pytest.approx(expected, abs=1e-12)
+    assert sentiment.score_batch([text]) == pytest.approx([expected], abs=1e-12)
+
+
+def test_punctuation_only_changes_tokenization():
+    # Stripping the marks the corpus adds gives the legacy score back
+    for text in make_corpus(punctuation=True):
+        bare = text.translate(str.maketrans('', '', '!.,?'))
+        assert sentiment.score(text) == pytest.approx(legacy_score(bare), abs=1e-12), text
+
+
+def test_score_is_clamped():
+    assert sentiment.score(' '.join(['great'] * 50)) == 1.0
+    assert sentiment.score(' '.join(['awful'] * 50)) == -1.0
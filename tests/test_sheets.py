@@ -0,0 +1,123 @@
+# test_sheets.py
+import email.utils
+import time
+
+import pytest
+
+from Scrapers.sheets import SHEET_HEADER, FakeSheetBackend, GspreadBackend, SheetRateLimited, SheetWriter
+
+
+def make_post(post_id, title='Post'):
+    return {
+        'id': post_id,
+        'title': title,
+        'content': 'Body',
+        'url': f'https://www.reddit.com/r/emailmarketing/comments/{post_id}/',
+        'subreddit': 'emailmarketing',
+        'date': 1.7e9,
+        'keyword': 'newsletter',
+        'upvotes': 3,
+        'comments': 1,
+        'sentiment': 0.5
+    }
+
+
+class FlakyBackend(FakeSheetBackend):
+    """Rejects the first writes with SheetRateLimited."""
+
+    def __init__(self, failures, retry_after=None, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.retry_after = retry_after
+        self.attempts = []
+
+    def append_rows(self, rows):
+        self.attempts.append(time.monotonic())
+        if self.failures:
+            self.failures -= 1
+            raise SheetRateLimited('Quota exceeded for write requests', retry_after=self.retry_after)
+        super().append_rows(rows)
+
+
+def test_header_is_written_to_an_empty_sheet():
+    backend = FakeSheetBackend()
+    with SheetWriter(backend, requests_per_minute=None) as writer:
+        writer.write([make_post('a'), make_post('b')])
+
+    assert backend.rows[0] == SHEET_HEADER
+    assert [row[0] for row in backend.rows[1:]] == ['a', 'b']
+    assert writer.stats()['written'] == 2
+
+
+def test_header_is_not_repeated_in_a_sheet_with_rows():
+    backend = FakeSheetBackend(rows=[SHEET_HEADER, ['a']])
+    with SheetWriter(backend, requests_per_minute=None) as writer:
+        writer.write([make_post('b')])
+
+    assert [row[0] for row in backend.rows] == ['ID', 'a', 'b']
+
+
+def test_duplicates_are_skipped_across_flushes():
+    backend = FakeSheetBackend()
+    writer = SheetWriter(backend, batch_size=2, requests_per_minute=None)
+    assert writer.write([make_post('a'), make_post('b'), make_post('c')]) == 3
+    assert writer.write([make_post('b'), make_post('d')]) == 1
+    writer.close()
+
+    # A new writer reads the ids already in the sheet
+    with SheetWriter(backend, requests_per_minute=None) as reopened:
+        assert reopened.write([make_post('a'), make_post('e')]) == 1
+
+    assert [row[0] for row in backend.rows] == ['ID', 'a', 'b', 'c', 'd', 'e']
+    assert writer.stats()['skipped'] == 1
+    assert reopened.stats()['skipped'] == 1
+
+
+def test_rate_limited_writes_back_off_and_retry():
+    backend = FlakyBackend(failures=2, retry_after=0.05)
+    with SheetWriter(backend, requests_per_minute=None, base_delay=0.01, max_delay=0.02) as writer:
+        writer.write([make_post('a')])
+
+    stats = writer.stats()
+    assert stats['written'] == 1 and stats['retries'] == 2 and stats['failed'] == 0
+    assert [row[0] for row in backend.rows] == ['ID', 'a']
+    # Retry-After outweighs the shorter exponential backoff
+    assert all(later - earlier >= 0.05 for earlier, later in zip(backend.attempts, backend.attempts[1:]))
+
+
+def test_writes_fail_after_max_retries():
+    backend = FlakyBackend(failures=10)
+    with SheetWriter(backend, requests_per_minute=None, max_retries=2, base_delay=0.001) as writer:
+        writer.write([make_post('a'), make_post('b')])
+
+    assert writer.stats()['failed'] == 2 and writer.stats()['retries'] == 2
+    assert backend.rows == []
+
+
+def call_rejected(retry_after):
+    """Translate a gspread 429 carrying a Retry-After header, returning the SheetRateLimited raised."""
+    requests = pytest.importorskip('requests')
+    exceptions = pytest.importorskip('gspread.exceptions')
+
+    response = requests.Response()
+    response.status_code = 429
+    response._content = b'{"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}'
+    if retry_after is not None:
+        response.headers['Retry-After'] = retry_after
+
+    def rejected():
+        raise exceptions.APIError(response)
+
+    with pytest.raises(SheetRateLimited) as raised:
+        GspreadBackend._call(rejected)
+    return raised.value
+
+
+@pytest.mark.parametrize('retry_after, expected', [('30', 30.0), (None, None), ('soon', None)])
+def test_gspread_429_is_translated(retry_after, expected):
+    assert call_rejected(retry_after).retry_after == expected
+
+
+def test_gspread_429_with_an_http_date():
+    retry_after = email.utils.formatdate(time.time() + 120, usegmt=True)
+    assert 100 < call_rejected(retry_after).retry_after <= 120